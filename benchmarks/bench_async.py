@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+
+"""Compare the throughput of the sync and asyncio query APIs under many concurrent requests.
+
+The database is populated from a synthetic corpus, then the same mix of requests is answered in three ways:
+
+- one after the other with the sync methods of :class:`bio2bel_wikipathways.Manager`
+- from an event loop that hands the sync methods of a pooled manager to a thread pool, which is how an asyncio service
+  has to call them without :mod:`bio2bel_wikipathways.aio`
+- from an event loop with the methods of :class:`bio2bel_wikipathways.aio.AsyncManager`, which gives each request
+  its own session in a thread pool and shares the manager's caches
+
+The requests are :meth:`get_pathway_by_id`, :meth:`query_hgnc_symbols`, and :meth:`get_pathway_graph` calls in turn.
+The pathway cache is turned off, so every lookup and graph goes to the database, and the membership matrix is loaded
+before timing. The event loop ways also report the longest time a ticker task waited to run, which shows how long the
+loop was blocked. At most ``--concurrency`` requests are in flight at once. The answers of all ways are checked to be
+the same.
+
+Run with ``python -m benchmarks.bench_async`` from the root of the repository.
+"""
+
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, List, Mapping, Tuple
+
+import click
+
+from benchmarks.synthetic import write_synthetic_corpus
+from bio2bel_wikipathways import Manager
+from bio2bel_wikipathways.web import build_pooled_manager
+
+#: A request is the name of a manager method and its argument
+Request = Tuple[str, Any]
+
+
+def summarize_answer(method: str, answer: Any) -> Any:
+    """Reduce the answer of a request to something comparable across sessions."""
+    if answer is None:
+        return None
+    if method == 'get_pathway_by_id':
+        return answer.identifier, answer.name, sorted(protein.entrez_id for protein in answer.proteins)
+    if method == 'get_pathway_graph':
+        return sorted(answer.edges(keys=True))
+    return answer
+
+
+def run_sync(manager: Manager, requests: List[Request]) -> List[Any]:
+    """Answer the requests one after the other."""
+    return [summarize_answer(method, getattr(manager, method)(argument)) for method, argument in requests]
+
+
+async def measure_lag(stop: asyncio.Event, interval: float = 0.001) -> float:
+    """Sleep for the interval until stopped and return the longest extra time a wake-up took."""
+    loop = asyncio.get_running_loop()
+    rv = 0.0
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(interval)
+        rv = max(rv, loop.time() - start - interval)
+    return rv
+
+
+async def run_on_loop(
+    call: Callable[[str, Any], Awaitable[Any]],
+    requests: List[Request],
+    concurrency: int,
+) -> Tuple[List[Any], float]:
+    """Answer the requests with at most ``concurrency`` in flight and return the answers and the longest loop lag."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _answer(method: str, argument: Any) -> Any:
+        async with semaphore:
+            return summarize_answer(method, await call(method, argument))
+
+    stop = asyncio.Event()
+    lag = asyncio.ensure_future(measure_lag(stop))
+    answers = await asyncio.gather(*(_answer(method, argument) for method, argument in requests))
+    stop.set()
+    return answers, await lag
+
+
+def time_run(function: Callable[[], Any], number_requests: int) -> Tuple[Any, Mapping[str, float]]:
+    """Call the function and get its result and the seconds and requests per second it took."""
+    start = time.perf_counter()
+    rv = function()
+    seconds = time.perf_counter() - start
+    return rv, {'seconds': seconds, 'requests_per_second': number_requests / seconds}
+
+
+@click.command()
+@click.option('--pathways', type=int, default=2000, show_default=True, help='Human pathways')
+@click.option('--requests', 'number_requests', type=int, default=3000, show_default=True)
+@click.option('--concurrency', type=int, default=64, show_default=True, help='Requests in flight at once')
+@click.option('--query-size', type=int, default=20, show_default=True, help='HGNC gene symbols per query')
+@click.option('--seed', type=int, default=0, show_default=True)
+def main(pathways: int, number_requests: int, concurrency: int, query_size: int, seed: int):
+    """Benchmark the sync and asyncio query APIs."""
+    with tempfile.TemporaryDirectory() as directory:
+        corpus = write_synthetic_corpus(directory, number_species=1, pathways_per_species=pathways)
+        connection = f'sqlite:///{os.path.join(directory, "benchmark.db")}'
+        manager = Manager(connection=connection)
+        with corpus.mock_mappings():
+            manager.populate(paths=corpus.paths, bulk=True)
+
+        # seeded for reproducible requests, not for security
+        rng = random.Random(seed)  # noqa: S311
+        pathway_ids = sorted(manager.get_pathway_id_name_mapping())
+        hgnc_symbols = sorted(corpus.hgnc_id_to_symbol.values())
+        requests: List[Request] = []
+        for i in range(number_requests):
+            method = ('get_pathway_by_id', 'query_hgnc_symbols', 'get_pathway_graph')[i % 3]
+            if method == 'query_hgnc_symbols':
+                requests.append((method, rng.sample(hgnc_symbols, query_size)))
+            else:
+                requests.append((method, rng.choice(pathway_ids)))
+
+        pooled_manager = build_pooled_manager(connection, pool_size=concurrency)
+        for m in (manager, pooled_manager):
+            m.pathway_cache_size = 0
+            m._pathway_cache = None
+            m.clear_caches()
+            m.get_membership_matrix()
+
+        expected, sync_times = time_run(lambda: run_sync(manager, requests), number_requests)
+
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+
+        async def _call_in_thread(method: str, argument: Any) -> Any:
+            def _call():
+                try:
+                    return summarize_answer(method, getattr(pooled_manager, method)(argument))
+                finally:
+                    pooled_manager.session.remove()
+
+            return await asyncio.get_running_loop().run_in_executor(executor, _call)
+
+        (threaded, threaded_lag), threaded_times = time_run(
+            lambda: asyncio.run(run_on_loop(_call_in_thread, requests, concurrency)),
+            number_requests,
+        )
+        executor.shutdown()
+
+        async def _run_async():
+            async with pooled_manager.to_async(max_workers=concurrency) as async_manager:
+                await async_manager.get_membership_matrix()
+                return await run_on_loop(
+                    lambda method, argument: getattr(async_manager, method)(argument),
+                    requests,
+                    concurrency,
+                )
+
+        (answers, async_lag), async_times = time_run(lambda: asyncio.run(_run_async()), number_requests)
+
+        if not expected == threaded == answers:
+            raise ValueError('the sync, threaded, and async answers differ')
+
+        click.echo(json.dumps({
+            'pathways': pathways,
+            'requests': number_requests,
+            'concurrency': concurrency,
+            'sync': sync_times,
+            'threaded': {**threaded_times, 'max_loop_lag': threaded_lag},
+            'async': {**async_times, 'max_loop_lag': async_lag},
+        }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
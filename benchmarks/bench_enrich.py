@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+"""Compare the per-node and batch enrichment of large BEL graphs.
+
+The database is populated from a synthetic corpus, then a BEL graph with many HGNC protein nodes and one with many
+WikiPathways nodes are enriched with the per-node methods of :class:`bio2bel.compath.CompathManager` and with the
+batch methods of :class:`bio2bel_wikipathways.Manager`, both with an empty and with a full pathway cache. The
+enriched graphs are checked to be the same.
+
+Run with ``python -m benchmarks.bench_enrich`` from the root of the repository.
+"""
+
+import json
+import os
+import random
+import tempfile
+import time
+from functools import partial
+from typing import Callable, Mapping
+
+import click
+
+from benchmarks.synthetic import write_synthetic_corpus
+from bio2bel.compath import CompathManager
+from bio2bel_wikipathways import Manager
+from bio2bel_wikipathways.constants import HGNC, WIKIPATHWAYS
+from pybel import BELGraph
+from pybel.dsl import BiologicalProcess, Protein
+
+
+def time_enrichment(graph: BELGraph, enrich: Callable[[BELGraph], None]) -> Mapping[str, float]:
+    """Enrich a copy of the graph and return the seconds it took and the enriched graph's size."""
+    graph = graph.copy()
+    start = time.perf_counter()
+    enrich(graph)
+    return {
+        'seconds': time.perf_counter() - start,
+        'edges': graph.number_of_edges(),
+        '_edges': set(graph.edges(keys=True)),
+    }
+
+
+@click.command()
+@click.option('--pathways', type=int, default=2000, show_default=True, help='Human pathways')
+@click.option('--nodes', type=int, default=5000, show_default=True, help='HGNC and WikiPathways nodes per graph')
+def main(pathways: int, nodes: int):
+    """Benchmark the per-node and batch enrichment."""
+    with tempfile.TemporaryDirectory() as directory:
+        corpus = write_synthetic_corpus(directory, number_species=1, pathways_per_species=pathways)
+        manager = Manager(connection=f'sqlite:///{os.path.join(directory, "benchmark.db")}')
+        with corpus.mock_mappings():
+            manager.populate(paths=corpus.paths, bulk=True)
+
+        # seeded for reproducible benchmarks, not for security
+        rng = random.Random(0)  # noqa: S311
+        protein_graph = BELGraph()
+        for hgnc_id in rng.sample(sorted(corpus.hgnc_id_to_symbol), min(nodes, len(corpus.hgnc_id_to_symbol))):
+            protein_graph.add_node_from_data(Protein(
+                namespace=HGNC, identifier=hgnc_id, name=corpus.hgnc_id_to_symbol[hgnc_id],
+            ))
+        pathway_graph = BELGraph()
+        for identifier, name in rng.sample(sorted(manager.get_pathway_id_name_mapping().items()), min(nodes, pathways)):
+            pathway_graph.add_node_from_data(BiologicalProcess(namespace=WIKIPATHWAYS, identifier=identifier, name=name))
+
+        results = {}
+        for method, graph in (('enrich_proteins', protein_graph), ('enrich_pathways', pathway_graph)):
+            manager.clear_caches()
+            per_node = time_enrichment(graph, partial(getattr(CompathManager, method), manager))
+            manager.session.expire_all()
+            cold = time_enrichment(graph, getattr(manager, method))
+            warm = time_enrichment(graph, getattr(manager, method))
+            if not per_node.pop('_edges') == cold.pop('_edges') == warm.pop('_edges'):
+                raise ValueError(f'{method} gave different graphs')
+            results[method] = {
+                'nodes': graph.number_of_nodes(),
+                'per_node': per_node,
+                'batch_cold_cache': cold,
+                'batch_warm_cache': warm,
+                'speedup_cold_cache': per_node['seconds'] / cold['seconds'],
+                'speedup_warm_cache': per_node['seconds'] / warm['seconds'],
+            }
+
+        click.echo(json.dumps({'pathways': pathways, 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+"""Measure how long importing the package and its modules takes.
+
+Each module is imported in a new interpreter with ``python -X importtime`` several times, and the median of the
+cumulative import times is reported. Importing the manager takes several seconds because of Bio2BEL and PyBEL, so
+``import bio2bel_wikipathways`` taking more than :data:`IMPORT_TIME_THRESHOLD` means one of them is imported eagerly
+again. The lazy imports themselves are checked in ``tests/test_import_time.py``.
+
+Run with ``python -m benchmarks.bench_import`` from the root of the repository.
+"""
+
+import json
+import statistics
+import subprocess  # noqa: S404
+import sys
+from typing import List, Mapping
+
+import click
+
+#: The time in seconds that ``import bio2bel_wikipathways`` is expected to stay under
+IMPORT_TIME_THRESHOLD = 0.25
+
+#: The modules whose import times are measured
+MODULES = [
+    'bio2bel_wikipathways',
+    'bio2bel_wikipathways.snapshot',
+    'bio2bel_wikipathways.manager',
+]
+
+
+def get_import_times(module: str) -> Mapping[str, float]:
+    """Import the module in a new interpreter with ``-X importtime`` and get the cumulative seconds per module."""
+    # the command is always this interpreter importing a module named by whoever runs the benchmark, without a shell
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    rv = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        rv[name.strip()] = int(cumulative) / 1_000_000
+    return rv
+
+
+@click.command()
+@click.option('--repeats', type=int, default=5, show_default=True, help='Imports per module')
+@click.option('--module', 'modules', multiple=True, help=f'Defaults to {", ".join(MODULES)}')
+def main(repeats: int, modules: List[str]):
+    """Benchmark the import times of the modules."""
+    seconds = {
+        module: statistics.median(get_import_times(module)[module] for _ in range(repeats))
+        for module in modules or MODULES
+    }
+    click.echo(json.dumps({
+        'threshold': IMPORT_TIME_THRESHOLD,
+        'seconds': seconds,
+        'package_under_threshold': seconds.get('bio2bel_wikipathways', 0.0) < IMPORT_TIME_THRESHOLD,
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
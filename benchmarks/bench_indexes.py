@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+"""Compare the latency of protein and membership lookups with and without indexes.
+
+The database is populated from a synthetic corpus, then the indexes are dropped to simulate a database created with
+an older version of this package. The lookups are timed, :meth:`bio2bel_wikipathways.Manager.ensure_indexes` is run,
+and they are timed again.
+
+Run with ``python -m benchmarks.bench_indexes`` from the root of the repository.
+"""
+
+import json
+import os
+import random
+import tempfile
+import time
+from typing import Callable, List, Mapping
+
+import click
+
+from benchmarks.synthetic import write_synthetic_corpus
+from bio2bel_wikipathways import Manager
+
+
+def time_lookups(lookups: Mapping[str, Callable[[str], object]], queries: List[str]) -> Mapping[str, float]:
+    """Return the mean latency in milliseconds of each lookup over the queries."""
+    rv = {}
+    for name, lookup in lookups.items():
+        start = time.perf_counter()
+        for query in queries:
+            lookup(query)
+        rv[name] = 1000 * (time.perf_counter() - start) / len(queries)
+    return rv
+
+
+@click.command()
+@click.option('--species', type=int, default=3, show_default=True)
+@click.option('--pathways', type=int, default=1000, show_default=True, help='Pathways per species')
+@click.option('--queries', type=int, default=200, show_default=True, help='Lookups per method')
+def main(species: int, pathways: int, queries: int):
+    """Benchmark lookups before and after creating the indexes."""
+    with tempfile.TemporaryDirectory() as directory:
+        corpus = write_synthetic_corpus(directory, number_species=species, pathways_per_species=pathways)
+        manager = Manager(connection=f'sqlite:///{os.path.join(directory, "benchmark.db")}')
+        with corpus.mock_mappings():
+            manager.populate(paths=corpus.paths, bulk=True)
+
+        # seeded for reproducible benchmarks, not for security
+        rng = random.Random(0)  # noqa: S311
+        hgnc_ids = rng.sample(sorted(corpus.hgnc_id_to_symbol), queries)
+        lookups = {
+            'get_protein_by_entrez_id': lambda hgnc_id: manager.get_protein_by_entrez_id(
+                corpus.hgnc_id_to_entrez_id[hgnc_id],
+            ),
+            'get_protein_by_hgnc_id': manager.get_protein_by_hgnc_id,
+            'get_protein_by_hgnc_symbol': lambda hgnc_id: manager.get_protein_by_hgnc_symbol(
+                corpus.hgnc_id_to_symbol[hgnc_id],
+            ),
+            'query_hgnc_symbols': lambda hgnc_id: manager.query_hgnc_symbols([corpus.hgnc_id_to_symbol[hgnc_id]]),
+        }
+
+        for table in manager._metadata.sorted_tables:
+            for index in table.indexes:
+                index.drop(manager.engine)
+
+        before = time_lookups(lookups, hgnc_ids)
+        created = manager.ensure_indexes()
+        after = time_lookups(lookups, hgnc_ids)
+
+        click.echo(json.dumps({
+            'created_indexes': created,
+            'milliseconds': {
+                name: {'before': before[name], 'after': after[name], 'speedup': before[name] / after[name]}
+                for name in lookups
+            },
+        }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+"""Compare the ORM and bulk loading paths of :meth:`bio2bel_wikipathways.Manager.populate`.
+
+Run with ``python -m benchmarks.bench_populate`` from the root of the repository.
+"""
+
+import json
+import os
+import tempfile
+import time
+from typing import Mapping, Optional
+
+import click
+
+from benchmarks.synthetic import write_synthetic_corpus
+from bio2bel_wikipathways import Manager
+from bio2bel_wikipathways.models import Pathway, Species
+
+
+def dump_content(manager: Manager) -> Mapping:
+    """Get a comparable, surrogate key-free representation of the database content."""
+    return {
+        'species': sorted(manager.session.query(Species.taxonomy_id, Species.name).all()),
+        'pathways': sorted(
+            (
+                pathway.identifier, pathway.name, pathway.revision, pathway.species.taxonomy_id,
+                tuple(sorted((p.entrez_id, p.hgnc_id or '', p.hgnc_symbol or '') for p in pathway.proteins)),
+            )
+            for pathway in manager.session.query(Pathway)
+        ),
+    }
+
+
+def time_populate(connection: str, paths: Mapping[str, str], bulk: bool) -> float:
+    """Populate a fresh database and return the elapsed wall time in seconds."""
+    manager = Manager(connection=connection)
+    manager.drop_all()
+    manager.create_all()
+    start = time.perf_counter()
+    manager.populate(paths=paths, bulk=bulk)
+    return time.perf_counter() - start
+
+
+@click.command()
+@click.option('--species', type=int, default=3, show_default=True)
+@click.option('--pathways', type=int, default=500, show_default=True, help='Pathways per species')
+@click.option('--genes', type=int, default=40, show_default=True, help='Average genes per pathway')
+@click.option('-c', '--connection', help='Database to benchmark against. Defaults to a temporary SQLite file.')
+@click.option('--check/--no-check', default=True, show_default=True, help='Check both paths give the same content')
+def main(species: int, pathways: int, genes: int, connection: Optional[str], check: bool):
+    """Benchmark the ORM and bulk population on a synthetic multi-species GMT corpus."""
+    with tempfile.TemporaryDirectory() as directory:
+        corpus = write_synthetic_corpus(
+            directory,
+            number_species=species,
+            pathways_per_species=pathways,
+            genes_per_pathway=genes,
+        )
+        connection = connection or f'sqlite:///{os.path.join(directory, "benchmark.db")}'
+
+        results = {}
+        contents = {}
+        with corpus.mock_mappings():
+            for bulk in (False, True):
+                key = 'bulk' if bulk else 'orm'
+                results[key] = time_populate(connection, corpus.paths, bulk=bulk)
+                if check:
+                    contents[key] = dump_content(Manager(connection=connection))
+
+        if check and contents['orm'] != contents['bulk']:
+            raise click.ClickException('ORM and bulk population gave different database content')
+
+        click.echo(json.dumps({
+            'species': species,
+            'pathways': corpus.number_pathways,
+            'seconds': results,
+            'speedup': results['orm'] / results['bulk'],
+        }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+
+"""Time populating, looking up, querying, and enriching against a synthetic corpus on several databases.
+
+A synthetic corpus is written with :func:`benchmarks.synthetic.write_synthetic_corpus` and loaded with the mocked
+pyobo mappings that come with it into an in-memory SQLite database, a file-backed SQLite database, and any other
+databases given with ``--connection``. Then these are timed on each database:
+
+- :meth:`bio2bel_wikipathways.Manager.populate`
+- :meth:`bio2bel_wikipathways.Manager.get_pathway_by_id`, on human pathways like the following lookups
+- :meth:`bio2bel_wikipathways.Manager.query_hgnc_symbols`, whose first call loads the membership matrix
+- :meth:`bio2bel_wikipathways.Manager.get_pathway_graph`, with an empty and with a full pathway cache
+- :meth:`bio2bel_wikipathways.Manager.enrich_proteins`, with an empty and with a full pathway cache
+
+Each database gives one line of JSON with the parameters, the environment, and the calls, seconds, and SQL
+statements of each operation, so results can be appended to a file with ``--output`` and tracked over time.
+
+Run with ``python -m benchmarks.bench_suite`` from the root of the repository.
+"""
+
+import datetime
+import json
+import os
+import platform
+import random
+import tempfile
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, TextIO
+
+import click
+import sqlalchemy
+
+from benchmarks.synthetic import SyntheticCorpus, write_synthetic_corpus
+from bio2bel_wikipathways import Manager
+from bio2bel_wikipathways.constants import HGNC
+from bio2bel_wikipathways.models import Pathway, Species
+from bio2bel_wikipathways.profiling import Profiler
+from bio2bel_wikipathways.utils import get_version
+from pybel import BELGraph
+from pybel.dsl import Protein
+
+
+def time_calls(profiler: Profiler, name: str, function: Callable[[Any], Any], arguments: Sequence[Any]) -> None:
+    """Call the function on each argument in one phase of the profiler."""
+    with profiler.phase(name) as info:
+        for argument in arguments:
+            function(argument)
+        info['rows'] = len(arguments)
+
+
+def run_benchmarks(
+    connection: str,
+    corpus: SyntheticCorpus,
+    *,
+    bulk: bool,
+    queries: int,
+    query_size: int,
+    graph_size: int,
+    seed: int,
+) -> Dict[str, Dict[str, Any]]:
+    """Populate a new database from the corpus and time the operations on it.
+
+    :return: A dictionary from operations to their seconds, SQL statements, and count, i.e., the number of calls or,
+     for populating, of pathways
+    """
+    manager = Manager(connection=connection)
+    manager.drop_all()
+    manager.create_all()
+
+    profiler = Profiler(manager.engine)
+    profiler.start()
+    try:
+        with corpus.mock_mappings(), profiler.phase('populate') as info:
+            manager.populate(paths=corpus.paths, bulk=bulk)
+            info['rows'] = manager.count_pathways()
+
+        # seeded for reproducible benchmarks, not for security
+        rng = random.Random(seed)  # noqa: S311
+        # only human pathways can be converted to BEL, since the proteins of other species have no HGNC identifiers
+        human_pathway_ids = sorted(
+            identifier
+            for identifier, in manager.session.query(Pathway.identifier).join(Species).filter(
+                Species.taxonomy_id == '9606',
+            )
+        )
+        pathway_ids = rng.choices(human_pathway_ids, k=queries)
+        symbols = sorted(corpus.hgnc_id_to_symbol.values())
+        gene_lists = [rng.sample(symbols, min(query_size, len(symbols))) for _ in range(queries)]
+        graph = BELGraph()
+        hgnc_ids = sorted(corpus.hgnc_id_to_symbol)
+        for hgnc_id in rng.sample(hgnc_ids, min(graph_size, len(hgnc_ids))):
+            graph.add_node_from_data(Protein(
+                namespace=HGNC, identifier=hgnc_id, name=corpus.hgnc_id_to_symbol[hgnc_id],
+            ))
+
+        manager.session.expire_all()
+        time_calls(profiler, 'get_pathway_by_id', manager.get_pathway_by_id, pathway_ids)
+
+        manager.clear_caches()
+        time_calls(profiler, 'query_hgnc_symbols_first', manager.query_hgnc_symbols, gene_lists[:1])
+        time_calls(profiler, 'query_hgnc_symbols', manager.query_hgnc_symbols, gene_lists)
+
+        manager.session.expire_all()
+        time_calls(profiler, 'get_pathway_graph_cold_cache', manager.get_pathway_graph, pathway_ids)
+        time_calls(profiler, 'get_pathway_graph_warm_cache', manager.get_pathway_graph, pathway_ids)
+
+        manager.clear_caches()
+        manager.session.expire_all()
+        for cache in ('cold', 'warm'):
+            time_calls(profiler, f'enrich_proteins_{cache}_cache', manager.enrich_proteins, [graph.copy()])
+    finally:
+        profiler.stop()
+        manager.session.close()
+
+    return {
+        name: {
+            'seconds': summary['seconds'],
+            'statements': summary['statements'],
+            'count': summary['rows'],
+            'milliseconds_per_count': 1000 * summary['seconds'] / summary['rows'] if summary['rows'] else None,
+        }
+        for name, summary in profiler.get_summary().items()
+    }
+
+
+def get_environment() -> Mapping[str, str]:
+    """Get the versions of the software the benchmarks ran on."""
+    return {
+        'package_version': get_version(),
+        'python': platform.python_version(),
+        'sqlalchemy': sqlalchemy.__version__,
+        'platform': platform.platform(),
+    }
+
+
+@click.command()
+@click.option('--species', type=int, default=3, show_default=True)
+@click.option('--pathways', type=int, default=1000, show_default=True, help='Pathways per species')
+@click.option('--genes', type=int, default=40, show_default=True, help='Average genes per pathway')
+@click.option('--genes-per-species', type=int, default=10_000, show_default=True)
+@click.option('-c', '--connection', 'connections', multiple=True, help='More databases to benchmark against')
+@click.option('--no-sqlite', is_flag=True, help='Skip the in-memory and file-backed SQLite databases')
+@click.option('-b', '--bulk', is_flag=True, help='Populate with set-based inserts instead of the ORM')
+@click.option('--queries', type=int, default=200, show_default=True, help='Calls per lookup and query')
+@click.option('--query-size', type=int, default=50, show_default=True, help='Genes per query')
+@click.option('--graph-size', type=int, default=2000, show_default=True, help='Proteins in the graph to enrich')
+@click.option('--seed', type=int, default=0, show_default=True)
+@click.option('-o', '--output', type=click.File('a'), default='-', help='Append to this file. Defaults to stdout')
+def main(
+    species: int,
+    pathways: int,
+    genes: int,
+    genes_per_species: int,
+    connections: List[str],
+    no_sqlite: bool,
+    bulk: bool,
+    queries: int,
+    query_size: int,
+    graph_size: int,
+    seed: int,
+    output: TextIO,
+):
+    """Benchmark populating, looking up, querying, and enriching on each database."""
+    parameters = {
+        'species': species,
+        'pathways_per_species': pathways,
+        'genes_per_pathway': genes,
+        'genes_per_species': genes_per_species,
+        'bulk': bulk,
+        'queries': queries,
+        'query_size': query_size,
+        'graph_size': graph_size,
+        'seed': seed,
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        corpus = write_synthetic_corpus(
+            directory,
+            number_species=species,
+            pathways_per_species=pathways,
+            genes_per_pathway=genes,
+            genes_per_species=genes_per_species,
+            seed=seed,
+        )
+
+        databases: Dict[str, Optional[str]] = {}
+        if not no_sqlite:
+            databases['sqlite_memory'] = 'sqlite://'
+            databases['sqlite_file'] = f'sqlite:///{os.path.join(directory, "benchmark.db")}'
+        for connection in connections:
+            databases[sqlalchemy.engine.url.make_url(connection).drivername] = connection
+
+        for database, connection in databases.items():
+            results = run_benchmarks(
+                connection,
+                corpus,
+                bulk=bulk,
+                queries=queries,
+                query_size=query_size,
+                graph_size=graph_size,
+                seed=seed,
+            )
+            click.echo(json.dumps({
+                'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+                'database': database,
+                'parameters': parameters,
+                'environment': get_environment(),
+                'results': results,
+            }), file=output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+
+r"""Generate synthetic WikiPathways GMT corpora for benchmarking.
+
+The files follow the layout of the GMT dumps on http://data.wikipathways.org, i.e., each line is
+``<name>%WikiPathways_<version>%<identifier>%<species>\t<url>\t<entrez id>\t...``.
+"""
+
+import os
+import random
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from typing import Dict, Mapping
+from unittest import mock
+
+from bio2bel_wikipathways.constants import _PATHWAY_INFO
+
+__all__ = [
+    'SyntheticCorpus',
+    'write_synthetic_corpus',
+]
+
+#: Offset between the Entrez identifiers of consecutive species, so gene universes don't overlap
+SPECIES_GENE_OFFSET = 1_000_000
+
+
+@dataclass
+class SyntheticCorpus:
+    """Paths to a synthetic GMT corpus and the pyobo mappings that go with it."""
+
+    #: The directory in which the GMT files are written
+    directory: str
+    #: Mapping from taxonomy identifier to the path of the GMT file
+    paths: Dict[str, str] = field(default_factory=dict)
+    #: Mapping from species name to taxonomy identifier, like ``get_name_id_mapping('ncbitaxon')``
+    taxonomy_name_to_id: Dict[str, str] = field(default_factory=dict)
+    #: Mapping from HGNC identifier to Entrez identifier, like ``get_filtered_xrefs('hgnc', 'ncbigene')``
+    hgnc_id_to_entrez_id: Dict[str, str] = field(default_factory=dict)
+    #: Mapping from HGNC identifier to symbol, like ``get_id_name_mapping('hgnc')``
+    hgnc_id_to_symbol: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def number_pathways(self) -> int:  # noqa: D401
+        """The number of pathways over all files."""
+        rv = 0
+        for path in self.paths.values():
+            with open(path) as file:
+                rv += sum(1 for _ in file)
+        return rv
+
+    def mock_mappings(self, module: str = 'bio2bel_wikipathways.mappings') -> ExitStack:
+        """Patch the pyobo mapping getters used by the given module to return this corpus' mappings.
+
+        The mapping cache is also redirected to a file in this corpus' directory.
+        """
+        mappings: Mapping[str, Dict[str, str]] = {
+            'ncbitaxon': self.taxonomy_name_to_id,
+            'hgnc': self.hgnc_id_to_symbol,
+        }
+        stack = ExitStack()
+        stack.enter_context(mock.patch(
+            f'{module}.get_mappings_path',
+            return_value=os.path.join(self.directory, 'mappings.db'),
+        ))
+        stack.enter_context(mock.patch(
+            f'{module}.get_name_id_mapping',
+            side_effect=lambda prefix, **_: mappings.get(prefix, {}),
+        ))
+        stack.enter_context(mock.patch(
+            f'{module}.get_id_name_mapping',
+            side_effect=lambda prefix, **_: mappings.get(prefix, {}),
+        ))
+        stack.enter_context(mock.patch(
+            f'{module}.get_filtered_xrefs',
+            side_effect=lambda prefix, target, **_: self.hgnc_id_to_entrez_id,
+        ))
+        return stack
+
+
+def write_synthetic_corpus(
+    directory: str,
+    *,
+    number_species: int = 3,
+    pathways_per_species: int = 500,
+    genes_per_pathway: int = 40,
+    genes_per_species: int = 10_000,
+    version: str = '20200310',
+    seed: int = 0,
+) -> SyntheticCorpus:
+    """Write one GMT file per species to the directory.
+
+    :param directory: The directory in which the GMT files are written
+    :param number_species: The number of species, taken in order from :data:`bio2bel_wikipathways.constants.infos`
+     with *Homo sapiens* always included first
+    :param pathways_per_species: The number of pathways in each GMT file
+    :param genes_per_pathway: The average number of genes per pathway. The actual sizes are drawn uniformly from
+     the range between one and twice this number.
+    :param genes_per_species: The size of the gene universe of each species
+    :param version: The WikiPathways release written in each record
+    :param seed: The seed for the random number generator
+    """
+    # seeded for a reproducible corpus, not for security
+    rng = random.Random(seed)  # noqa: S311
+    species_info = sorted(_PATHWAY_INFO, key=lambda t: t[1] != '9606')[:number_species]
+
+    corpus = SyntheticCorpus(directory=directory)
+    identifier = 0
+    for species_index, (species_code, taxonomy_id) in enumerate(species_info):
+        species_name = species_code.replace('_', ' ')
+        corpus.taxonomy_name_to_id[species_name] = taxonomy_id
+
+        gene_offset = species_index * SPECIES_GENE_OFFSET
+        universe = [str(gene_offset + i) for i in range(1, genes_per_species + 1)]
+        if taxonomy_id == '9606':
+            for i, entrez_id in enumerate(universe, start=1):
+                corpus.hgnc_id_to_entrez_id[str(i)] = entrez_id
+                corpus.hgnc_id_to_symbol[str(i)] = f'GENE{i}'
+
+        path = os.path.join(directory, f'wikipathways-{version}-gmt-{species_code}.gmt')
+        with open(path, 'w') as file:
+            for _ in range(pathways_per_species):
+                identifier += 1
+                size = rng.randint(1, min(2 * genes_per_pathway, genes_per_species))
+                genes = rng.sample(universe, size)
+                file.write('\t'.join([
+                    f'Synthetic pathway {identifier}%WikiPathways_{version}%WP{identifier}%{species_name}',
+                    f'http://www.wikipathways.org/instance/WP{identifier}_r{rng.randint(1, 100_000)}',
+                    *genes,
+                ]) + '\n')
+        corpus.paths[taxonomy_id] = path
+
+    return corpus
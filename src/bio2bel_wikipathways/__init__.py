@@ -17,5 +17,13 @@ Citation
   Jan;40(Database issue):D1301-7
 """
 
-from .manager import Manager  # noqa: F401
 from .utils import get_version  # noqa: F401
+
+
+def __getattr__(name: str):
+    # The manager needs SQLAlchemy, Bio2BEL, and PyBEL, which take a long time to import, so it is only imported
+    # when first used
+    if name == 'Manager':
+        from .manager import Manager
+        return Manager
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+
+"""An asyncio counterpart to the read-side API of :class:`bio2bel_wikipathways.Manager`.
+
+:class:`AsyncManager` runs the lookups of a manager in a thread pool, so they don't block the event loop of an asyncio
+service. It uses the manager's engine with SQLAlchemy's usual synchronous API, so it needs no extra dependencies.
+
+.. code-block:: python
+
+    from bio2bel_wikipathways import Manager
+
+    async with Manager().to_async() as async_manager:
+        pathway = await async_manager.get_pathway_by_id('WP1604')
+        results = await async_manager.query_hgnc_symbols(['UGT2B4', 'UGT2B7'])
+
+Each call gets a new session bound to the manager's engine in a worker thread and closes it before returning, so
+concurrent tasks never share a session. The returned pathways have their species and proteins loaded, since lazy
+loading is not possible once their session is closed. The membership matrices and the pathway cache are the ones of
+the wrapped manager, so they are shared with its synchronous methods and cleared with :meth:`Manager.clear_caches`,
+and the results are the same as the ones of the synchronous methods.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Set, TYPE_CHECKING, TypeVar
+
+from sqlalchemy import bindparam
+from sqlalchemy.orm import Session, selectinload, sessionmaker
+
+from pybel import BELGraph
+from .constants import QUERY_CHUNK_SIZE
+from .manager import CachedPathway, add_to_bel_graph
+from .models import Pathway, Protein, Species
+from .utils import chunked
+
+if TYPE_CHECKING:
+    from .enrichment import MembershipMatrix
+    from .manager import Manager
+
+__all__ = [
+    'AsyncManager',
+]
+
+T = TypeVar('T')
+
+
+class AsyncManager:
+    """Look up pathways, query genes, and build pathway graphs from a manager's database without blocking."""
+
+    def __init__(self, manager: Manager, *, max_workers: Optional[int] = None):
+        """Build the session factory and the thread pool.
+
+        :param manager: The manager whose engine and caches are used
+        :param max_workers: The maximum number of queries run at once. Keep it at most the size of the engine's
+         connection pool, e.g., the one of :func:`bio2bel_wikipathways.web.build_pooled_manager`. Defaults to the
+         one of :class:`concurrent.futures.ThreadPoolExecutor`.
+        """
+        self.manager = manager
+        self._session_factory = sessionmaker(bind=manager.engine, autoflush=False)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='bio2bel_wikipathways')
+        self._membership_matrix_locks: Dict[Optional[str], asyncio.Lock] = {}
+
+    async def __aenter__(self) -> AsyncManager:  # noqa: D105
+        return self
+
+    async def __aexit__(self, *_exc_info) -> None:  # noqa: D105
+        await self.close()
+
+    async def close(self) -> None:
+        """Wait for the running queries and stop the thread pool. The manager's engine is left open."""
+        await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
+
+    async def _run(self, function: Callable[..., T], *args: Any) -> T:
+        """Call the function with a new session and the arguments in the thread pool."""
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor,
+            partial(self._run_in_session, function, *args),
+        )
+
+    def _run_in_session(self, function: Callable[..., T], *args: Any) -> T:
+        session = self._session_factory()
+        try:
+            return function(session, *args)
+        finally:
+            session.close()
+
+    async def count_pathways(self) -> int:
+        """Count the pathways in the database."""
+        return await self._run(_count_pathways)
+
+    async def get_pathway_by_id(self, pathway_id: str) -> Optional[Pathway]:
+        """Get a pathway by its WikiPathways identifier, with its species and proteins loaded."""
+        return await self._run(_get_pathway_by_id, pathway_id)
+
+    async def get_pathways_by_ids(self, pathway_ids: Iterable[str]) -> Dict[str, Pathway]:
+        """Get a dictionary from WikiPathways identifiers to the pathways already in the database.
+
+        Like :meth:`Manager.get_pathways_by_ids` with ``load_proteins``, the pathways are looked up with one ``IN``
+        query per chunk of :data:`QUERY_CHUNK_SIZE` identifiers, and have their species and proteins loaded.
+        """
+        return await self._run(_get_pathways_by_ids, set(pathway_ids))
+
+    async def get_pathway_ids_by_hgnc_ids(
+        self,
+        hgnc_ids: Iterable[str],
+        taxonomy_id: Optional[str] = None,
+    ) -> Set[str]:
+        """Get the identifiers of the pathways that contain proteins with the given HGNC identifiers.
+
+        :param hgnc_ids: HGNC identifiers
+        :param taxonomy_id: If given, only gets the pathways of this species
+        """
+        return await self._run(_get_pathway_ids_by_hgnc_ids, set(hgnc_ids), taxonomy_id)
+
+    async def get_membership_matrix(self, taxonomy_id: Optional[str] = None) -> MembershipMatrix:
+        """Get the manager's membership matrix, loading it in the thread pool on first use.
+
+        Concurrent calls wait for the first one to load the matrix instead of loading it again.
+        """
+        matrix = self._get_loaded_membership_matrix(taxonomy_id)
+        if matrix is not None:
+            return matrix
+
+        lock = self._membership_matrix_locks.setdefault(taxonomy_id, asyncio.Lock())
+        async with lock:
+            matrix = self._get_loaded_membership_matrix(taxonomy_id)
+            if matrix is not None:
+                return matrix
+
+            with self.manager._profile('load_membership_matrix') as info:
+                matrix = await self._run(_load_membership_matrix, taxonomy_id)
+                info['rows'] = matrix.matrix.nnz
+
+            if self.manager._membership_matrices is None:
+                self.manager._membership_matrices = {}
+            self.manager._membership_matrices[taxonomy_id] = matrix
+            return matrix
+
+    def _get_loaded_membership_matrix(self, taxonomy_id: Optional[str]) -> Optional[MembershipMatrix]:
+        if self.manager._membership_matrices is None:
+            return None
+        return self.manager._membership_matrices.get(taxonomy_id)
+
+    async def query_hgnc_symbols(
+        self,
+        hgnc_symbols: Iterable[str],
+        taxonomy_id: Optional[str] = None,
+    ) -> Mapping[str, Mapping]:
+        """Calculate the pathway counter dictionary like :meth:`Manager.query_hgnc_symbols`."""
+        matrix = await self.get_membership_matrix(taxonomy_id)
+        return matrix.query([hgnc_symbols], statistics=False)[0]
+
+    async def enrich_hgnc_symbols(
+        self,
+        hgnc_symbols: Iterable[str],
+        taxonomy_id: Optional[str] = None,
+    ) -> Mapping[str, Mapping]:
+        """Calculate the enrichment of the HGNC gene symbols like :meth:`Manager.enrich_hgnc_symbols`."""
+        matrix = await self.get_membership_matrix(taxonomy_id)
+        return matrix.query([hgnc_symbols])[0]
+
+    async def get_cached_pathways(self, pathway_ids: Iterable[str]) -> Dict[str, Optional[CachedPathway]]:
+        """Get the cached nodes of many pathways from the manager's pathway cache, loading the missing ones at once."""
+        return await self.manager.pathway_cache.get_many_async(pathway_ids, self._build_cached_pathways)
+
+    async def _build_cached_pathways(self, pathway_ids: List[str]) -> Dict[str, Optional[CachedPathway]]:
+        pathways = await self.get_pathways_by_ids(pathway_ids)
+        return {
+            pathway_id: CachedPathway.from_pathway(pathways[pathway_id]) if pathway_id in pathways else None
+            for pathway_id in pathway_ids
+        }
+
+    async def get_pathway_graph(self, pathway_id: str) -> Optional[BELGraph]:
+        """Return a new graph corresponding to the pathway, like :meth:`Manager.get_pathway_graph`."""
+        cached_pathway = (await self.get_cached_pathways([pathway_id]))[pathway_id]
+        if cached_pathway is None:
+            return None
+
+        graph = BELGraph(name=cached_pathway.name)
+        add_to_bel_graph(graph, [cached_pathway])
+        return graph
+
+
+def _count_pathways(session: Session) -> int:
+    return session.query(Pathway).count()
+
+
+def _get_pathway_by_id(session: Session, pathway_id: str) -> Optional[Pathway]:
+    return session.query(Pathway).filter(Pathway.identifier == pathway_id).options(
+        selectinload(Pathway.species),
+        selectinload(Pathway.proteins),
+    ).one_or_none()
+
+
+def _get_pathways_by_ids(session: Session, pathway_ids: Set[str]) -> Dict[str, Pathway]:
+    query = session.query(Pathway).filter(Pathway.identifier.in_(bindparam('values', expanding=True))).options(
+        selectinload(Pathway.species),
+        selectinload(Pathway.proteins),
+    )
+    return {
+        pathway.identifier: pathway
+        for chunk in chunked(pathway_ids, QUERY_CHUNK_SIZE)
+        for pathway in query.params(values=chunk)
+    }
+
+
+def _get_pathway_ids_by_hgnc_ids(session: Session, hgnc_ids: Set[str], taxonomy_id: Optional[str]) -> Set[str]:
+    query = session.query(Pathway.identifier).join(Pathway.proteins).distinct().filter(
+        Protein.hgnc_id.in_(bindparam('values', expanding=True)),
+    )
+    if taxonomy_id is not None:
+        query = query.join(Pathway.species).filter(Species.taxonomy_id == taxonomy_id)
+    return {
+        pathway_id
+        for chunk in chunked(hgnc_ids, QUERY_CHUNK_SIZE)
+        for pathway_id, in query.params(values=chunk)
+    }
+
+
+def _load_membership_matrix(session: Session, taxonomy_id: Optional[str]) -> MembershipMatrix:
+    from .enrichment import MembershipMatrix
+    query = session.query(Pathway.identifier, Pathway.name, Protein.hgnc_symbol).join(
+        Pathway.proteins,
+    ).filter(Protein.hgnc_symbol.isnot(None)).order_by(Pathway.id)
+    if taxonomy_id is not None:
+        query = query.join(Pathway.species).filter(Species.taxonomy_id == taxonomy_id)
+    return MembershipMatrix.from_rows(query)
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+
+"""A bounded, thread-safe least recently used cache with hit and miss counters."""
+
+import threading
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Generic, Hashable, Iterable, List, Mapping, NamedTuple, Tuple, TypeVar
+
+__all__ = [
+    'CacheInfo',
+    'LRUCache',
+]
+
+K = TypeVar('K', bound=Hashable)
+V = TypeVar('V')
+
+
+class CacheInfo(NamedTuple):
+    """Statistics of a cache, like the ones of :func:`functools.lru_cache`."""
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+    version: int
+
+
+class LRUCache(Generic[K, V]):
+    """A mapping that keeps at most ``maxsize`` entries and drops the least recently used one when full.
+
+    Values are made on a miss by the factory given to :meth:`get`. :meth:`clear` drops all entries and increments
+    the version, so entries made from data read before the clear are never returned after it.
+    """
+
+    def __init__(self, maxsize: int):
+        """Initialize the cache.
+
+        :param maxsize: The maximum number of entries. If 0, nothing is cached.
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.version = 0
+        self._data: 'OrderedDict[K, V]' = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:  # noqa: D105
+        return len(self._data)
+
+    def __contains__(self, key: K) -> bool:  # noqa: D105
+        return key in self._data
+
+    def get(self, key: K, factory: Callable[[K], V]) -> V:
+        """Get the value for the key, making it with the factory and storing it if it's missing."""
+        rv, missing, version = self._lookup([key])
+        if not missing:
+            return rv[key]
+        value = factory(key)
+        self._store({key: value}, missing, version)
+        return value
+
+    def get_many(self, keys: Iterable[K], factory: Callable[[List[K]], Mapping[K, V]]) -> Dict[K, V]:
+        """Get the values for the keys, making all missing ones with one call to the factory and storing them.
+
+        :param keys: The keys
+        :param factory: A function that takes the list of missing keys and returns a dictionary with their values
+        :return: A dictionary from the keys to their values
+        """
+        rv, missing, version = self._lookup(keys)
+        if not missing:
+            return rv
+        values = factory(missing)
+        rv.update(values)
+        self._store(values, missing, version)
+        return rv
+
+    async def get_many_async(
+        self,
+        keys: Iterable[K],
+        factory: Callable[[List[K]], Awaitable[Mapping[K, V]]],
+    ) -> Dict[K, V]:
+        """Like :meth:`get_many`, but awaits the factory, so values can be loaded without blocking an event loop."""
+        rv, missing, version = self._lookup(keys)
+        if not missing:
+            return rv
+        values = await factory(missing)
+        rv.update(values)
+        self._store(values, missing, version)
+        return rv
+
+    def _lookup(self, keys: Iterable[K]) -> Tuple[Dict[K, V], List[K], int]:
+        """Get the values of the keys that are cached, the keys that are missing, and the current version."""
+        rv, missing = {}, []
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                if key in self._data:
+                    self.hits += 1
+                    self._data.move_to_end(key)
+                    rv[key] = self._data[key]
+                else:
+                    missing.append(key)
+            self.misses += len(missing)
+            return rv, missing, self.version
+
+    def _store(self, values: Mapping[K, V], missing: List[K], version: int) -> None:
+        """Store the values of the missing keys, unless the cache was cleared since they were looked up."""
+        with self._lock:
+            if self.maxsize > 0 and version == self.version:
+                # the most recently used entries are the last ones, so the ones asked for first are dropped first
+                for key in missing[-self.maxsize:]:
+                    self._data[key] = values[key]
+                    self._data.move_to_end(key)
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all entries and increment the version. The hit and miss counters are kept."""
+        with self._lock:
+            self._data.clear()
+            self.version += 1
+
+    def info(self) -> CacheInfo:
+        """Get the hit and miss counters, the size, and the version of the cache."""
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._data), self.version)
@@ -5,19 +5,44 @@
 from dataclasses import dataclass
 from typing import Dict
 
-from bio2bel import get_data_dir
-from bio2bel.utils import ensure_path
-
 VERSION = '0.3.0-dev'
 
 MODULE_NAME = 'wikipathways'
-DATA_DIR = get_data_dir(MODULE_NAME)
 
 HGNC = 'hgnc'
 WIKIPATHWAYS = 'wikipathways'
 
 DATA_VERSION = '20200310'
 
+#: The base URL of the WikiPathways data dumps
+BASE_URL = 'http://data.wikipathways.org'
+
+#: The name of the file in :data:`DATA_DIR` that records the downloaded GMT files and their checksums
+MANIFEST_NAME = 'manifest.json'
+
+#: The number of rows sent per ``executemany`` when populating in bulk
+BULK_CHUNK_SIZE = 10_000
+
+#: The number of values per ``IN (...)`` clause when looking up many rows at once. Stays below SQLite's default
+#: limit of 999 bound parameters per statement.
+QUERY_CHUNK_SIZE = 500
+
+#: The number of gene lists evaluated with one sparse matrix product when enriching many lists at once
+ENRICHMENT_BATCH_SIZE = 256
+
+#: The default number of pathways whose PyBEL nodes are cached by the manager
+PATHWAY_CACHE_SIZE = 1024
+
+#: The number of pathways whose overlaps with all others are computed with one sparse matrix product
+SIMILARITY_BLOCK_SIZE = 1024
+
+#: Every this many releases, a release stores all of its memberships instead of the delta to the previous one, so
+#: getting a release never replays more deltas than this
+RELEASE_KEYFRAME_INTERVAL = 12
+
+#: The default number of releases whose content is kept in memory by the manager
+RELEASE_CACHE_SIZE = 4
+
 
 @dataclass
 class SpeciesPathwayInfo:
@@ -29,11 +54,21 @@ class SpeciesPathwayInfo:
     @property
     def url(self) -> str:  # noqa: D401
         """The URL for the data."""
-        return f'http://data.wikipathways.org/{DATA_VERSION}/gmt/wikipathways-{DATA_VERSION}-gmt-{self.name}.gmt'
+        return self.get_url()
+
+    def get_url(self, base_url: str = BASE_URL) -> str:
+        """Get the URL for the data on the given host."""
+        return f'{base_url}/{DATA_VERSION}/gmt/{self.file_name}'
+
+    @property
+    def file_name(self) -> str:  # noqa: D401
+        """The name of the GMT file."""
+        return f'wikipathways-{DATA_VERSION}-gmt-{self.name}.gmt'
 
     @property
     def path(self) -> str:  # noqa: D401
         """The (ensured) path to the data."""
+        from bio2bel.utils import ensure_path
         return ensure_path(MODULE_NAME, self.url)
 
 
@@ -66,3 +101,12 @@ infos: Dict[str, SpeciesPathwayInfo] = {
     taxonomy_id: SpeciesPathwayInfo(taxonomy_id=taxonomy_id, name=name)
     for name, taxonomy_id in _PATHWAY_INFO
 }
+
+
+def __getattr__(name: str):
+    # Importing bio2bel takes a long time, so the data directory is only looked up on first use
+    if name == 'DATA_DIR':
+        from bio2bel import get_data_dir
+        globals()['DATA_DIR'] = data_dir = get_data_dir(MODULE_NAME)
+        return data_dir
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+
+"""Download the WikiPathways GMT files concurrently and keep track of them in a local manifest.
+
+The manifest is a JSON file in the data directory recording, for each downloaded species, the URL, the file name, the
+size, and the SHA-256 checksum of the GMT file, as well as the WikiPathways :data:`DATA_VERSION` they belong to. Files
+listed in the manifest whose checksums still match are not downloaded again. Interrupted downloads are kept as
+``.part`` files and resumed with HTTP range requests.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+import requests
+
+from .constants import BASE_URL, DATA_DIR, DATA_VERSION, MANIFEST_NAME, SpeciesPathwayInfo, infos
+
+__all__ = [
+    'prefetch',
+    'download',
+    'read_manifest',
+]
+
+logger = logging.getLogger(__name__)
+
+#: The number of bytes read at a time when downloading and hashing
+CHUNK_SIZE = 1 << 20
+
+
+def prefetch(
+    species: Optional[Iterable[SpeciesPathwayInfo]] = None,
+    *,
+    directory: Optional[str] = None,
+    base_url: str = BASE_URL,
+    max_workers: int = 4,
+    force: bool = False,
+) -> Dict[str, str]:
+    """Ensure the GMT files are downloaded, fetching the missing ones concurrently.
+
+    :param species: The species whose GMT files are downloaded. Defaults to all in
+     :data:`bio2bel_wikipathways.constants.infos`.
+    :param directory: The directory in which the files and the manifest are stored. Defaults to :data:`DATA_DIR`,
+     where :attr:`SpeciesPathwayInfo.path` looks for them.
+    :param base_url: The host from which the files are downloaded
+    :param max_workers: The maximum number of concurrent downloads
+    :param force: If true, downloads all files again even if they are in the manifest
+    :return: A dictionary from taxonomy identifiers to the paths of the GMT files
+    :raises requests.RequestException: If a download fails, after the others finish and are recorded in the manifest
+    """
+    species = list(infos.values() if species is None else species)
+    directory = directory or DATA_DIR
+
+    manifest = read_manifest(directory)
+    if manifest.get('data_version') != DATA_VERSION:
+        manifest = {'data_version': DATA_VERSION, 'files': {}}
+
+    missing = [
+        info
+        for info in species
+        if force or not _is_valid(directory, manifest['files'].get(info.taxonomy_id))
+    ]
+    if missing:
+        logger.info('downloading %d GMT files with %d workers', len(missing), max_workers)
+        try:
+            _download_infos(missing, directory, base_url, max_workers, manifest['files'])
+        finally:
+            # the files that did finish are recorded, so the next run doesn't download them again
+            _write_manifest(directory, manifest)
+
+    return {
+        info.taxonomy_id: os.path.join(directory, manifest['files'][info.taxonomy_id]['file_name'])
+        for info in species
+    }
+
+
+def _download_infos(
+    species: List[SpeciesPathwayInfo],
+    directory: str,
+    base_url: str,
+    max_workers: int,
+    entries: Dict[str, Mapping[str, Any]],
+) -> None:
+    """Download the GMT files concurrently and put the manifest entry of each one in the entries as it finishes.
+
+    :raises requests.RequestException: The first error, once all the other downloads have finished
+    """
+    error = None
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(_download_info, info, directory, base_url): info for info in species}
+        for future in as_completed(futures):
+            info = futures[future]
+            try:
+                entries[info.taxonomy_id] = future.result()
+            except Exception as e:
+                logger.warning('could not download the GMT file for %s: %s', info.taxonomy_id, e)
+                error = error or e
+    if error is not None:
+        raise error
+
+
+def _download_info(info: SpeciesPathwayInfo, directory: str, base_url: str) -> Mapping[str, Any]:
+    url = info.get_url(base_url)
+    path = os.path.join(directory, info.file_name)
+    sha256 = download(url, path)
+    return {
+        'url': url,
+        'file_name': info.file_name,
+        'size': os.path.getsize(path),
+        'sha256': sha256,
+    }
+
+
+def download(url: str, path: str, *, timeout: float = 60.0) -> str:
+    """Download the URL to the path, resuming from a previous partial download if there is one.
+
+    The data are written to ``<path>.part`` and only moved to the path once complete.
+
+    :return: The SHA-256 checksum of the downloaded file
+    """
+    part_path = f'{path}.part'
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    headers = {'Range': f'bytes={offset}-'} if offset else {}
+
+    with requests.get(url, headers=headers, stream=True, timeout=timeout) as response:
+        if response.status_code == 416:  # the partial download was already complete
+            pass
+        else:
+            response.raise_for_status()
+            if offset and response.status_code != 206:
+                logger.info('server ignored the range request for %s, restarting the download', url)
+                offset = 0
+            elif offset:
+                logger.info('resuming the download of %s at byte %d', url, offset)
+            with open(part_path, 'ab' if offset else 'wb') as file:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    file.write(chunk)
+
+    os.replace(part_path, path)
+    return _sha256(path)
+
+
+def read_manifest(directory: Optional[str] = None) -> Dict[str, Any]:
+    """Read the manifest in the directory, or return an empty dictionary if there is none."""
+    path = os.path.join(directory or DATA_DIR, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as file:
+        return json.load(file)
+
+
+def _write_manifest(directory: str, manifest: Mapping[str, Any]) -> None:
+    path = os.path.join(directory, MANIFEST_NAME)
+    with open(f'{path}.tmp', 'w') as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+    os.replace(f'{path}.tmp', path)
+
+
+def _is_valid(directory: str, entry: Optional[Mapping[str, Any]]) -> bool:
+    """Check the manifest entry points to a file that has the recorded size and checksum."""
+    if entry is None:
+        return False
+    path = os.path.join(directory, entry['file_name'])
+    if not os.path.exists(path) or os.path.getsize(path) != entry['size']:
+        return False
+    return _sha256(path) == entry['sha256']
+
+
+def _sha256(path: str) -> str:
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(CHUNK_SIZE), b''):
+            sha256.update(chunk)
+    return sha256.hexdigest()
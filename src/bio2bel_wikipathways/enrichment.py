@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+
+"""A vectorized, in-memory gene set enrichment engine over the pathway memberships.
+
+The protein-pathway memberships are loaded once into a sparse pathways x genes matrix. A batch of gene lists is
+turned into a sparse genes x lists matrix, so one sparse matrix product gives the overlap of every pathway with every
+list. Hypergeometric p-values and Benjamini-Hochberg q-values are computed for all overlaps at once.
+
+Many named gene lists, e.g., read from a file with :func:`read_gene_lists`, are evaluated in batches with
+:func:`iter_enrichment`, optionally spread over a process pool, and written out as JSON lines with
+:func:`write_enrichment_jsonl`.
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Set, TextIO, Tuple
+
+import numpy as np
+from scipy import sparse
+from scipy.stats import hypergeom
+
+from .constants import ENRICHMENT_BATCH_SIZE
+from .utils import chunked
+
+__all__ = [
+    'MembershipMatrix',
+    'benjamini_hochberg',
+    'read_gene_lists',
+    'iter_enrichment',
+    'write_enrichment_jsonl',
+]
+
+EnrichmentResults = Dict[str, Dict[str, Any]]
+
+
+class MembershipMatrix:
+    """A sparse boolean matrix of pathways (rows) by genes (columns)."""
+
+    def __init__(
+        self,
+        pathway_ids: Sequence[str],
+        pathway_names: Sequence[str],
+        genes: Sequence[str],
+        matrix: sparse.csr_matrix,
+    ):
+        """Initialize the membership matrix.
+
+        :param pathway_ids: The pathway identifiers, in the order of the rows
+        :param pathway_names: The pathway names, in the order of the rows
+        :param genes: The genes, in the order of the columns
+        :param matrix: A CSR matrix with a one where a gene is a member of a pathway
+        """
+        self.pathway_ids = list(pathway_ids)
+        self.pathway_names = list(pathway_names)
+        self.genes = list(genes)
+        self.matrix = matrix
+        self.pathway_index = {pathway_id: i for i, pathway_id in enumerate(self.pathway_ids)}
+        self.gene_index = {gene: i for i, gene in enumerate(self.genes)}
+        self.pathway_sizes = np.diff(self.matrix.indptr)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[str, str, str]]) -> 'MembershipMatrix':
+        """Build the membership matrix from triples of pathway identifier, pathway name, and gene."""
+        pathway_index: Dict[str, int] = {}
+        pathway_names: List[str] = []
+        gene_index: Dict[str, int] = {}
+        row_indices, column_indices = [], []
+        for pathway_id, pathway_name, gene in rows:
+            row = pathway_index.get(pathway_id)
+            if row is None:
+                row = pathway_index[pathway_id] = len(pathway_index)
+                pathway_names.append(pathway_name)
+            column = gene_index.setdefault(gene, len(gene_index))
+            row_indices.append(row)
+            column_indices.append(column)
+
+        matrix = sparse.csr_matrix(
+            (np.ones(len(row_indices), dtype=np.int32), (row_indices, column_indices)),
+            shape=(len(pathway_index), len(gene_index)),
+        )
+        matrix.sum_duplicates()
+        matrix.data[:] = 1
+        return cls(list(pathway_index), pathway_names, list(gene_index), matrix)
+
+    @property
+    def number_pathways(self) -> int:  # noqa: D401
+        """The number of pathways."""
+        return self.matrix.shape[0]
+
+    @property
+    def number_genes(self) -> int:  # noqa: D401
+        """The number of genes in the universe, i.e., in at least one pathway."""
+        return self.matrix.shape[1]
+
+    def get_gene_set(self, pathway_id: str) -> Set[str]:
+        """Get the genes in the pathway."""
+        row = self.pathway_index.get(pathway_id)
+        if row is None:
+            return set()
+        return self._get_row_genes(row)
+
+    def _get_row_genes(self, row: int) -> Set[str]:
+        start, end = self.matrix.indptr[row], self.matrix.indptr[row + 1]
+        return {self.genes[column] for column in self.matrix.indices[start:end]}
+
+    def _build_query_matrix(self, gene_lists: Sequence[Iterable[str]]) -> Tuple[sparse.csc_matrix, np.ndarray]:
+        """Build a genes x lists matrix and the number of distinct genes from each list found in the universe."""
+        row_indices, column_indices = [], []
+        for column, genes in enumerate(gene_lists):
+            for row in {self.gene_index[gene] for gene in genes if gene in self.gene_index}:
+                row_indices.append(row)
+                column_indices.append(column)
+
+        query_matrix = sparse.csc_matrix(
+            (np.ones(len(row_indices), dtype=np.int32), (row_indices, column_indices)),
+            shape=(self.number_genes, len(gene_lists)),
+        )
+        return query_matrix, np.diff(query_matrix.indptr)
+
+    def query(
+        self,
+        gene_lists: Sequence[Iterable[str]],
+        *,
+        statistics: bool = True,
+        gene_sets: bool = True,
+    ) -> List[EnrichmentResults]:
+        """Calculate the enrichment of each gene list in each pathway it overlaps.
+
+        :param gene_lists: A sequence of gene lists
+        :param statistics: If true, adds the hypergeometric ``p_value`` and the Benjamini-Hochberg corrected
+         ``q_value`` to each result
+        :param gene_sets: If true, adds the ``pathway_gene_set`` to each result
+        :return: For each gene list, a dictionary from the identifiers of the pathways overlapping it to a result
+         dictionary in the format of :meth:`bio2bel.compath.CompathManager.query_hgnc_symbols`
+        """
+        query_matrix, query_sizes = self._build_query_matrix(gene_lists)
+        overlaps = (self.matrix @ query_matrix).tocsc()
+        overlaps.sort_indices()
+
+        rv = []
+        for column in range(len(gene_lists)):
+            start, end = overlaps.indptr[column], overlaps.indptr[column + 1]
+            rows = overlaps.indices[start:end]
+            counts = overlaps.data[start:end]
+
+            if statistics:
+                p_values = hypergeom.sf(counts - 1, self.number_genes, self.pathway_sizes[rows], query_sizes[column])
+                q_values = benjamini_hochberg(p_values, number_tests=self.number_pathways)
+
+            results = {}
+            for i, (row, count) in enumerate(zip(rows, counts)):
+                pathway_id = self.pathway_ids[row]
+                result = results[pathway_id] = {
+                    'pathway_id': pathway_id,
+                    'pathway_name': self.pathway_names[row],
+                    'mapped_proteins': int(count),
+                    'pathway_size': int(self.pathway_sizes[row]),
+                }
+                if gene_sets:
+                    result['pathway_gene_set'] = self._get_row_genes(row)
+                if statistics:
+                    result['p_value'] = float(p_values[i])
+                    result['q_value'] = float(q_values[i])
+            rv.append(results)
+
+        return rv
+
+
+def benjamini_hochberg(p_values: np.ndarray, number_tests: Optional[int] = None) -> np.ndarray:
+    """Calculate the Benjamini-Hochberg false discovery rate corrected q-values.
+
+    :param p_values: The p-values
+    :param number_tests: The total number of tests. Can be larger than the number of p-values if the remaining tests
+     all have a p-value of one, e.g., pathways without any overlap.
+    """
+    p_values = np.asarray(p_values, dtype=float)
+    if p_values.size == 0:
+        return p_values
+    number_tests = number_tests or p_values.size
+    order = np.argsort(p_values)
+    ranked = p_values[order] * number_tests / np.arange(1, p_values.size + 1)
+    ranked = np.minimum.accumulate(ranked[::-1])[::-1]
+    rv = np.empty_like(ranked)
+    rv[order] = np.minimum(ranked, 1.0)
+    return rv
+
+
+def read_gene_lists(path: str) -> Dict[str, List[str]]:
+    """Read named gene lists from a JSON or TSV file.
+
+    A JSON file (ending in ``.json``) contains an object from names to lists of genes. In a TSV file, the first
+    column of each line is a name and the remaining columns are genes, so both one line per list and one line per
+    gene work. Lines starting with ``#`` are skipped.
+    """
+    if path.endswith('.json'):
+        with open(path) as file:
+            return {name: list(genes) for name, genes in json.load(file).items()}
+
+    rv: Dict[str, List[str]] = {}
+    with open(path) as file:
+        for line in file:
+            line = line.rstrip('\n')
+            if not line or line.startswith('#'):
+                continue
+            name, *genes = line.split('\t')
+            rv.setdefault(name, []).extend(gene for gene in genes if gene)
+    return rv
+
+
+#: The membership matrix in each worker process of :func:`iter_enrichment`
+_worker_matrix: Optional[MembershipMatrix] = None
+
+
+def _initialize_worker(matrix: MembershipMatrix) -> None:
+    global _worker_matrix
+    _worker_matrix = matrix
+
+
+def _query_worker(gene_lists: Sequence[Iterable[str]], gene_sets: bool) -> List[EnrichmentResults]:
+    return _worker_matrix.query(gene_lists, gene_sets=gene_sets)
+
+
+def iter_enrichment(
+    matrix: MembershipMatrix,
+    gene_lists: Mapping[str, Iterable[str]],
+    *,
+    batch_size: int = ENRICHMENT_BATCH_SIZE,
+    processes: Optional[int] = None,
+    gene_sets: bool = True,
+) -> Iterable[Tuple[str, EnrichmentResults]]:
+    """Calculate the enrichment of many named gene lists and yield the results in the same order.
+
+    The lists are evaluated ``batch_size`` at a time with :meth:`MembershipMatrix.query`.
+
+    :param matrix: The membership matrix
+    :param gene_lists: A mapping from names to gene lists
+    :param batch_size: The number of lists evaluated with one sparse matrix product
+    :param processes: The number of worker processes. Defaults to 1, which evaluates the batches in this process.
+     If 0, uses the number of CPUs. The matrix is sent to each worker only once.
+    :param gene_sets: If false, leaves out the ``pathway_gene_set`` from the results
+    :yields: pairs of names and the enrichment results of their gene list
+    """
+    names = list(gene_lists)
+    batches = [
+        [gene_lists[name] for name in batch_names]
+        for batch_names in chunked(names, batch_size)
+    ]
+
+    if processes == 0:
+        processes = os.cpu_count() or 1
+    if not processes or processes == 1 or len(batches) < 2:
+        batch_results = (matrix.query(batch, gene_sets=gene_sets) for batch in batches)
+        yield from zip(names, (results for batch in batch_results for results in batch))
+        return
+
+    with ProcessPoolExecutor(max_workers=processes, initializer=_initialize_worker, initargs=(matrix,)) as executor:
+        batch_results = executor.map(_query_worker, batches, [gene_sets] * len(batches))
+        yield from zip(names, (results for batch in batch_results for results in batch))
+
+
+def write_enrichment_jsonl(results: Iterable[Tuple[str, EnrichmentResults]], file: TextIO) -> int:
+    """Write enrichment results as JSON lines, one line per gene list, with the pathways sorted by p-value.
+
+    :return: The number of lines written
+    """
+    count = 0
+    for name, pathways in results:
+        pathways = sorted(pathways.values(), key=lambda result: (result.get('p_value', 1.0), result['pathway_id']))
+        for result in pathways:
+            if 'pathway_gene_set' in result:
+                result['pathway_gene_set'] = sorted(result['pathway_gene_set'])
+        file.write(json.dumps({'name': name, 'pathways': pathways}) + '\n')
+        count += 1
+    return count
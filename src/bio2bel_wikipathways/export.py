@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+
+"""Writers that stream the protein-pathway memberships as BEL, node-link JSON lines, or a TSV edge list.
+
+Each writer takes an iterable of :class:`ExportedPathway`, like the one from
+:meth:`bio2bel_wikipathways.Manager.iter_exported_pathways`, and writes each pathway as soon as it is read, so only one
+pathway is kept in memory at a time. Only the proteins with an HGNC identifier are written, since the others can't be
+represented as PyBEL nodes.
+"""
+
+import json
+from typing import Callable, Iterable, List, Mapping, NamedTuple, Optional, TextIO
+
+from bel_resources import make_knowledge_header
+
+import pybel.dsl
+from pybel import BELGraph
+from pybel.constants import CITATION_TYPE_PUBMED, PART_OF, PYBEL_AUTOEVIDENCE, PYBEL_PUBMED, SET_CITATION_FMT
+from pybel.io.nodelink import to_nodelink
+from .constants import HGNC, WIKIPATHWAYS
+
+__all__ = [
+    'ExportedProtein',
+    'ExportedPathway',
+    'EXPORT_FORMATS',
+    'TSV_HEADER',
+    'write_bel',
+    'write_nodelink_jsonl',
+    'write_tsv',
+]
+
+#: The columns of the TSV edge list
+TSV_HEADER = [
+    'source_namespace', 'source_identifier', 'source_name',
+    'relation',
+    'target_namespace', 'target_identifier', 'target_name',
+]
+
+
+class ExportedProtein(NamedTuple):
+    """A protein of a pathway."""
+
+    entrez_id: str
+    hgnc_id: Optional[str]
+    hgnc_symbol: Optional[str]
+
+    def to_pybel(self) -> pybel.dsl.Protein:
+        """Build the PyBEL node, like :meth:`bio2bel_wikipathways.models.Protein.to_pybel`."""
+        return pybel.dsl.Protein(namespace=HGNC, name=self.hgnc_symbol, identifier=self.hgnc_id)
+
+
+class ExportedPathway(NamedTuple):
+    """A pathway with its species and proteins."""
+
+    identifier: str
+    name: str
+    revision: Optional[str]
+    taxonomy_id: str
+    species_name: str
+    proteins: List[ExportedProtein]
+
+    def to_pybel(self) -> pybel.dsl.BiologicalProcess:
+        """Build the PyBEL node, like :meth:`bio2bel_wikipathways.models.Pathway.to_pybel`."""
+        return pybel.dsl.BiologicalProcess(namespace=WIKIPATHWAYS, name=self.name, identifier=self.identifier)
+
+    def iter_hgnc_proteins(self) -> Iterable[ExportedProtein]:
+        """Iterate over the proteins that have an HGNC identifier."""
+        return (protein for protein in self.proteins if protein.hgnc_id)
+
+
+def write_bel(
+    pathways: Iterable[ExportedPathway],
+    file: TextIO,
+    *,
+    name: str,
+    version: str,
+) -> int:
+    """Write a BEL script with a ``partOf`` statement from each protein to its pathway.
+
+    The statements are the same as the ones :func:`pybel.to_bel_script` writes for
+    :meth:`bio2bel.compath.CompathManager.to_bel`, but the graph is never built.
+
+    :return: The number of statements written
+    """
+    for line in make_knowledge_header(name=name, version=version):
+        file.write(f'{line}\n')
+    file.write(f'{SET_CITATION_FMT.format(CITATION_TYPE_PUBMED, PYBEL_PUBMED)}\n')
+    file.write(f'SET SupportingText = "{PYBEL_AUTOEVIDENCE}"\n')
+
+    rv = 0
+    for pathway in pathways:
+        pathway_bel = pathway.to_pybel().as_bel()
+        for protein in pathway.iter_hgnc_proteins():
+            file.write(f'{protein.to_pybel().as_bel()} {PART_OF} {pathway_bel}\n')
+            rv += 1
+
+    file.write('UNSET SupportingText\n')
+    file.write('UNSET Citation\n')
+    return rv
+
+
+def write_nodelink_jsonl(
+    pathways: Iterable[ExportedPathway],
+    file: TextIO,
+    *,
+    name: str,
+    version: str,
+) -> int:
+    """Write a line of node-link JSON for the BEL graph of each pathway.
+
+    Each line can be read with :func:`pybel.from_nodelink`. Unlike in the BEL script, the pathways without any
+    proteins are written too, as graphs with only the pathway's node.
+
+    :return: The number of ``partOf`` edges written
+    """
+    rv = 0
+    for pathway in pathways:
+        graph = BELGraph(name=f'{name} - {pathway.identifier}', version=version)
+        node = pathway.to_pybel()
+        graph.add_node_from_data(node)
+        for protein in pathway.iter_hgnc_proteins():
+            graph.add_part_of(protein.to_pybel(), node)
+            rv += 1
+        file.write(f'{json.dumps(to_nodelink(graph), ensure_ascii=False)}\n')
+    return rv
+
+
+def write_tsv(
+    pathways: Iterable[ExportedPathway],
+    file: TextIO,
+    *,
+    name: Optional[str] = None,
+    version: Optional[str] = None,
+) -> int:
+    """Write an edge list with the columns in :data:`TSV_HEADER` and a ``partOf`` edge from each protein per line.
+
+    The name and version are accepted so all writers can be called the same way, but are not written.
+
+    :return: The number of edges written
+    """
+    file.write('\t'.join(TSV_HEADER) + '\n')
+    rv = 0
+    for pathway in pathways:
+        for protein in pathway.iter_hgnc_proteins():
+            file.write('\t'.join((
+                HGNC, protein.hgnc_id, protein.hgnc_symbol or '',
+                PART_OF,
+                WIKIPATHWAYS, pathway.identifier, pathway.name,
+            )) + '\n')
+            rv += 1
+    return rv
+
+
+#: The writers for each format of :meth:`bio2bel_wikipathways.Manager.export`
+EXPORT_FORMATS: Mapping[str, Callable[..., int]] = {
+    'bel': write_bel,
+    'nodelink': write_nodelink_jsonl,
+    'tsv': write_tsv,
+}
@@ -2,20 +2,52 @@
 
 """This module populates the tables of bio2bel_wikipathways."""
 
+from __future__ import annotations
+
 import logging
+import os
 import sys
-from typing import List, Mapping, Optional
+from contextlib import contextmanager, nullcontext
+from math import ceil
+from operator import attrgetter
+from typing import (
+    Any, Callable, ContextManager, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Set, TYPE_CHECKING,
+    TextIO, Tuple, TypeVar,
+)
 
 import click
-from flask_admin.contrib.sqla import ModelView
+from sqlalchemy import Column, Table, and_, bindparam, inspect, select
+from sqlalchemy.orm import selectinload
 from tqdm import tqdm
 
+import pybel.dsl
 from bio2bel.compath import CompathManager
-from pyobo import get_filtered_xrefs, get_id_name_mapping, get_name_id_mapping
+from pybel import BELGraph
+from pybel.constants import PART_OF, RELATION
+from pybel.struct.graph import hash_edge
 from pyobo.cli_utils import verbose_option
-from pyobo.sources.wikipathways import parse_wikipathways_gmt
-from .constants import MODULE_NAME, SPECIES_REMAPPING, infos
-from .models import Base, Pathway, Protein, Species, protein_pathway
+from .cache import LRUCache
+from .constants import (
+    BASE_URL, BULK_CHUNK_SIZE, DATA_VERSION, ENRICHMENT_BATCH_SIZE, MODULE_NAME, PATHWAY_CACHE_SIZE, QUERY_CHUNK_SIZE,
+    RELEASE_CACHE_SIZE, RELEASE_KEYFRAME_INTERVAL, infos,
+)
+from .download import prefetch
+from .export import EXPORT_FORMATS, ExportedPathway, ExportedProtein
+from .models import Base, Pathway, Protein, Release, ReleasePathway, Species, protein_pathway, release_membership
+from .parser import ParsedGMT, iter_gmts
+from .profiling import PhaseRecord, Profiler, profile_option
+from .snapshot import Snapshot, write_snapshot
+from .utils import chunked, get_version
+
+if TYPE_CHECKING:
+    from flask_admin.contrib.sqla import ModelView
+
+    from .aio import AsyncManager
+    from .enrichment import EnrichmentResults, MembershipMatrix
+    from .mappings import MappingCache
+    from .releases import ReleaseDiff, ReleasedPathway
+    from .resolver import IdentifierIndex, ResolvedProtein
+    from .similarity import PathwaySimilarities
 
 __all__ = [
     'Manager',
@@ -24,24 +56,53 @@ __all__ = [
 logger = logging.getLogger(__name__)
 logging.getLogger("urllib3").setLevel(logging.WARNING)
 
+X = TypeVar('X')
+
 
-class PathwayView(ModelView):
-    """Pathway view in Flask-admin."""
+def _get_view(name: str) -> Callable[..., ModelView]:
+    """Get a function that makes the Flask-Admin view with the given name from :mod:`bio2bel_wikipathways.views`.
 
-    column_searchable_list = (
-        Pathway.identifier,
-        Pathway.name,
-    )
+    The views are only imported when the Flask-Admin interface is built.
+    """
+    def _make_view(model, session) -> ModelView:
+        from . import views
+        return getattr(views, name)(model, session)
 
+    return _make_view
 
-class ProteinView(ModelView):
-    """Protein view in Flask-admin."""
 
-    column_searchable_list = (
-        Protein.entrez_id,
-        Protein.hgnc_symbol,
-        Protein.hgnc_id,
-    )
+class CachedPathway(NamedTuple):
+    """The PyBEL nodes of a pathway and its proteins, cached by the manager."""
+
+    name: str
+    node: pybel.dsl.BiologicalProcess
+    proteins: Tuple[pybel.dsl.Protein, ...]
+    #: The keys of the ``partOf`` edges from each protein to the pathway
+    keys: Tuple[str, ...]
+
+    @classmethod
+    def from_pathway(cls, pathway: Pathway) -> CachedPathway:
+        """Build the nodes and edge keys of a pathway."""
+        node = pathway.to_pybel()
+        proteins = tuple(protein.to_pybel() for protein in pathway.proteins)
+        return cls(
+            name=str(pathway),
+            node=node,
+            proteins=proteins,
+            keys=tuple(hash_edge(protein, node, {RELATION: PART_OF}) for protein in proteins),
+        )
+
+
+def add_to_bel_graph(graph: BELGraph, cached_pathways: Iterable[CachedPathway]) -> None:
+    """Add the ``partOf`` edges from the proteins of each pathway to the pathway to a BEL graph.
+
+    This gives the same graph as :meth:`bio2bel.compath.CompathPathwayMixin.add_to_bel_graph` for each pathway. It
+    reuses the precomputed edge keys and skips the existence check, since an existing edge has the same data. Hashing
+    PyBEL nodes is expensive, so this takes about half as many hashes per edge.
+    """
+    for cached_pathway in cached_pathways:
+        for protein, key in zip(cached_pathway.proteins, cached_pathway.keys):
+            graph.add_edge(protein, cached_pathway.node, key=key, **{RELATION: PART_OF})
 
 
 class Manager(CompathManager):
@@ -51,9 +112,10 @@ class Manager(CompathManager):
     _base = Base
     edge_model = protein_pathway
     flask_admin_models = [
-        (Pathway, PathwayView),
-        (Protein, ProteinView),
+        (Pathway, _get_view('PathwayView')),
+        (Protein, _get_view('ProteinView')),
         Species,
+        Release,
     ]
     namespace_model = pathway_model = Pathway
     protein_model = Protein
@@ -64,6 +126,25 @@ class Manager(CompathManager):
     identifiers_namespace = 'wikipathways'
     identifiers_url = 'http://identifiers.org/wikipathways/'
 
+    _mapping_cache: Optional[MappingCache] = None
+    _membership_matrices: Optional[Dict[Optional[str], MembershipMatrix]] = None
+    _profiler: Optional[Profiler] = None
+    _similarities: Optional[Dict[Tuple[Any, ...], PathwaySimilarities]] = None
+    _identifier_index: Optional[IdentifierIndex] = None
+
+    #: The directory where :meth:`get_pathway_similarities` caches its results. Defaults to a subdirectory of
+    #: :data:`bio2bel_wikipathways.constants.DATA_DIR`.
+    similarity_cache_directory: Optional[str] = None
+
+    #: The maximum number of pathways whose PyBEL nodes are cached for :meth:`get_pathway_graph`,
+    #: :meth:`enrich_pathways`, and :meth:`enrich_proteins`
+    pathway_cache_size: int = PATHWAY_CACHE_SIZE
+    _pathway_cache: Optional[LRUCache[str, Optional[CachedPathway]]] = None
+
+    #: The maximum number of releases whose content is cached for :meth:`get_release`
+    release_cache_size: int = RELEASE_CACHE_SIZE
+    _release_cache: Optional[LRUCache[str, Dict[str, ReleasedPathway]]] = None
+
     def summarize(self) -> Mapping[str, int]:
         """Summarize the database."""
         return {
@@ -72,6 +153,477 @@ class Manager(CompathManager):
             'species': self._count_model(Species),
         }
 
+    def ensure_indexes(self) -> List[str]:
+        """Create the indexes defined on the models that are missing from an existing database.
+
+        :meth:`create_all` skips tables that already exist, so databases created with an older version of this
+        package don't get indexes that were added to the models later. This is safe to run more than once.
+
+        :return: The names of the indexes that were created
+        :raises sqlalchemy.exc.IntegrityError: If a unique index can not be created because of duplicate values
+        """
+        inspector = inspect(self.engine)
+        existing_tables = set(inspector.get_table_names())
+
+        created = []
+        for table in self._metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing_indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+            for index in sorted(table.indexes, key=attrgetter('name')):
+                if index.name in existing_indexes:
+                    continue
+                logger.info('creating index %s on %s', index.name, table.name)
+                index.create(self.engine)
+                created.append(index.name)
+
+        return created
+
+    @property
+    def membership_matrix(self) -> MembershipMatrix:  # noqa: D401
+        """The sparse pathway-gene membership matrix of all species, loaded from the database on first use."""
+        return self.get_membership_matrix()
+
+    def get_membership_matrix(self, taxonomy_id: Optional[str] = None) -> MembershipMatrix:
+        """Get the sparse pathway-gene membership matrix used for enrichment, loading it on first use.
+
+        :param taxonomy_id: If given, only the pathways of this species are in the matrix, so only its genes make
+         up the background of the enrichment
+        """
+        if self._membership_matrices is None:
+            self._membership_matrices = {}
+        matrix = self._membership_matrices.get(taxonomy_id)
+        if matrix is None:
+            from .enrichment import MembershipMatrix
+            query = self.session.query(Pathway.identifier, Pathway.name, Protein.hgnc_symbol).join(
+                Pathway.proteins,
+            ).filter(Protein.hgnc_symbol.isnot(None)).order_by(Pathway.id)
+            if taxonomy_id is not None:
+                query = query.join(Pathway.species).filter(Species.taxonomy_id == taxonomy_id)
+            with self._profile('load_membership_matrix') as info:
+                matrix = self._membership_matrices[taxonomy_id] = MembershipMatrix.from_rows(query)
+                info['rows'] = matrix.matrix.nnz
+        return matrix
+
+    @property
+    def pathway_cache(self) -> LRUCache[str, Optional[CachedPathway]]:  # noqa: D401
+        """The cache of the PyBEL nodes of pathways. Use its :meth:`LRUCache.info` to get the hits and misses."""
+        if self._pathway_cache is None:
+            self._pathway_cache = LRUCache(self.pathway_cache_size)
+        return self._pathway_cache
+
+    @property
+    def release_cache(self) -> LRUCache[str, Dict[str, ReleasedPathway]]:  # noqa: D401
+        """The cache of the content of releases, replayed from their deltas by :meth:`get_release`."""
+        if self._release_cache is None:
+            self._release_cache = LRUCache(self.release_cache_size)
+        return self._release_cache
+
+    def clear_caches(self) -> None:
+        """Clear the membership matrices and the pathway cache so they are reloaded from the database on next use.
+
+        This is done automatically when this manager changes the database.
+        """
+        self._membership_matrices = None
+        self._similarities = None
+        self._identifier_index = None
+        self.pathway_cache.clear()
+        self.release_cache.clear()
+
+    @contextmanager
+    def profiling(
+        self,
+        path: Optional[str] = None,
+        *,
+        callback: Optional[Callable[[PhaseRecord], None]] = None,
+        metadata: Optional[Mapping[str, Any]] = None,
+    ) -> Iterator[Profiler]:
+        """Record the timings, rows, and SQL statements of the phases of the manager's calls made in this context.
+
+        .. code-block:: python
+
+            with manager.profiling('profile.json', callback=print):
+                manager.populate(bulk=True)
+
+        :param path: If given, the JSON report of the profiler is written there when the context exits
+        :param callback: A function that is called with each :class:`PhaseRecord` as soon as its phase ends
+        :param metadata: Extra information to put in the report, like the data version
+        :yields: The profiler, whose :attr:`Profiler.records` fill up as the phases end
+        """
+        profiler = Profiler(self.engine)
+        if callback is not None:
+            profiler.add_callback(callback)
+
+        previous_profiler, self._profiler = self._profiler, profiler
+        profiler.start()
+        try:
+            yield profiler
+        finally:
+            profiler.stop()
+            self._profiler = previous_profiler
+            if path is not None:
+                profiler.write_report(path, metadata=metadata)
+
+    def _profile(self, name: str) -> ContextManager[Dict[str, Any]]:
+        """Record a phase if profiling, otherwise do nothing."""
+        if self._profiler is None:
+            return nullcontext({})
+        return self._profiler.phase(name)
+
+    def _iter_profiled(self, name: str, iterable: Iterable[X]) -> Iterable[X]:
+        """Iterate over the iterable, recording the time it takes to get each element as a phase."""
+        iterator = iter(iterable)
+        while True:
+            with self._profile(name):
+                try:
+                    element = next(iterator)
+                except StopIteration:
+                    return
+            yield element
+
+    def _get_cached_pathway(self, pathway_id: str) -> Optional[CachedPathway]:
+        return self.pathway_cache.get(pathway_id, self._build_cached_pathway)
+
+    def _build_cached_pathway(self, pathway_id: str) -> Optional[CachedPathway]:
+        pathway = self.get_pathway_by_id(pathway_id)
+        return None if pathway is None else CachedPathway.from_pathway(pathway)
+
+    def get_cached_pathways(self, pathway_ids: Iterable[str]) -> Dict[str, Optional[CachedPathway]]:
+        """Get the cached nodes of many pathways, loading all that are missing from the cache at once.
+
+        :return: A dictionary from the pathway identifiers to their cached nodes, or None if they don't exist
+        """
+        return self.pathway_cache.get_many(pathway_ids, self._build_cached_pathways)
+
+    def _build_cached_pathways(self, pathway_ids: List[str]) -> Dict[str, Optional[CachedPathway]]:
+        pathways = self.get_pathways_by_ids(pathway_ids, load_proteins=True)
+        return {
+            pathway_id: CachedPathway.from_pathway(pathways[pathway_id]) if pathway_id in pathways else None
+            for pathway_id in pathway_ids
+        }
+
+    def get_pathway_graph(self, pathway_id: str) -> Optional[BELGraph]:
+        """Return a new graph corresponding to the pathway, built from the pathway cache.
+
+        :param pathway_id: A pathway identifier
+        """
+        cached_pathway = self._get_cached_pathway(pathway_id)
+        if cached_pathway is None:
+            return None
+
+        graph = BELGraph(name=cached_pathway.name)
+        add_to_bel_graph(graph, [cached_pathway])
+        return graph
+
+    def enrich_pathways(self, graph: BELGraph) -> None:
+        """Enrich all proteins belonging to pathway nodes in the graph, using the pathway cache.
+
+        The pathways missing from the cache are loaded with their proteins in a few ``IN`` queries, and all edges are
+        added at once.
+        """
+        pathway_ids = {
+            node.identifier
+            for node in graph
+            if isinstance(node, pybel.dsl.BiologicalProcess) and node.namespace.lower() == self.module_name
+            if node.identifier
+        }
+        with self._profile('enrich_pathways') as info:
+            self._add_pathways_to_bel_graph(graph, pathway_ids)
+            info['rows'] = len(pathway_ids)
+
+    def enrich_proteins(self, graph: BELGraph) -> None:
+        """Enrich all pathways associated with proteins in the graph, using the pathway cache.
+
+        The pathways of all proteins are looked up in a few ``IN`` queries, then added like in
+        :meth:`enrich_pathways`.
+        """
+        hgnc_ids = {
+            node.identifier
+            for node in graph
+            if isinstance(node, pybel.dsl.CentralDogma) and node.namespace.lower() == 'hgnc' and node.identifier
+        }
+        with self._profile('enrich_proteins') as info:
+            self._add_pathways_to_bel_graph(graph, self.get_pathway_ids_by_hgnc_ids(hgnc_ids))
+            info['rows'] = len(hgnc_ids)
+
+    def _add_pathways_to_bel_graph(self, graph: BELGraph, pathway_ids: Iterable[str]) -> None:
+        cached_pathways = self.get_cached_pathways(pathway_ids)
+        for pathway_id, cached_pathway in cached_pathways.items():
+            if cached_pathway is None:
+                logger.warning('could not find pathway %s', pathway_id)
+        add_to_bel_graph(graph, filter(None, cached_pathways.values()))
+
+    def get_pathway_ids_by_hgnc_ids(self, hgnc_ids: Iterable[str], taxonomy_id: Optional[str] = None) -> Set[str]:
+        """Get the identifiers of the pathways that contain proteins with the given HGNC identifiers.
+
+        The identifiers are looked up with one ``IN`` query per chunk of :data:`QUERY_CHUNK_SIZE` identifiers.
+
+        :param hgnc_ids: HGNC identifiers
+        :param taxonomy_id: If given, only gets the pathways of this species
+        """
+        query = self.session.query(Pathway.identifier).join(Pathway.proteins).distinct().filter(
+            Protein.hgnc_id.in_(bindparam('values', expanding=True)),
+        )
+        if taxonomy_id is not None:
+            query = query.join(Pathway.species).filter(Species.taxonomy_id == taxonomy_id)
+        with self._profile('get_pathway_ids_by_hgnc_ids') as info:
+            rv = {
+                pathway_id
+                for chunk in chunked(set(hgnc_ids), QUERY_CHUNK_SIZE)
+                for pathway_id, in query.params(values=chunk)
+            }
+            info['rows'] = len(rv)
+        return rv
+
+    def enrich_gene_lists(
+        self,
+        gene_lists: Mapping[str, Iterable[str]],
+        *,
+        batch_size: int = ENRICHMENT_BATCH_SIZE,
+        processes: Optional[int] = None,
+        gene_sets: bool = True,
+        taxonomy_id: Optional[str] = None,
+        resolve: bool = False,
+    ) -> Iterable[Tuple[str, EnrichmentResults]]:
+        """Calculate the enrichment of many named lists of HGNC gene symbols against the membership matrix.
+
+        The membership matrix is loaded from the database once and each batch of lists is evaluated with one sparse
+        matrix product, so no list triggers its own queries.
+
+        :param gene_lists: A mapping from names to iterables of HGNC gene symbols or, with ``resolve``, of any
+         identifiers :meth:`resolve_genes` accepts
+        :param batch_size: The number of lists evaluated at once
+        :param processes: The number of worker processes. Defaults to evaluating in this process. If 0, uses the
+         number of CPUs.
+        :param gene_sets: If false, leaves out the ``pathway_gene_set`` from the results
+        :param taxonomy_id: If given, only enriches against the pathways of this species
+        :param resolve: If true, resolves the genes to HGNC gene symbols with :attr:`identifier_index` first
+        :yields: pairs of names and the results of :meth:`enrich_hgnc_symbols` for their list, in the given order
+        """
+        from .enrichment import iter_enrichment
+        if resolve:
+            to_hgnc_symbols = self.identifier_index.to_hgnc_symbols
+            gene_lists = {name: to_hgnc_symbols(genes) for name, genes in gene_lists.items()}
+        return self._iter_profiled('enrich_gene_lists', iter_enrichment(
+            self.get_membership_matrix(taxonomy_id),
+            gene_lists,
+            batch_size=batch_size,
+            processes=processes,
+            gene_sets=gene_sets,
+        ))
+
+    @property
+    def identifier_index(self) -> IdentifierIndex:  # noqa: D401
+        """The index resolving Entrez gene identifiers, HGNC identifiers, and symbols, built on first use."""
+        if self._identifier_index is None:
+            from .resolver import IdentifierIndex, IndexedPathway, ResolvedProtein
+            with self._profile('load_identifier_index') as info:
+                self._identifier_index = IdentifierIndex(
+                    proteins=(
+                        ResolvedProtein(*row)
+                        for row in self.session.query(Protein.entrez_id, Protein.hgnc_id, Protein.hgnc_symbol)
+                        .order_by(Protein.id)
+                    ),
+                    pathways=(
+                        IndexedPathway(*row)
+                        for row in self.session.query(Pathway.identifier, Pathway.name).order_by(Pathway.id)
+                    ),
+                )
+                info['rows'] = len(self._identifier_index)
+        return self._identifier_index
+
+    def resolve_genes(self, identifiers: Iterable[str]) -> Dict[str, Optional[ResolvedProtein]]:
+        """Resolve a mix of Entrez gene identifiers, prefixed HGNC identifiers, and HGNC gene symbols to proteins.
+
+        :return: A dictionary from each identifier to its protein, or None if it isn't in the database
+        """
+        return self.identifier_index.resolve_many(identifiers)
+
+    def query_genes(self, identifiers: Iterable[str], taxonomy_id: Optional[str] = None) -> Mapping[str, Mapping]:
+        """Like :meth:`query_hgnc_symbols`, but for a mix of identifiers resolved with :meth:`resolve_genes`."""
+        return self.query_hgnc_symbols(self.identifier_index.to_hgnc_symbols(identifiers), taxonomy_id=taxonomy_id)
+
+    def enrich_genes(self, identifiers: Iterable[str], taxonomy_id: Optional[str] = None) -> Mapping[str, Mapping]:
+        """Like :meth:`enrich_hgnc_symbols`, but for a mix of identifiers resolved with :meth:`resolve_genes`."""
+        return self.enrich_hgnc_symbols(self.identifier_index.to_hgnc_symbols(identifiers), taxonomy_id=taxonomy_id)
+
+    def get_pathway_similarities(
+        self,
+        taxonomy_id: Optional[str] = None,
+        *,
+        method: str = 'exact',
+        min_shared: int = 1,
+        min_jaccard: float = 0.0,
+        number_permutations: int = 128,
+        bands: int = 32,
+        seed: int = 0,
+        use_cache: bool = True,
+    ) -> PathwaySimilarities:
+        """Compute the Jaccard index, overlap coefficient, and hypergeometric p-value of all overlapping pathway pairs.
+
+        The pathways are compared by the Entrez gene identifiers of their proteins, so pathways of all species are
+        covered. The results are kept in memory until the database changes and saved in
+        :attr:`similarity_cache_directory` in a file named after the data version and a digest of the memberships and
+        parameters, so they are only computed again when either changes.
+
+        :param taxonomy_id: If given, only compares the pathways of this species, whose genes are then the universe
+         of the hypergeometric test
+        :param method: ``exact`` compares all pairs with sparse matrix products. ``minhash`` only compares the pairs
+         that MinHash LSH finds to be likely similar, which is faster for very large collections but misses some
+         pairs with low Jaccard indexes.
+        :param min_shared: Only keep the pairs sharing at least this many genes
+        :param min_jaccard: Only keep the pairs with at least this Jaccard index
+        :param number_permutations: The length of the MinHash signatures, for the ``minhash`` method
+        :param bands: The number of LSH bands, for the ``minhash`` method. More bands find less similar pairs.
+        :param seed: The seed of the MinHash functions, for the ``minhash`` method
+        :param use_cache: If false, neither reads nor writes the cache files
+        :raises ValueError: If the method is unknown
+        """
+        from .similarity import (
+            PathwaySimilarities, SIMILARITY_METHODS, compute_approximate_similarities, compute_similarities,
+            get_matrix_digest,
+        )
+        if method not in SIMILARITY_METHODS:
+            raise ValueError(f'unknown method: {method}. Use one of: {", ".join(SIMILARITY_METHODS)}')
+
+        parameters = {
+            'taxonomy_id': taxonomy_id,
+            'method': method,
+            'min_shared': min_shared,
+            'min_jaccard': min_jaccard,
+        }
+        if method == 'minhash':
+            parameters.update(number_permutations=number_permutations, bands=bands, seed=seed)
+
+        key = tuple(sorted(parameters.items()))
+        if self._similarities is None:
+            self._similarities = {}
+        rv = self._similarities.get(key)
+        if rv is not None:
+            return rv
+
+        with self._profile('load_similarity_matrix') as info:
+            matrix = self._get_entrez_membership_matrix(taxonomy_id)
+            info['rows'] = matrix.matrix.nnz
+
+        path = None
+        if use_cache:
+            digest = get_matrix_digest(matrix, **parameters)
+            path = os.path.join(self._get_similarity_cache_directory(), f'similarities-{DATA_VERSION}-{digest}.npz')
+            if os.path.exists(path):
+                logger.info('loading pathway similarities from %s', path)
+                rv = self._similarities[key] = PathwaySimilarities.load(path)
+                return rv
+
+        metadata = {'data_version': DATA_VERSION, 'package_version': get_version(), **parameters}
+        with self._profile(f'compute_similarities_{method}') as info:
+            if method == 'exact':
+                rv = compute_similarities(matrix, min_shared=min_shared, min_jaccard=min_jaccard, metadata=metadata)
+            else:
+                rv = compute_approximate_similarities(
+                    matrix,
+                    number_permutations=number_permutations,
+                    bands=bands,
+                    seed=seed,
+                    min_shared=min_shared,
+                    min_jaccard=min_jaccard,
+                    metadata=metadata,
+                )
+            info['rows'] = len(rv)
+
+        if path is not None:
+            rv.save(path)
+        self._similarities[key] = rv
+        return rv
+
+    def _get_similarity_cache_directory(self) -> str:
+        directory = self.similarity_cache_directory
+        if directory is None:
+            from .constants import DATA_DIR
+            directory = os.path.join(DATA_DIR, 'similarities')
+        os.makedirs(directory, exist_ok=True)
+        return directory
+
+    def _get_entrez_membership_matrix(self, taxonomy_id: Optional[str] = None) -> MembershipMatrix:
+        """Load a membership matrix whose genes are the Entrez gene identifiers of the proteins."""
+        from .enrichment import MembershipMatrix
+        query = self.session.query(Pathway.identifier, Pathway.name, Protein.entrez_id).join(
+            Pathway.proteins,
+        ).order_by(Pathway.id, Protein.id)
+        if taxonomy_id is not None:
+            query = query.join(Pathway.species).filter(Species.taxonomy_id == taxonomy_id)
+        return MembershipMatrix.from_rows(query)
+
+    def drop_all(self, check_first: bool = True):
+        """Drop all tables from the database and clear the caches."""
+        super().drop_all(check_first=check_first)
+        self.clear_caches()
+
+    def to_async(self, **kwargs) -> AsyncManager:
+        """Get an asyncio counterpart to the read-side methods of this manager that shares its engine and caches.
+
+        :param kwargs: Keyword arguments passed to :class:`bio2bel_wikipathways.aio.AsyncManager`, like
+         ``max_workers``
+        """
+        from .aio import AsyncManager
+        return AsyncManager(self, **kwargs)
+
+    def query_hgnc_symbols(
+        self,
+        hgnc_symbols: Iterable[str],
+        taxonomy_id: Optional[str] = None,
+    ) -> Mapping[str, Mapping]:
+        """Calculate the pathway counter dictionary using the in-memory membership matrix.
+
+        :param hgnc_symbols: An iterable of HGNC gene symbols to be queried
+        :param taxonomy_id: If given, only queries the pathways of this species
+        :return: Enriched pathways with mapped pathways/total
+        """
+        matrix = self.get_membership_matrix(taxonomy_id)
+        with self._profile('query_hgnc_symbols') as info:
+            rv = matrix.query([hgnc_symbols], statistics=False)[0]
+            info['rows'] = len(rv)
+        return rv
+
+    def enrich_hgnc_symbols(
+        self,
+        hgnc_symbols: Iterable[str],
+        taxonomy_id: Optional[str] = None,
+    ) -> Mapping[str, Mapping]:
+        """Calculate the enrichment of the HGNC gene symbols in each pathway.
+
+        :param hgnc_symbols: An iterable of HGNC gene symbols to be queried
+        :param taxonomy_id: If given, only enriches against the pathways of this species
+        :return: The same as :meth:`query_hgnc_symbols` with an additional hypergeometric ``p_value`` and
+         Benjamini-Hochberg corrected ``q_value`` for each pathway
+        """
+        matrix = self.get_membership_matrix(taxonomy_id)
+        with self._profile('enrich_hgnc_symbols') as info:
+            rv = matrix.query([hgnc_symbols])[0]
+            info['rows'] = len(rv)
+        return rv
+
+    def enrich_hgnc_symbols_batch(
+        self,
+        hgnc_symbols_lists: Iterable[Iterable[str]],
+        *,
+        gene_sets: bool = True,
+        taxonomy_id: Optional[str] = None,
+    ) -> List[Mapping[str, Mapping]]:
+        """Calculate the enrichment of several lists of HGNC gene symbols with one sparse matrix product.
+
+        :param hgnc_symbols_lists: An iterable of iterables of HGNC gene symbols
+        :param gene_sets: If false, leaves out the ``pathway_gene_set`` from the results, which is faster for
+         large batches
+        :param taxonomy_id: If given, only enriches against the pathways of this species
+        :return: The results of :meth:`enrich_hgnc_symbols` for each list, in the same order
+        """
+        matrix = self.get_membership_matrix(taxonomy_id)
+        with self._profile('enrich_hgnc_symbols_batch') as info:
+            hgnc_symbols_lists = list(hgnc_symbols_lists)
+            info['rows'] = len(hgnc_symbols_lists)
+            return matrix.query(hgnc_symbols_lists, gene_sets=gene_sets)
+
     def get_or_create_pathway(
         self,
         *,
@@ -126,97 +678,1116 @@ class Manager(CompathManager):
         """Get a protein by its Entrez gene identifier."""
         return self.session.query(Protein).filter(Protein.entrez_id == entrez_id).one_or_none()
 
-    def populate(self, paths: Optional[Mapping[str, str]] = None):
+    def get_proteins_by_entrez_ids(self, entrez_ids: Iterable[str]) -> Dict[str, Protein]:
+        """Get a dictionary from Entrez gene identifiers to the proteins already in the database.
+
+        The identifiers are looked up with one ``IN`` query per chunk of :data:`QUERY_CHUNK_SIZE` identifiers.
+        """
+        query = self.session.query(Protein).filter(Protein.entrez_id.in_(bindparam('values', expanding=True)))
+        return {
+            protein.entrez_id: protein
+            for chunk in chunked(set(entrez_ids), QUERY_CHUNK_SIZE)
+            for protein in query.params(values=chunk)
+        }
+
+    def get_pathways_by_ids(self, pathway_ids: Iterable[str], *, load_proteins: bool = False) -> Dict[str, Pathway]:
+        """Get a dictionary from WikiPathways identifiers to the pathways already in the database.
+
+        The identifiers are looked up with one ``IN`` query per chunk of :data:`QUERY_CHUNK_SIZE` identifiers.
+
+        :param pathway_ids: WikiPathways identifiers
+        :param load_proteins: If true, also loads the proteins of all pathways with one more query per chunk
+        """
+        query = self.session.query(Pathway).filter(Pathway.identifier.in_(bindparam('values', expanding=True)))
+        if load_proteins:
+            query = query.options(selectinload(Pathway.proteins))
+        return {
+            pathway.identifier: pathway
+            for chunk in chunked(set(pathway_ids), QUERY_CHUNK_SIZE)
+            for pathway in query.params(values=chunk)
+        }
+
+    def _get_id_map(self, column: Column, values: Iterable[str]) -> Dict[str, int]:
+        """Get a dictionary from the values of the column to the primary keys of the rows having them."""
+        query = self.session.query(column, column.class_.id).filter(column.in_(bindparam('values', expanding=True)))
+        return {
+            value: pk
+            for chunk in chunked(set(values), QUERY_CHUNK_SIZE)
+            for value, pk in query.params(values=chunk)
+        }
+
+    def get_or_create_species(self, taxonomy_id: str, name: str) -> Species:
+        """Get a species from the database or creates it.
+
+        :param taxonomy_id: NCBI taxonomy identifier
+        :param name: NCBI taxonomy label
+        """
+        species = self.session.query(Species).filter(Species.taxonomy_id == taxonomy_id).first()
+
+        if species is None:
+            species = Species(taxonomy_id=taxonomy_id, name=name)
+            self.session.add(species)
+
+        return species
+
+    def get_taxonomy_ids(self) -> Set[str]:
+        """Get the NCBI taxonomy identifiers of the species in the database."""
+        return {taxonomy_id for taxonomy_id, in self.session.query(Species.taxonomy_id)}
+
+    def drop_species(self, taxonomy_id: str) -> Mapping[str, int]:
+        """Delete the pathways of a species, their memberships, the proteins no other pathway has, and the species.
+
+        The other species are left alone.
+
+        :param taxonomy_id: NCBI taxonomy identifier
+        :return: The number of pathways and proteins that were deleted
+        :raises ValueError: If the species is not in the database
+        """
+        species_id = self._get_id_map(Species.taxonomy_id, [taxonomy_id]).get(taxonomy_id)
+        if species_id is None:
+            raise ValueError(f'taxonomy:{taxonomy_id} is not in the database')
+
+        try:
+            pathway_ids = [
+                pathway_id
+                for pathway_id, in self.session.query(Pathway.id).filter(Pathway.species_id == species_id)
+            ]
+            protein_ids = self._get_member_protein_ids(protein_pathway.c.pathway_id, pathway_ids)
+            self._bulk_delete_pathways(pathway_ids)
+            # the proteins in the deltas of releases are kept too
+            orphan_protein_ids = list(protein_ids.difference(
+                self._get_member_protein_ids(protein_pathway.c.protein_id, protein_ids),
+                self._get_member_protein_ids(release_membership.c.protein_id, protein_ids),
+            ))
+            protein_table = Protein.__table__
+            for chunk in chunked(orphan_protein_ids, QUERY_CHUNK_SIZE):
+                self.session.execute(protein_table.delete().where(protein_table.c.id.in_(chunk)))
+            self.session.execute(Species.__table__.delete().where(Species.__table__.c.id == species_id))
+        except Exception:
+            self.session.rollback()
+            raise
+
+        self.session.commit()
+        self.clear_caches()
+
+        rv = {'pathways': len(pathway_ids), 'proteins': len(orphan_protein_ids)}
+        logger.info(f'dropped taxonomy:{taxonomy_id}: {rv}')
+        return rv
+
+    def _get_member_protein_ids(self, column: Column, values: Iterable[int]) -> Set[int]:
+        """Get the primary keys of the proteins in the memberships whose column has one of the values."""
+        return {
+            protein_id
+            for chunk in chunked(values, QUERY_CHUNK_SIZE)
+            for protein_id, in self.session.execute(
+                select([column.table.c.protein_id]).where(column.in_(chunk)).distinct(),
+            )
+        }
+
+    def populate(
+        self,
+        paths: Optional[Mapping[str, str]] = None,
+        *,
+        taxonomy_ids: Optional[Iterable[str]] = None,
+        bulk: bool = False,
+        processes: Optional[int] = None,
+        commit_every: Optional[int] = None,
+    ):
         """Populate the database.
 
+        The GMT files are parsed in a process pool and loaded one species at a time as they finish parsing, so only
+        a few species' records are held in memory at once. Pathways that are already in the database are skipped,
+        so more species can be loaded into a populated database.
+
+        By default, everything is committed at the end, so a failure leaves the database as it was. With
+        ``commit_every``, each chunk of pathways is committed and then expunged from the session, so the session
+        never holds more than one chunk's objects. A failure then only rolls back the current chunk, and running
+        the same call again resumes after the last committed chunk.
+
         :param paths: mapping from tax identifiers to paths to GMT files
+        :param taxonomy_ids: If given, only loads the GMT files of these species
+        :param bulk: If true, writes the species, proteins, pathways, and their memberships with set-based
+         inserts instead of building ORM objects. Both modes result in the same database content.
+        :param processes: The number of processes for parsing the GMT files. Defaults to the number of CPUs.
+        :param commit_every: If given, commits after this many pathways
         """
+        with self._profile('populate'):
+            with self._profile('download'):
+                paths = self._get_paths(paths, taxonomy_ids=taxonomy_ids)
+            with self._profile('ensure_mappings'):
+                self.mapping_cache.ensure()
+
+            versions = set()
+            try:
+                for taxonomy_id, pathways in self._iter_profiled('parse', iter_gmts(paths, processes=processes)):
+                    versions.update(pathways.versions)
+                    if len(versions) != 1:
+                        raise ValueError(f'got multiple versions: {versions}')
+                    version = next(iter(versions))
+                    logger.info(f'v{version} loading {len(pathways)} pathways for taxonomy:{taxonomy_id}')
+
+                    species_name_to_taxonomy_id = self._get_species_name_to_taxonomy_id(pathways)
+                    for chunk in pathways.chunked(commit_every) if commit_every else [pathways]:
+                        with self._profile('map_identifiers') as info:
+                            entrez_id_to_hgnc = self._get_entrez_id_to_hgnc(chunk)
+                            info['rows'] = len(entrez_id_to_hgnc)
+
+                        with self._profile('load_bulk' if bulk else 'load_orm') as info:
+                            load = self._populate_bulk if bulk else self._populate_orm
+                            load(
+                                version=version,
+                                pathways=chunk,
+                                species_name_to_taxonomy_id=species_name_to_taxonomy_id,
+                                entrez_id_to_hgnc=entrez_id_to_hgnc,
+                            )
+                            info['rows'] = len(chunk)
+
+                        if commit_every:
+                            with self._profile('commit'):
+                                self.session.commit()
+                            self.session.expunge_all()
+                        else:
+                            # make this species' rows visible to the lookups of the next one
+                            with self._profile('flush'):
+                                self.session.flush()
+            except Exception:
+                self.session.rollback()
+                if commit_every:
+                    # the chunks committed so far are kept
+                    self.clear_caches()
+                raise
+
+            with self._profile('commit'):
+                self.session.commit()
+            self.clear_caches()
+
+    @staticmethod
+    def _get_paths(
+        paths: Optional[Mapping[str, str]] = None,
+        taxonomy_ids: Optional[Iterable[str]] = None,
+    ) -> Mapping[str, str]:
+        """Get the given paths or default to the GMT files of all species, downloading them if needed.
+
+        :param paths: mapping from tax identifiers to paths to GMT files
+        :param taxonomy_ids: If given, only gets the paths of these species
+        :raises ValueError: If there's no GMT file for one of the taxonomy identifiers
+        """
+        if taxonomy_ids is not None:
+            taxonomy_ids = set(taxonomy_ids)
+            missing = taxonomy_ids - set(paths or infos)
+            if missing:
+                raise ValueError(f'no GMT file for taxonomy identifiers: {", ".join(sorted(missing))}')
+
         if not paths:
             logger.info('No paths given.')
-            paths = {info.taxonomy_id: info.path for info in infos.values()}
+            paths = prefetch(None if taxonomy_ids is None else [infos[taxonomy_id] for taxonomy_id in taxonomy_ids])
             logger.info(f'Using default paths at {paths}.')
         elif not isinstance(paths, dict):
             raise TypeError('Invalid type for paths. Shoudl be dict.')
 
-        pathways = [
-            pathway
-            for taxonomy_id, path in paths.items()
-            for pathway in parse_wikipathways_gmt(path)
-        ]
+        if taxonomy_ids is not None:
+            paths = {taxonomy_id: path for taxonomy_id, path in paths.items() if taxonomy_id in taxonomy_ids}
+        return paths
 
-        versions = {
-            version
-            for _identifier, version, _revision, _name, _species_name, _entries in pathways
-        }
-        if len(versions) != 1:
+    def _parse_gmts(
+        self,
+        paths: Optional[Mapping[str, str]] = None,
+        processes: Optional[int] = None,
+        taxonomy_ids: Optional[Iterable[str]] = None,
+    ) -> Tuple[str, ParsedGMT]:
+        """Parse all GMT files and return their common WikiPathways version and their records, in one vocabulary.
+
+        :param paths: mapping from tax identifiers to paths to GMT files. Defaults to all species in
+         :data:`bio2bel_wikipathways.constants.infos`.
+        :param processes: The number of processes for parsing the GMT files. Defaults to the number of CPUs.
+        :param taxonomy_ids: If given, only parses the GMT files of these species
+        :raises ValueError: if the files come from several WikiPathways versions
+        """
+        paths = self._get_paths(paths, taxonomy_ids=taxonomy_ids)
+        pathways = ParsedGMT()
+        for _taxonomy_id, species_pathways in iter_gmts(paths, processes=processes):
+            pathways.extend(species_pathways)
+
+        if len(pathways.versions) != 1:
             raise ValueError('got multiple versions')
-        version = list(versions)[0]
+        version = next(iter(pathways.versions))
 
-        taxonomy_name_to_id = get_name_id_mapping('ncbitaxon')
-        species_names = {
-            SPECIES_REMAPPING.get(species_name, species_name)
-            for _identifier, _version, _revision, _name, species_name, _entries in pathways
-        }
-        species_name_to_species = {}
-        for species_name in tqdm(species_names, desc=f'v{version} serializing species'):
-            taxonomy_id = taxonomy_name_to_id[species_name]
-            species = species_name_to_species[species_name] = Species(taxonomy_id=taxonomy_id, name=species_name)
-            self.session.add(species)
+        return version, pathways
 
-        hgnc_id_to_entrez_id = get_filtered_xrefs('hgnc', 'ncbigene')
-        if not hgnc_id_to_entrez_id:
-            raise ValueError('Mappings from hgnc to ncbigene couldnt be loaded')
+    @property
+    def mapping_cache(self) -> MappingCache:  # noqa: D401
+        """The cache of HGNC and NCBI Taxonomy mappings used when populating."""
+        if self._mapping_cache is None:
+            from .mappings import MappingCache
+            self._mapping_cache = MappingCache()
+        return self._mapping_cache
 
-        entrez_id_to_hgnc_id = {v: k for k, v in hgnc_id_to_entrez_id.items()}
-        hgnc_id_to_name = get_id_name_mapping('hgnc')
+    @mapping_cache.setter
+    def mapping_cache(self, mapping_cache: MappingCache) -> None:
+        self._mapping_cache = mapping_cache
 
-        missing_entrez_ids = set()
-        entrez_ids = {
-            entrez_id
-            for _identifier, _version, _revision, _name, _species, entrez_ids in pathways
-            for entrez_id in entrez_ids
-        }
-        entrez_id_protein = {}
-        for entrez_id in tqdm(entrez_ids, desc=f'v{version} serializing proteins'):
-            hgnc_id = entrez_id_to_hgnc_id.get(entrez_id)
-            if hgnc_id:
-                hgnc_symbol = hgnc_id_to_name[hgnc_id]
-            else:
-                hgnc_symbol = None
+    def _get_species_name_to_taxonomy_id(self, pathways: ParsedGMT) -> Dict[str, str]:
+        """Get a dictionary from the (remapped) species names in the GMT records to NCBI taxonomy identifiers."""
+        return self.mapping_cache.get_taxonomy_ids(pathways.get_species_names())
+
+    def _get_entrez_id_to_hgnc(
+        self,
+        pathways: ParsedGMT,
+    ) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+        """Get a dictionary from the Entrez gene identifiers in the GMT records to HGNC identifiers and symbols."""
+        entrez_ids = pathways.get_all_entrez_ids()
+        entrez_id_to_hgnc = self.mapping_cache.get_hgnc(entrez_ids)
 
+        missing_entrez_ids = set()
+        for entrez_id in entrez_ids:
+            hgnc_id, hgnc_symbol = entrez_id_to_hgnc.setdefault(entrez_id, (None, None))
             if not hgnc_symbol:
                 logging.debug(f"ncbigene:{entrez_id} has no HGNC identifier")
                 missing_entrez_ids.add(entrez_id)
 
-            entrez_id_protein[entrez_id] = protein = self.get_or_create_protein(
+        logger.info(f'Proteins: {len(entrez_id_to_hgnc)}')
+        logger.info(f"Proteins w/o HGNC mapping: {len(missing_entrez_ids)}")
+
+        return entrez_id_to_hgnc
+
+    def update(
+        self,
+        paths: Optional[Mapping[str, str]] = None,
+        *,
+        taxonomy_ids: Optional[Iterable[str]] = None,
+        processes: Optional[int] = None,
+    ) -> Mapping[str, int]:
+        """Update the database to the content of the GMT files, only touching the pathways that changed.
+
+        Pathways whose identifier is new are added. Pathways whose revision differs from the one in the database get
+        their name, revision, and species updated and their protein memberships patched. Pathways of the species
+        in the GMT files that are no longer listed in them are deleted. Pathways of other species are left alone.
+        Everything happens in one transaction, which is rolled back if any step fails.
+
+        :param paths: mapping from tax identifiers to paths to GMT files
+        :param taxonomy_ids: If given, only updates the pathways of these species
+        :param processes: The number of processes for parsing the GMT files. Defaults to the number of CPUs.
+        :return: The number of pathways that were added, changed, deleted, and left unchanged
+        """
+        with self._profile('update'):
+            with self._profile('parse') as info:
+                version, pathways = self._parse_gmts(paths, processes=processes, taxonomy_ids=taxonomy_ids)
+                info['rows'] = len(pathways)
+            with self._profile('map_identifiers'):
+                species_name_to_taxonomy_id = self._get_species_name_to_taxonomy_id(pathways)
+
+            try:
+                with self._profile('write'):
+                    taxonomy_id_to_species_id = self._bulk_ensure_species(species_name_to_taxonomy_id, version=version)
+                    species_ids = set(taxonomy_id_to_species_id.values())
+
+                    existing = {
+                        identifier: (pathway_id, revision)
+                        for chunk in chunked(species_ids, QUERY_CHUNK_SIZE)
+                        for pathway_id, identifier, revision in (
+                            self.session
+                                .query(Pathway.id, Pathway.identifier, Pathway.revision)
+                                .filter(Pathway.species_id.in_(chunk))
+                        )
+                    }
+                    incoming_identifiers = {pathway.identifier for pathway in pathways}
+                    new_pathways = pathways.subset(
+                        pathway
+                        for pathway in pathways
+                        if pathway.identifier not in existing
+                    )
+                    changed_pathways = pathways.subset(
+                        pathway
+                        for pathway in pathways
+                        if pathway.identifier in existing and existing[pathway.identifier][1] != pathway.revision
+                    )
+                    retired_pathway_ids = [
+                        pathway_id
+                        for identifier, (pathway_id, _revision) in existing.items()
+                        if identifier not in incoming_identifiers
+                    ]
+
+                    entrez_id_to_protein_id = self._bulk_ensure_proteins(
+                        self._get_entrez_id_to_hgnc(pathways.subset([*new_pathways, *changed_pathways])),
+                        version=version,
+                    )
+                    self._bulk_insert_pathways(
+                        new_pathways,
+                        species_name_to_taxonomy_id=species_name_to_taxonomy_id,
+                        taxonomy_id_to_species_id=taxonomy_id_to_species_id,
+                        entrez_id_to_protein_id=entrez_id_to_protein_id,
+                        version=version,
+                    )
+                    self._bulk_update_pathways(
+                        changed_pathways,
+                        identifier_to_pathway_id={
+                            identifier: pathway_id
+                            for identifier, (pathway_id, _revision) in existing.items()
+                        },
+                        species_name_to_taxonomy_id=species_name_to_taxonomy_id,
+                        taxonomy_id_to_species_id=taxonomy_id_to_species_id,
+                        entrez_id_to_protein_id=entrez_id_to_protein_id,
+                    )
+                    self._bulk_delete_pathways(retired_pathway_ids)
+            except Exception:
+                self.session.rollback()
+                raise
+
+            with self._profile('commit'):
+                self.session.commit()
+            self.clear_caches()
+
+        rv = {
+            'added': len(new_pathways),
+            'changed': len(changed_pathways),
+            'deleted': len(retired_pathway_ids),
+            'unchanged': len(pathways) - len(new_pathways) - len(changed_pathways),
+        }
+        logger.info(f'v{version} updated pathways: {rv}')
+        return rv
+
+    def _populate_orm(
+        self,
+        *,
+        version: str,
+        pathways: ParsedGMT,
+        species_name_to_taxonomy_id: Mapping[str, str],
+        entrez_id_to_hgnc: Mapping[str, Tuple[Optional[str], Optional[str]]],
+    ) -> None:
+        """Add the parsed GMT records to the session as ORM objects."""
+        taxonomy_id_to_species = {
+            species.taxonomy_id: species
+            for species in self.session.query(Species).filter(
+                Species.taxonomy_id.in_(species_name_to_taxonomy_id.values()),
+            )
+        }
+        species_name_to_species = {}
+        species_it = tqdm(species_name_to_taxonomy_id.items(), desc=f'v{version} serializing species')
+        for species_name, taxonomy_id in species_it:
+            species = taxonomy_id_to_species.get(taxonomy_id)
+            if species is None:
+                species = taxonomy_id_to_species[taxonomy_id] = Species(taxonomy_id=taxonomy_id, name=species_name)
+                self.session.add(species)
+            species_name_to_species[species_name] = species
+
+        entrez_id_protein = self.get_proteins_by_entrez_ids(entrez_id_to_hgnc)
+        protein_it = tqdm(entrez_id_to_hgnc.items(), desc=f'v{version} serializing proteins')
+        for entrez_id, (hgnc_id, hgnc_symbol) in protein_it:
+            if entrez_id in entrez_id_protein:
+                continue
+            entrez_id_protein[entrez_id] = protein = Protein(
                 entrez_id=entrez_id,
                 hgnc_symbol=hgnc_symbol,
                 hgnc_id=hgnc_id,
             )
             self.session.add(protein)
 
-        logger.info(f'Proteins: {len(entrez_id_protein)}')
-        logger.info(f"Proteins w/o HGNC mapping: {len(missing_entrez_ids)}")
+        identifier_to_pathway = self.get_pathways_by_ids(record.identifier for record in pathways)
+        for record in tqdm(pathways, desc=f'v{version} serializing pathways'):
+            if record.identifier in identifier_to_pathway:
+                continue
+            identifier_to_pathway[record.identifier] = pathway = Pathway(
+                identifier=record.identifier,
+                name=record.name,
+                revision=record.revision,
+                species=species_name_to_species[record.species_name],
+                proteins=[
+                    entrez_id_protein[entrez_id]
+                    for entrez_id in pathways.get_entrez_ids(record)
+                ],
+            )
+            self.session.add(pathway)
 
-        for (
-            wikipathways_id, _version, revision,
-            pathway_name, species_name, entrez_ids,
-        ) in tqdm(pathways, desc=f'v{version} serializing pathways'):
-            proteins = [
-                entrez_id_protein[entrez_id]
-                for entrez_id in entrez_ids
-            ]
+    def _populate_bulk(
+        self,
+        *,
+        version: str,
+        pathways: ParsedGMT,
+        species_name_to_taxonomy_id: Mapping[str, str],
+        entrez_id_to_hgnc: Mapping[str, Tuple[Optional[str], Optional[str]]],
+    ) -> None:
+        """Write the parsed GMT records with set-based inserts, bypassing the ORM unit of work.
 
-            pathway = self.get_or_create_pathway(
-                identifier=wikipathways_id,
-                name=pathway_name.strip(),
-                revision=revision,
-                species=species_name_to_species[SPECIES_REMAPPING.get(species_name, species_name)],
-                proteins=proteins,
+        Each table is written with one ``executemany`` per chunk of rows. The primary keys needed for the foreign keys
+        of the next table are read back with chunked ``IN`` queries, so the number of round-trips grows with the
+        number of chunks rather than the number of rows.
+        """
+        taxonomy_id_to_species_id = self._bulk_ensure_species(species_name_to_taxonomy_id, version=version)
+        entrez_id_to_protein_id = self._bulk_ensure_proteins(entrez_id_to_hgnc, version=version)
+
+        existing_identifiers = self._get_id_map(Pathway.identifier, (pathway.identifier for pathway in pathways))
+        self._bulk_insert_pathways(
+            pathways.subset(
+                pathway
+                for pathway in pathways
+                if pathway.identifier not in existing_identifiers
+            ),
+            species_name_to_taxonomy_id=species_name_to_taxonomy_id,
+            taxonomy_id_to_species_id=taxonomy_id_to_species_id,
+            entrez_id_to_protein_id=entrez_id_to_protein_id,
+            version=version,
+        )
+
+    def _bulk_ensure_species(self, species_name_to_taxonomy_id: Mapping[str, str], version: str) -> Dict[str, int]:
+        """Insert the missing species and return a dictionary from taxonomy identifiers to species primary keys."""
+        taxonomy_id_to_species_id = self._get_id_map(Species.taxonomy_id, species_name_to_taxonomy_id.values())
+        self._bulk_insert(Species.__table__, [
+            {'taxonomy_id': taxonomy_id, 'name': species_name}
+            for species_name, taxonomy_id in species_name_to_taxonomy_id.items()
+            if taxonomy_id not in taxonomy_id_to_species_id
+        ], desc=f'v{version} inserting species')
+        return self._get_id_map(Species.taxonomy_id, species_name_to_taxonomy_id.values())
+
+    def _bulk_ensure_proteins(
+        self,
+        entrez_id_to_hgnc: Mapping[str, Tuple[Optional[str], Optional[str]]],
+        version: str,
+    ) -> Dict[str, int]:
+        """Insert the missing proteins and return a dictionary from Entrez gene identifiers to protein primary keys."""
+        entrez_id_to_protein_id = self._get_id_map(Protein.entrez_id, entrez_id_to_hgnc)
+        self._bulk_insert(Protein.__table__, [
+            {'entrez_id': entrez_id, 'hgnc_id': hgnc_id, 'hgnc_symbol': hgnc_symbol}
+            for entrez_id, (hgnc_id, hgnc_symbol) in entrez_id_to_hgnc.items()
+            if entrez_id not in entrez_id_to_protein_id
+        ], desc=f'v{version} inserting proteins')
+        return self._get_id_map(Protein.entrez_id, entrez_id_to_hgnc)
+
+    def _bulk_insert_pathways(
+        self,
+        pathways: ParsedGMT,
+        *,
+        species_name_to_taxonomy_id: Mapping[str, str],
+        taxonomy_id_to_species_id: Mapping[str, int],
+        entrez_id_to_protein_id: Mapping[str, int],
+        version: str,
+    ) -> None:
+        """Insert the pathways, which must not be in the database yet, and their protein memberships."""
+        self._bulk_insert(Pathway.__table__, [
+            {
+                'identifier': pathway.identifier,
+                'name': pathway.name,
+                'revision': pathway.revision,
+                'species_id': taxonomy_id_to_species_id[species_name_to_taxonomy_id[pathway.species_name]],
+            }
+            for pathway in pathways
+        ], desc=f'v{version} inserting pathways')
+        identifier_to_pathway_id = self._get_id_map(Pathway.identifier, (pathway.identifier for pathway in pathways))
+
+        code_to_protein_id = self._get_code_to_protein_id(pathways, entrez_id_to_protein_id)
+        self._bulk_insert(protein_pathway, [
+            {'protein_id': code_to_protein_id[code], 'pathway_id': identifier_to_pathway_id[pathway.identifier]}
+            for pathway in pathways
+            for code in pathway.genes
+        ], desc=f'v{version} inserting memberships')
+
+    @staticmethod
+    def _get_code_to_protein_id(
+        pathways: ParsedGMT,
+        entrez_id_to_protein_id: Mapping[str, int],
+    ) -> List[Optional[int]]:
+        """Get a list from the gene codes of the vocabulary of the GMT records to protein primary keys.
+
+        The vocabulary can have genes of pathways other than the given ones, which may not have a protein yet. Their
+        primary key is None, which the database rejects if it's ever written.
+        """
+        return [
+            entrez_id_to_protein_id.get(entrez_id)
+            for entrez_id in pathways.vocabulary.entrez_ids
+        ]
+
+    def _bulk_update_pathways(
+        self,
+        pathways: ParsedGMT,
+        *,
+        identifier_to_pathway_id: Mapping[str, int],
+        species_name_to_taxonomy_id: Mapping[str, str],
+        taxonomy_id_to_species_id: Mapping[str, int],
+        entrez_id_to_protein_id: Mapping[str, int],
+    ) -> None:
+        """Overwrite the name, revision, and species of the pathways and patch their protein memberships."""
+        if not pathways:
+            return
+
+        pathway_table = Pathway.__table__
+        self.session.execute(
+            pathway_table.update().where(pathway_table.c.id == bindparam('pathway_id')),
+            [
+                {
+                    'pathway_id': identifier_to_pathway_id[pathway.identifier],
+                    'name': pathway.name,
+                    'revision': pathway.revision,
+                    'species_id': taxonomy_id_to_species_id[species_name_to_taxonomy_id[pathway.species_name]],
+                }
+                for pathway in pathways
+            ],
+        )
+
+        pathway_ids = [identifier_to_pathway_id[pathway.identifier] for pathway in pathways]
+        current_memberships = {
+            (pathway_id, protein_id)
+            for chunk in chunked(pathway_ids, QUERY_CHUNK_SIZE)
+            for pathway_id, protein_id in self.session.execute(
+                select([protein_pathway.c.pathway_id, protein_pathway.c.protein_id])
+                .where(protein_pathway.c.pathway_id.in_(chunk)),
             )
-            self.session.add(pathway)
+        }
+        code_to_protein_id = self._get_code_to_protein_id(pathways, entrez_id_to_protein_id)
+        incoming_memberships = {
+            (identifier_to_pathway_id[pathway.identifier], code_to_protein_id[code])
+            for pathway in pathways
+            for code in pathway.genes
+        }
+
+        removed_memberships = current_memberships - incoming_memberships
+        if removed_memberships:
+            self.session.execute(
+                protein_pathway.delete().where(and_(
+                    protein_pathway.c.pathway_id == bindparam('old_pathway_id'),
+                    protein_pathway.c.protein_id == bindparam('old_protein_id'),
+                )),
+                [
+                    {'old_pathway_id': pathway_id, 'old_protein_id': protein_id}
+                    for pathway_id, protein_id in removed_memberships
+                ],
+            )
+        self._bulk_insert(protein_pathway, [
+            {'pathway_id': pathway_id, 'protein_id': protein_id}
+            for pathway_id, protein_id in incoming_memberships - current_memberships
+        ])
+
+    def _bulk_delete_pathways(self, pathway_ids: List[int]) -> None:
+        """Delete the pathways and their protein memberships."""
+        for chunk in chunked(pathway_ids, QUERY_CHUNK_SIZE):
+            self.session.execute(protein_pathway.delete().where(protein_pathway.c.pathway_id.in_(chunk)))
+            self.session.execute(Pathway.__table__.delete().where(Pathway.__table__.c.id.in_(chunk)))
+
+    def get_release_versions(self) -> List[str]:
+        """Get the versions of the releases added with :meth:`add_release`, from oldest to newest."""
+        return [version for version, in self.session.query(Release.version).order_by(Release.id)]
+
+    def add_release(
+        self,
+        paths: Optional[Mapping[str, str]] = None,
+        *,
+        taxonomy_ids: Optional[Iterable[str]] = None,
+        processes: Optional[int] = None,
+    ) -> Mapping[str, int]:
+        """Store the content of the GMT files of a WikiPathways release as a delta to the latest stored release.
+
+        This leaves the pathways and memberships used by the rest of the manager alone. Only the proteins are shared:
+        the missing ones are added, and the deltas of all releases reference them. If the GMT files only cover some
+        species, the pathways of the other species are carried over from the previous release. See
+        :mod:`bio2bel_wikipathways.releases`.
+
+        :param paths: mapping from tax identifiers to paths to GMT files of one release
+        :param taxonomy_ids: If given, only uses the GMT files of these species
+        :param processes: The number of processes for parsing the GMT files. Defaults to the number of CPUs.
+        :return: The number of pathways and genes that were added, removed, and changed since the previous release
+        :raises ValueError: If the release is not newer than the latest stored release
+        """
+        from .releases import ReleasedPathway, diff_releases, get_delta_rows
+
+        with self._profile('add_release'):
+            with self._profile('parse') as info:
+                version, pathways = self._parse_gmts(paths, processes=processes, taxonomy_ids=taxonomy_ids)
+                info['rows'] = len(pathways)
+
+            releases = self.session.query(Release.id, Release.version, Release.keyframe).order_by(Release.id).all()
+            if releases and version <= releases[-1].version:
+                raise ValueError(f'release {version} is not newer than the latest release {releases[-1].version}')
+
+            with self._profile('map_identifiers'):
+                species_name_to_taxonomy_id = self._get_species_name_to_taxonomy_id(pathways)
+                entrez_id_to_hgnc = self._get_entrez_id_to_hgnc(pathways)
+
+            with self._profile('diff') as info:
+                previous = self.get_release(releases[-1].version) if releases else {}
+                incoming_taxonomy_ids = set(species_name_to_taxonomy_id.values())
+                current = {
+                    identifier: pathway
+                    for identifier, pathway in previous.items()
+                    if pathway.taxonomy_id not in incoming_taxonomy_ids
+                }
+                for record in pathways:
+                    current[record.identifier] = ReleasedPathway(
+                        identifier=record.identifier,
+                        name=record.name,
+                        revision=record.revision,
+                        taxonomy_id=species_name_to_taxonomy_id[record.species_name],
+                        entrez_ids=frozenset(pathways.get_entrez_ids(record)),
+                    )
+
+                releases_since_keyframe = next(
+                    (i for i, release in enumerate(reversed(releases), start=1) if release.keyframe),
+                    len(releases),
+                )
+                keyframe = not releases or RELEASE_KEYFRAME_INTERVAL <= releases_since_keyframe
+                diff = diff_releases(previous, current)
+                pathway_rows, membership_rows = get_delta_rows(diff_releases({}, current) if keyframe else diff)
+                info['rows'] = len(membership_rows)
+
+            try:
+                with self._profile('write'):
+                    entrez_id_to_protein_id = self._bulk_ensure_proteins(entrez_id_to_hgnc, version=version)
+                    # the genes removed since the previous release, or carried over into a keyframe
+                    entrez_id_to_protein_id.update(self._get_id_map(Protein.entrez_id, {
+                        entrez_id
+                        for _identifier, entrez_id, _added in membership_rows
+                        if entrez_id not in entrez_id_to_protein_id
+                    }))
+
+                    release_table = Release.__table__
+                    release_id = self.session.execute(release_table.insert(), {
+                        'version': version,
+                        'previous_id': releases[-1].id if releases else None,
+                        'keyframe': keyframe,
+                    }).inserted_primary_key[0]
+
+                    self._bulk_insert(ReleasePathway.__table__, [
+                        {
+                            'release_id': release_id,
+                            'identifier': identifier,
+                            'name': name,
+                            'revision': revision,
+                            'taxonomy_id': taxonomy_id,
+                            'removed': removed,
+                        }
+                        for identifier, name, revision, taxonomy_id, removed in pathway_rows
+                    ], desc=f'v{version} inserting release pathways')
+                    identifier_to_release_pathway_id = dict(
+                        self.session.query(ReleasePathway.identifier, ReleasePathway.id)
+                        .filter(ReleasePathway.release_id == release_id),
+                    )
+                    self._bulk_insert(release_membership, [
+                        {
+                            'release_pathway_id': identifier_to_release_pathway_id[identifier],
+                            'protein_id': entrez_id_to_protein_id[entrez_id],
+                            'added': added,
+                        }
+                        for identifier, entrez_id, added in membership_rows
+                    ], desc=f'v{version} inserting release memberships')
+            except Exception:
+                self.session.rollback()
+                raise
+
+            with self._profile('commit'):
+                self.session.commit()
+            self.clear_caches()
+            # the content of the new release is already known, so it doesn't need to be replayed
+            self.release_cache.get(version, lambda _version: current)
+
+        rv = diff.summarize()
+        logger.info(f'v{version} added {"keyframe " if keyframe else ""}release: {rv}')
+        return rv
+
+    def get_release(self, version: str) -> Dict[str, ReleasedPathway]:
+        """Get the pathways of a release as they were in it, replaying its deltas on first use.
+
+        The deltas of the releases since the nearest keyframe are read with one query for the pathways and one for the
+        memberships, then the content is kept in :attr:`release_cache`.
+
+        :param version: The version of a release added with :meth:`add_release`
+        :return: A dictionary from WikiPathways identifiers to pathways
+        :raises ValueError: If there is no release with the version
+        """
+        return self.release_cache.get(version, self._replay_release)
+
+    def _replay_release(self, version: str, identifier: Optional[str] = None) -> Dict[str, ReleasedPathway]:
+        from .releases import replay_deltas
+        release_ids = self._get_release_chain(version)
+        with self._profile('replay_release') as info:
+            pathway_query = self.session.query(
+                ReleasePathway.release_id, ReleasePathway.identifier, ReleasePathway.name, ReleasePathway.revision,
+                ReleasePathway.taxonomy_id, ReleasePathway.removed,
+            ).filter(ReleasePathway.release_id.in_(release_ids))
+            membership_query = self.session.query(
+                ReleasePathway.release_id, ReleasePathway.identifier, Protein.entrez_id, release_membership.c.added,
+            ).join(
+                release_membership, release_membership.c.release_pathway_id == ReleasePathway.id,
+            ).join(
+                Protein, Protein.id == release_membership.c.protein_id,
+            ).filter(ReleasePathway.release_id.in_(release_ids))
+            if identifier is not None:
+                pathway_query = pathway_query.filter(ReleasePathway.identifier == identifier)
+                membership_query = membership_query.filter(ReleasePathway.identifier == identifier)
+
+            deltas = {release_id: ([], []) for release_id in release_ids}
+            for release_id, *row in pathway_query:
+                deltas[release_id][0].append(row)
+            for release_id, *row in membership_query:
+                deltas[release_id][1].append(row)
+            info['rows'] = sum(len(membership_rows) for _, membership_rows in deltas.values())
+            return replay_deltas(deltas[release_id] for release_id in release_ids)
+
+    def _get_release_chain(self, version: str) -> List[int]:
+        """Get the primary keys of the releases from the nearest keyframe up to the one with the version, in order.
+
+        :raises ValueError: If there is no release with the version
+        """
+        release_id_to_release = {
+            release.id: release
+            for release in self.session.query(Release.id, Release.previous_id, Release.keyframe, Release.version)
+        }
+        release = next((release for release in release_id_to_release.values() if release.version == version), None)
+        if release is None:
+            raise ValueError(f'no release {version}. Add it with add_release()')
+        rv = [release.id]
+        while not release.keyframe:
+            release = release_id_to_release[release.previous_id]
+            rv.append(release.id)
+        return rv[::-1]
+
+    def get_pathway_as_of(self, pathway_id: str, version: str) -> Optional[ReleasedPathway]:
+        """Get a pathway as it was in a release.
+
+        If the release isn't cached, only the deltas of this pathway are replayed, using the index on its identifier.
+
+        :param pathway_id: A WikiPathways identifier
+        :param version: The version of a release added with :meth:`add_release`
+        :return: The pathway, or None if it wasn't in the release
+        :raises ValueError: If there is no release with the version
+        """
+        if version in self.release_cache:
+            return self.get_release(version).get(pathway_id)
+        return self._replay_release(version, identifier=pathway_id).get(pathway_id)
+
+    def diff_releases(self, old_version: str, new_version: str) -> ReleaseDiff:
+        """List the pathways and genes that were added, removed, and changed from one release to another.
+
+        :param old_version: The version of a release added with :meth:`add_release`
+        :param new_version: The version of another release. It may be older than the first one.
+        :raises ValueError: If there is no release with one of the versions
+        """
+        from .releases import diff_releases
+        return diff_releases(self.get_release(old_version), self.get_release(new_version))
+
+    def export_snapshot(self, path: str, data_version: Optional[str] = None) -> None:
+        """Write the species, proteins, pathways, and their memberships to a binary snapshot.
+
+        The snapshot can be read without a database by :class:`bio2bel_wikipathways.snapshot.Snapshot`.
+
+        :param path: The path of the snapshot file
+        :param data_version: The version of the WikiPathways data. Defaults to
+         :data:`bio2bel_wikipathways.constants.DATA_VERSION`.
+        """
+        species_table, protein_table, pathway_table = Species.__table__, Protein.__table__, Pathway.__table__
+
+        species_index, species = {}, []
+        for species_id, taxonomy_id, name in self.session.execute(
+            select([species_table.c.id, species_table.c.taxonomy_id, species_table.c.name]),
+        ):
+            species_index[species_id] = len(species)
+            species.append((taxonomy_id, name))
+
+        protein_index, proteins = {}, []
+        for protein_id, entrez_id, hgnc_id, hgnc_symbol in self.session.execute(select([
+            protein_table.c.id, protein_table.c.entrez_id, protein_table.c.hgnc_id, protein_table.c.hgnc_symbol,
+        ])):
+            protein_index[protein_id] = len(proteins)
+            proteins.append((entrez_id, hgnc_id, hgnc_symbol))
+
+        pathway_index, pathways = {}, []
+        for pathway_id, identifier, name, revision, species_id in self.session.execute(select([
+            pathway_table.c.id, pathway_table.c.identifier, pathway_table.c.name, pathway_table.c.revision,
+            pathway_table.c.species_id,
+        ])):
+            pathway_index[pathway_id] = len(pathways)
+            pathways.append((identifier, name, revision, species_index[species_id]))
+
+        write_snapshot(
+            path,
+            species=species,
+            proteins=proteins,
+            pathways=pathways,
+            memberships=(
+                (pathway_index[pathway_id], protein_index[protein_id])
+                for pathway_id, protein_id in self.session.execute(
+                    select([protein_pathway.c.pathway_id, protein_pathway.c.protein_id]),
+                )
+            ),
+            data_version=data_version or DATA_VERSION,
+            metadata={'package_version': get_version()},
+        )
+
+    def import_snapshot(self, path: str) -> None:
+        """Populate the database from a binary snapshot written by :meth:`export_snapshot`.
+
+        :param path: The path of the snapshot file
+        :raises ValueError: If the database is already populated
+        """
+        if self.is_populated():
+            raise ValueError('Database already populated. Drop it before importing a snapshot')
+
+        with Snapshot(path) as snapshot:
+            version = snapshot.data_version
+            try:
+                self._bulk_insert(Species.__table__, [
+                    {'taxonomy_id': taxonomy_id, 'name': name}
+                    for taxonomy_id, name in snapshot.get_species()
+                ], desc=f'v{version} inserting species')
+                self._bulk_insert(Protein.__table__, [
+                    {'entrez_id': entrez_id, 'hgnc_id': hgnc_id, 'hgnc_symbol': hgnc_symbol}
+                    for entrez_id, hgnc_id, hgnc_symbol in snapshot.iter_proteins()
+                ], desc=f'v{version} inserting proteins')
+
+                taxonomy_id_to_species_id = dict(self.session.execute(
+                    select([Species.__table__.c.taxonomy_id, Species.__table__.c.id]),
+                ).fetchall())
+                self._bulk_insert(Pathway.__table__, [
+                    {
+                        'identifier': pathway.identifier,
+                        'name': pathway.name,
+                        'revision': pathway.revision,
+                        'species_id': taxonomy_id_to_species_id[pathway.taxonomy_id],
+                    }
+                    for pathway in snapshot.iter_pathways()
+                ], desc=f'v{version} inserting pathways')
+
+                entrez_id_to_protein_id = dict(self.session.execute(
+                    select([Protein.__table__.c.entrez_id, Protein.__table__.c.id]),
+                ).fetchall())
+                protein_ids = [entrez_id_to_protein_id[protein.entrez_id] for protein in snapshot.iter_proteins()]
+                identifier_to_pathway_id = dict(self.session.execute(
+                    select([Pathway.__table__.c.identifier, Pathway.__table__.c.id]),
+                ).fetchall())
+                pathway_ids = [identifier_to_pathway_id[pathway.identifier] for pathway in snapshot.iter_pathways()]
+                self._bulk_insert(protein_pathway, [
+                    {'pathway_id': pathway_ids[pathway], 'protein_id': protein_ids[protein]}
+                    for pathway, protein in snapshot.iter_memberships()
+                ], desc=f'v{version} inserting memberships')
+            except Exception:
+                self.session.rollback()
+                raise
+
+        self.session.commit()
+        self.clear_caches()
+
+    def export_parquet(
+        self,
+        directory: str,
+        *,
+        chunk_size: int = BULK_CHUNK_SIZE,
+        data_version: Optional[str] = None,
+    ) -> Mapping[str, int]:
+        """Write the species, proteins, pathways, and their memberships to Parquet files in a directory.
+
+        Each table is read with one query whose rows are fetched in chunks, and each chunk is written as a row group,
+        so no table is held in memory. See :mod:`bio2bel_wikipathways.parquet`.
+
+        :param directory: The directory of the Parquet files. It is created if it doesn't exist.
+        :param chunk_size: The number of rows per chunk and row group
+        :param data_version: The version of the WikiPathways data. Defaults to
+         :data:`bio2bel_wikipathways.constants.DATA_VERSION`.
+        :return: The number of rows written per table
+        """
+        from .parquet import get_parquet_paths, write_parquet
+
+        species_table, protein_table, pathway_table = Species.__table__, Protein.__table__, Pathway.__table__
+        queries = {
+            'species': select([species_table.c.taxonomy_id, species_table.c.name]).order_by(species_table.c.id),
+            'proteins': select([
+                protein_table.c.entrez_id, protein_table.c.hgnc_id, protein_table.c.hgnc_symbol,
+            ]).order_by(protein_table.c.id),
+            'pathways': select([
+                pathway_table.c.identifier, pathway_table.c.name, pathway_table.c.revision, species_table.c.taxonomy_id,
+            ]).select_from(
+                pathway_table.join(species_table, species_table.c.id == pathway_table.c.species_id),
+            ).order_by(pathway_table.c.id),
+            'memberships': select([pathway_table.c.identifier, protein_table.c.entrez_id]).select_from(
+                protein_pathway
+                .join(pathway_table, pathway_table.c.id == protein_pathway.c.pathway_id)
+                .join(protein_table, protein_table.c.id == protein_pathway.c.protein_id),
+            ).order_by(protein_pathway.c.pathway_id, protein_pathway.c.protein_id),
+        }
+        metadata = {'data_version': data_version or DATA_VERSION, 'package_version': get_version()}
+
+        os.makedirs(directory, exist_ok=True)
+        paths = get_parquet_paths(directory)
+        rv = {}
+        for name, query in queries.items():
+            with self._profile(f'export_parquet_{name}') as info:
+                rv[name] = info['rows'] = write_parquet(
+                    paths[name], name, self._iter_chunks(query, chunk_size), metadata=metadata,
+                )
+        return rv
+
+    def _iter_chunks(self, statement, chunk_size: int) -> Iterable[List[Tuple[Any, ...]]]:
+        """Execute the statement and fetch its rows in chunks, streaming them from the server where supported."""
+        result = self.session.execute(statement.execution_options(stream_results=True))
+        while True:
+            rows = result.fetchmany(chunk_size)
+            if not rows:
+                return
+            yield [tuple(row) for row in rows]
+
+    def import_parquet(self, directory: str, *, chunk_size: int = BULK_CHUNK_SIZE) -> Mapping[str, int]:
+        """Populate the database from the Parquet files written by :meth:`export_parquet`.
+
+        This doesn't parse GMT files or load the HGNC and NCBI Taxonomy mappings. The files are read in chunks of rows,
+        and each chunk is written with one ``executemany``.
+
+        :param directory: The directory of the Parquet files
+        :param chunk_size: The number of rows read and inserted at once
+        :return: The number of rows read per table
+        :raises ValueError: If the database is already populated
+        """
+        from .parquet import get_parquet_paths, iter_parquet, read_parquet_metadata
+
+        if self.is_populated():
+            raise ValueError('Database already populated. Drop it before importing Parquet files')
+
+        paths = get_parquet_paths(directory)
+        version = read_parquet_metadata(paths['pathways']).get('data_version')
+        rv = {}
+        try:
+            with self._profile('import_parquet_species') as info:
+                rv['species'] = info['rows'] = self._insert_chunks(Species.__table__, (
+                    [{'taxonomy_id': taxonomy_id, 'name': name} for taxonomy_id, name in chunk]
+                    for chunk in iter_parquet(paths['species'], chunk_size)
+                ), desc=f'v{version} inserting species')
+            with self._profile('import_parquet_proteins') as info:
+                rv['proteins'] = info['rows'] = self._insert_chunks(Protein.__table__, (
+                    [
+                        {'entrez_id': entrez_id, 'hgnc_id': hgnc_id, 'hgnc_symbol': hgnc_symbol}
+                        for entrez_id, hgnc_id, hgnc_symbol in chunk
+                    ]
+                    for chunk in iter_parquet(paths['proteins'], chunk_size)
+                ), desc=f'v{version} inserting proteins')
+
+            taxonomy_id_to_species_id = dict(self.session.execute(
+                select([Species.__table__.c.taxonomy_id, Species.__table__.c.id]),
+            ).fetchall())
+            with self._profile('import_parquet_pathways') as info:
+                rv['pathways'] = info['rows'] = self._insert_chunks(Pathway.__table__, (
+                    [
+                        {
+                            'identifier': identifier,
+                            'name': name,
+                            'revision': revision,
+                            'species_id': taxonomy_id_to_species_id[taxonomy_id],
+                        }
+                        for identifier, name, revision, taxonomy_id in chunk
+                    ]
+                    for chunk in iter_parquet(paths['pathways'], chunk_size)
+                ), desc=f'v{version} inserting pathways')
+
+            entrez_id_to_protein_id = dict(self.session.execute(
+                select([Protein.__table__.c.entrez_id, Protein.__table__.c.id]),
+            ).fetchall())
+            identifier_to_pathway_id = dict(self.session.execute(
+                select([Pathway.__table__.c.identifier, Pathway.__table__.c.id]),
+            ).fetchall())
+            with self._profile('import_parquet_memberships') as info:
+                rv['memberships'] = info['rows'] = self._insert_chunks(protein_pathway, (
+                    [
+                        {
+                            'pathway_id': identifier_to_pathway_id[pathway_id],
+                            'protein_id': entrez_id_to_protein_id[entrez_id],
+                        }
+                        for pathway_id, entrez_id in chunk
+                    ]
+                    for chunk in iter_parquet(paths['memberships'], chunk_size)
+                ), desc=f'v{version} inserting memberships')
+        except Exception:
+            self.session.rollback()
+            raise
 
         self.session.commit()
+        self.clear_caches()
+        return rv
+
+    def _insert_chunks(
+        self,
+        table: Table,
+        chunks: Iterable[List[Mapping[str, Any]]],
+        desc: Optional[str] = None,
+    ) -> int:
+        """Insert each chunk of rows into the table with one ``executemany`` and return the number of rows."""
+        rv = 0
+        for chunk in tqdm(chunks, desc=desc):
+            if chunk:
+                self.session.execute(table.insert(), chunk)
+                rv += len(chunk)
+        return rv
+
+    def iter_exported_pathways(
+        self,
+        chunk_size: int = QUERY_CHUNK_SIZE,
+        taxonomy_id: Optional[str] = None,
+    ) -> Iterable[ExportedPathway]:
+        """Iterate over the pathways with their species and proteins, ordered by pathway.
+
+        The pathways are fetched with :meth:`sqlalchemy.orm.Query.yield_per` and the proteins of each chunk of
+        pathways with one more query, so at most one chunk is held in memory no matter how many species are loaded.
+        Only plain rows are read, so nothing is added to the session.
+
+        :param chunk_size: The number of pathways fetched at once
+        :param taxonomy_id: If given, only iterates over the pathways of this species
+        """
+        protein_table = Protein.__table__
+        members_query = select([
+            protein_pathway.c.pathway_id, protein_table.c.entrez_id, protein_table.c.hgnc_id,
+            protein_table.c.hgnc_symbol,
+        ]).select_from(
+            protein_pathway.join(protein_table, protein_table.c.id == protein_pathway.c.protein_id),
+        ).where(
+            protein_pathway.c.pathway_id.in_(bindparam('values', expanding=True)),
+        ).order_by(protein_pathway.c.pathway_id, protein_table.c.entrez_id)
+
+        pathways_query = self.session.query(
+            Pathway.id, Pathway.identifier, Pathway.name, Pathway.revision, Species.taxonomy_id, Species.name,
+        ).join(Species)
+        if taxonomy_id is not None:
+            pathways_query = pathways_query.filter(Species.taxonomy_id == taxonomy_id)
+        pathways_query = pathways_query.order_by(Pathway.id).yield_per(chunk_size)
+
+        for chunk in chunked(pathways_query, chunk_size):
+            proteins = {pathway_id: [] for pathway_id, *_ in chunk}
+            for pathway_id, *protein in self.session.execute(members_query, {'values': list(proteins)}):
+                proteins[pathway_id].append(ExportedProtein(*protein))
+            for pathway_id, *pathway in chunk:
+                yield ExportedPathway(*pathway, proteins=proteins[pathway_id])
+
+    def export(
+        self,
+        file: TextIO,
+        fmt: str = 'bel',
+        *,
+        chunk_size: int = QUERY_CHUNK_SIZE,
+        taxonomy_id: Optional[str] = None,
+        use_tqdm: bool = False,
+    ) -> int:
+        """Stream the whole database to a file without building a BEL graph.
+
+        :param file: A writable text file, like :data:`sys.stdout`
+        :param fmt: One of ``bel`` for a BEL script, ``nodelink`` for a line of node-link JSON per pathway, or
+         ``tsv`` for an edge list. See :mod:`bio2bel_wikipathways.export`.
+        :param chunk_size: The number of pathways fetched at once
+        :param taxonomy_id: If given, only exports the pathways of this species
+        :param use_tqdm: Show a progress bar over the pathways
+        :return: The number of ``partOf`` edges written
+        :raises ValueError: If the format is unknown
+        """
+        writer = EXPORT_FORMATS.get(fmt)
+        if writer is None:
+            raise ValueError(f'unknown export format: {fmt}. Use one of: {", ".join(EXPORT_FORMATS)}')
+
+        pathways = self.iter_exported_pathways(chunk_size=chunk_size, taxonomy_id=taxonomy_id)
+        if use_tqdm:
+            pathways = tqdm(pathways, desc='exporting pathways')
+        with self._profile(f'export_{fmt}') as info:
+            info['rows'] = writer(
+                pathways,
+                file,
+                name=f'Pathway Definitions from bio2bel_{self.module_name}',
+                version=get_version(),
+            )
+        return info['rows']
+
+    def _bulk_insert(self, table: Table, rows: List[Mapping[str, Any]], desc: Optional[str] = None) -> None:
+        """Insert rows into the table with one ``executemany`` per chunk."""
+        for chunk in tqdm(chunked(rows, BULK_CHUNK_SIZE), desc=desc, total=ceil(len(rows) / BULK_CHUNK_SIZE)):
+            self.session.execute(table.insert(), chunk)
 
     @classmethod
     def _cli_add_populate(cls, main: click.Group) -> click.Group:
@@ -224,20 +1795,405 @@ class Manager(CompathManager):
         @click.option('-r', '--reset', is_flag=True, help='Nuke database first')
         @click.option('-f', '--force', is_flag=True, help='Force overwrite if already populated')
         @click.option('-p', '--paths', multiple=True, help='URL of WikiPathways GMT files')
+        @click.option('-t', '--taxonomy-id', 'taxonomy_ids', multiple=True, help='Defaults to all species')
+        @click.option('-b', '--bulk', is_flag=True, help='Use set-based inserts instead of the ORM')
+        @click.option('-u', '--update', is_flag=True, help='Only add, patch, and delete the pathways that changed')
+        @click.option('--processes', type=int, help='Number of processes for parsing. Defaults to the number of CPUs')
+        @click.option('--commit-every', type=int, help='Commit after this many pathways to bound memory')
+        @click.option('--resume', is_flag=True, help='Continue a failed run, skipping the pathways already committed')
+        @profile_option
         @verbose_option
         @click.pass_obj
-        def populate(manager: Manager, reset, force, paths):
+        def populate(
+            manager: Manager,
+            reset,
+            force,
+            paths,
+            taxonomy_ids,
+            bulk,
+            update,
+            processes,
+            commit_every,
+            resume,
+            profile_path,
+        ):
             """Populate the database."""
+            taxonomy_ids = taxonomy_ids or None
+            metadata = {'command': 'populate', 'bulk': bulk, 'update': update, 'taxonomy_ids': taxonomy_ids}
+            if update:
+                with manager.profiling(profile_path, metadata=metadata):
+                    counts = manager.update(paths=paths, taxonomy_ids=taxonomy_ids, processes=processes)
+                for key, count in counts.items():
+                    click.echo(f'{key.capitalize()}: {count}')
+                return
+
             if reset:
                 click.echo('Deleting the previous instance of the database')
                 manager.drop_all()
                 click.echo('Creating new models')
                 manager.create_all()
 
-            if manager.is_populated() and not force:
-                click.echo('Database already populated. Use --force to overwrite')
-                sys.exit(0)
+            if not (force or resume):
+                if taxonomy_ids:
+                    loaded = manager.get_taxonomy_ids().intersection(taxonomy_ids)
+                    if loaded:
+                        click.echo(f'Species already loaded: {", ".join(sorted(loaded))}. Use --force to overwrite')
+                        sys.exit(0)
+                elif manager.is_populated():
+                    click.echo('Database already populated. Use --force to overwrite')
+                    sys.exit(0)
+
+            with manager.profiling(profile_path, metadata=metadata):
+                manager.populate(
+                    paths=paths,
+                    taxonomy_ids=taxonomy_ids,
+                    bulk=bulk,
+                    processes=processes,
+                    commit_every=commit_every,
+                )
+
+        return main
+
+    @staticmethod
+    def _cli_add_drop_species(main: click.Group) -> click.Group:  # noqa: D202
+        """Add the drop species command."""
+
+        @main.command()
+        @click.argument('taxonomy_ids', nargs=-1, required=True)
+        @click.confirmation_option(prompt='Drop the pathways of these species?')
+        @verbose_option
+        @click.pass_obj
+        def drop_species(manager: Manager, taxonomy_ids):
+            """Drop the pathways of the given species and leave the others."""
+            for taxonomy_id in taxonomy_ids:
+                counts = manager.drop_species(taxonomy_id)
+                click.echo(f'taxonomy:{taxonomy_id}: dropped {counts["pathways"]} pathways and {counts["proteins"]} proteins')
+
+        return main
+
+    @staticmethod
+    def _cli_add_ensure_indexes(main: click.Group) -> click.Group:  # noqa: D202
+        """Add the ensure indexes command."""
+
+        @main.command()
+        @verbose_option
+        @click.pass_obj
+        def ensure_indexes(manager: Manager):
+            """Create indexes missing from a database made with an older version."""
+            created = manager.ensure_indexes()
+            if not created:
+                click.echo('All indexes already exist')
+            for name in created:
+                click.echo(f'Created {name}')
+
+        return main
+
+    @staticmethod
+    def _cli_add_prefetch(main: click.Group) -> click.Group:  # noqa: D202
+        """Add the prefetch command."""
+
+        @main.command(name='prefetch')
+        @click.option('-t', '--taxonomy-id', 'taxonomy_ids', multiple=True, help='Defaults to all species')
+        @click.option('-w', '--max-workers', type=int, default=4, show_default=True)
+        @click.option('--base-url', default=BASE_URL, show_default=True)
+        @click.option('-f', '--force', is_flag=True, help='Download again even if listed in the manifest')
+        @verbose_option
+        def prefetch_command(taxonomy_ids, max_workers, base_url, force):
+            """Download the GMT files of all species concurrently."""
+            species = [infos[taxonomy_id] for taxonomy_id in taxonomy_ids] if taxonomy_ids else None
+            paths = prefetch(species, base_url=base_url, max_workers=max_workers, force=force)
+            for taxonomy_id, path in sorted(paths.items()):
+                click.echo(f'{taxonomy_id}\t{path}')
+
+        return main
+
+    @staticmethod
+    def _cli_add_mappings(main: click.Group) -> click.Group:  # noqa: D202
+        """Add the mappings command."""
+
+        @main.command()
+        @click.option('-f', '--force', is_flag=True, help='Rebuild even if the cache is current')
+        @verbose_option
+        @click.pass_obj
+        def mappings(manager: Manager, force):
+            """Build the cache of HGNC mappings used when populating."""
+            manager.mapping_cache.ensure(force=force)
+            click.echo(f'HGNC mappings ({manager.mapping_cache.get_hgnc_version()}) cached at {manager.mapping_cache.path}')
+
+        return main
+
+    @staticmethod
+    def _cli_add_enrich(main: click.Group) -> click.Group:  # noqa: D202
+        """Add the enrich command."""
+
+        @main.command()
+        @click.argument('path', type=click.Path(exists=True, dir_okay=False))
+        @click.option('-o', '--output', type=click.File('w'), default='-', help='Defaults to standard out')
+        @click.option('--batch-size', type=int, default=ENRICHMENT_BATCH_SIZE, show_default=True)
+        @click.option('--processes', type=int, default=1, show_default=True, help='If 0, uses the number of CPUs')
+        @click.option('--no-gene-sets', is_flag=True, help='Leave out the gene sets of the pathways')
+        @click.option('-t', '--taxonomy-id', help='Only enrich against the pathways of this species')
+        @click.option('--resolve', is_flag=True, help='Accept Entrez gene identifiers and HGNC identifiers too')
+        @profile_option
+        @verbose_option
+        @click.pass_obj
+        def enrich(
+            manager: Manager,
+            path,
+            output,
+            batch_size,
+            processes,
+            no_gene_sets,
+            taxonomy_id,
+            resolve,
+            profile_path,
+        ):
+            """Enrich the named gene lists in a TSV or JSON file and write JSON lines."""
+            from .enrichment import read_gene_lists, write_enrichment_jsonl
+            with manager.profiling(profile_path, metadata={'command': 'enrich', 'taxonomy_id': taxonomy_id}):
+                results = manager.enrich_gene_lists(
+                    read_gene_lists(path),
+                    batch_size=batch_size,
+                    processes=processes,
+                    gene_sets=not no_gene_sets,
+                    taxonomy_id=taxonomy_id,
+                    resolve=resolve,
+                )
+                write_enrichment_jsonl(results, output)
+
+        return main
+
+    @staticmethod
+    def _cli_add_snapshot(main: click.Group) -> click.Group:  # noqa: D202
+        """Add the snapshot commands."""
+
+        @main.group()
+        def snapshot():
+            """Export and import binary snapshots."""
+
+        @snapshot.command(name='export')
+        @click.argument('path', type=click.Path(dir_okay=False, writable=True))
+        @click.option('--data-version', help=f'Defaults to {DATA_VERSION}')
+        @verbose_option
+        @click.pass_obj
+        def export_snapshot(manager: Manager, path, data_version):
+            """Write the database to a snapshot."""
+            manager.export_snapshot(path, data_version=data_version)
+
+        @snapshot.command(name='import')
+        @click.argument('path', type=click.Path(exists=True, dir_okay=False))
+        @verbose_option
+        @click.pass_obj
+        def import_snapshot(manager: Manager, path):
+            """Populate the database from a snapshot."""
+            manager.import_snapshot(path)
+
+        return main
+
+    @staticmethod
+    def _cli_add_export(main: click.Group) -> click.Group:  # noqa: D202
+        """Add the export command."""
+
+        @main.command()
+        @click.option('-f', '--fmt', '--format', type=click.Choice(list(EXPORT_FORMATS)), default='bel', show_default=True)
+        @click.option('-o', '--output', type=click.File('w'), default='-', help='Defaults to standard out')
+        @click.option('--chunk-size', type=int, default=QUERY_CHUNK_SIZE, show_default=True)
+        @click.option('-t', '--taxonomy-id', help='Defaults to all species')
+        @profile_option
+        @verbose_option
+        @click.pass_obj
+        def export(manager: Manager, fmt, output, chunk_size, taxonomy_id, profile_path):
+            """Stream the pathway memberships as BEL, node-link JSON lines, or a TSV edge list."""
+            with manager.profiling(profile_path, metadata={'command': 'export', 'taxonomy_id': taxonomy_id}):
+                edges = manager.export(
+                    output,
+                    fmt,
+                    chunk_size=chunk_size,
+                    taxonomy_id=taxonomy_id,
+                    use_tqdm=output is not sys.stdout,
+                )
+            click.echo(f'wrote {edges} edges', err=True)
+
+        return main
+
+    @staticmethod
+    def _cli_add_similarities(main: click.Group) -> click.Group:  # noqa: D202
+        """Add the similarities command."""
+
+        @main.command()
+        @click.option('-o', '--output', type=click.File('w'), default='-', help='Defaults to standard out')
+        @click.option('-t', '--taxonomy-id', help='Only compare the pathways of this species')
+        @click.option('-m', '--method', type=click.Choice(['exact', 'minhash']), default='exact', show_default=True)
+        @click.option('--min-shared', type=int, default=1, show_default=True, help='Minimum shared genes per pair')
+        @click.option('--min-jaccard', type=float, default=0.0, show_default=True)
+        @click.option('--permutations', type=int, default=128, show_default=True, help='MinHash signature length')
+        @click.option('--bands', type=int, default=32, show_default=True, help='LSH bands')
+        @click.option('--no-cache', is_flag=True, help='Neither read nor write the cached similarities')
+        @profile_option
+        @verbose_option
+        @click.pass_obj
+        def similarities(
+            manager: Manager,
+            output,
+            taxonomy_id,
+            method,
+            min_shared,
+            min_jaccard,
+            permutations,
+            bands,
+            no_cache,
+            profile_path,
+        ):
+            """Write the similarities of all overlapping pairs of pathways as TSV."""
+            with manager.profiling(profile_path, metadata={'command': 'similarities', 'method': method}):
+                rv = manager.get_pathway_similarities(
+                    taxonomy_id,
+                    method=method,
+                    min_shared=min_shared,
+                    min_jaccard=min_jaccard,
+                    number_permutations=permutations,
+                    bands=bands,
+                    use_cache=not no_cache,
+                )
+                rv.write_tsv(output)
+            click.echo(f'wrote {len(rv)} pathway pairs', err=True)
+
+        return main
+
+    @staticmethod
+    def _cli_add_serve(main: click.Group) -> click.Group:  # noqa: D202
+        """Add the serve command."""
+
+        @main.command()
+        @click.option('--host', default='127.0.0.1', show_default=True, help='Use 0.0.0.0 to listen on all interfaces')
+        @click.option('--port', type=int, default=5000, show_default=True)
+        @click.option('--pool-size', type=int, default=5, show_default=True, help='Connections kept open')
+        @click.option('--max-overflow', type=int, default=10, show_default=True, help='Extra connections under load')
+        @click.option('--max-age', type=int, default=3600, show_default=True, help='Seconds responses may be cached')
+        @verbose_option
+        @click.pass_obj
+        def serve(manager: Manager, host, port, pool_size, max_overflow, max_age):
+            """Run the JSON query service with the development server.
+
+            In production, run ``bio2bel_wikipathways.web:create_app()`` with a WSGI server like gunicorn instead.
+            """
+            from .web import build_pooled_manager, create_app
+            app = create_app(
+                build_pooled_manager(str(manager.engine.url), pool_size=pool_size, max_overflow=max_overflow),
+                max_age=max_age,
+            )
+            app.run(host=host, port=port, threaded=True)
 
-            manager.populate(paths=paths)
+        return main
+
+    @staticmethod
+    def _cli_add_releases(main: click.Group) -> click.Group:  # noqa: D202
+        """Add the release commands."""
 
+        @main.group()
+        def releases():
+            """Store and compare several WikiPathways releases."""
+
+        @releases.command(name='add')
+        @click.option(
+            '-p', '--path', 'paths', type=(str, click.Path(exists=True, dir_okay=False)), multiple=True,
+            help='A taxonomy identifier and the GMT file of the release for it. Defaults to the current release.',
+        )
+        @click.option('-t', '--taxonomy-id', 'taxonomy_ids', multiple=True, help='Defaults to all species')
+        @click.option('--processes', type=int, help='Number of processes for parsing. Defaults to the number of CPUs')
+        @profile_option
+        @verbose_option
+        @click.pass_obj
+        def add_release(manager: Manager, paths, taxonomy_ids, processes, profile_path):
+            """Store a release as a delta to the latest stored one."""
+            with manager.profiling(profile_path, metadata={'command': 'add_release'}):
+                counts = manager.add_release(
+                    paths=dict(paths) or None,
+                    taxonomy_ids=taxonomy_ids or None,
+                    processes=processes,
+                )
+            for key, count in counts.items():
+                click.echo(f'{key.capitalize().replace("_", " ")}: {count}')
+
+        @releases.command(name='ls')
+        @verbose_option
+        @click.pass_obj
+        def list_releases(manager: Manager):
+            """List the stored releases from oldest to newest."""
+            for version in manager.get_release_versions():
+                click.echo(version)
+
+        @releases.command(name='diff')
+        @click.argument('old_version')
+        @click.argument('new_version')
+        @click.option('-o', '--output', type=click.File('w'), default='-', help='Defaults to standard out')
+        @verbose_option
+        @click.pass_obj
+        def diff_releases(manager: Manager, old_version, new_version, output):
+            """Write the pathways and genes that changed between two releases as TSV."""
+            diff = manager.diff_releases(old_version, new_version)
+            for pathway in diff.added:
+                click.echo(f'added\t{pathway.identifier}\t{pathway.name}\t', file=output)
+            for pathway in diff.removed:
+                click.echo(f'removed\t{pathway.identifier}\t{pathway.name}\t', file=output)
+            for change in diff.changed:
+                genes = [f'+{entrez_id}' for entrez_id in sorted(change.added_entrez_ids)]
+                genes.extend(f'-{entrez_id}' for entrez_id in sorted(change.removed_entrez_ids))
+                click.echo(f'changed\t{change.identifier}\t{change.new.name}\t{",".join(genes)}', file=output)
+            click.echo(', '.join(f'{count} {key.replace("_", " ")}' for key, count in diff.summarize().items()), err=True)
+
+        return main
+
+    @staticmethod
+    def _cli_add_parquet(main: click.Group) -> click.Group:  # noqa: D202
+        """Add the Parquet commands."""
+
+        @main.group()
+        def parquet():
+            """Export and import Parquet files of each table."""
+
+        @parquet.command(name='export')
+        @click.argument('directory', type=click.Path(file_okay=False, writable=True))
+        @click.option('--chunk-size', type=int, default=BULK_CHUNK_SIZE, show_default=True, help='Rows per row group')
+        @click.option('--data-version', help=f'Defaults to {DATA_VERSION}')
+        @profile_option
+        @verbose_option
+        @click.pass_obj
+        def export_parquet(manager: Manager, directory, chunk_size, data_version, profile_path):
+            """Write the database to Parquet files in a directory."""
+            with manager.profiling(profile_path, metadata={'command': 'export_parquet'}):
+                counts = manager.export_parquet(directory, chunk_size=chunk_size, data_version=data_version)
+            for name, count in counts.items():
+                click.echo(f'{name.capitalize()}: {count}')
+
+        @parquet.command(name='import')
+        @click.argument('directory', type=click.Path(exists=True, file_okay=False))
+        @click.option('--chunk-size', type=int, default=BULK_CHUNK_SIZE, show_default=True, help='Rows per insert')
+        @profile_option
+        @verbose_option
+        @click.pass_obj
+        def import_parquet(manager: Manager, directory, chunk_size, profile_path):
+            """Populate the database from Parquet files in a directory."""
+            with manager.profiling(profile_path, metadata={'command': 'import_parquet'}):
+                counts = manager.import_parquet(directory, chunk_size=chunk_size)
+            for name, count in counts.items():
+                click.echo(f'{name.capitalize()}: {count}')
+
+        return main
+
+    @classmethod
+    def get_cli(cls) -> click.Group:
+        """Get a :mod:`click` main function with added WikiPathways commands."""
+        main = super().get_cli()
+        cls._cli_add_ensure_indexes(main)
+        cls._cli_add_drop_species(main)
+        cls._cli_add_prefetch(main)
+        cls._cli_add_mappings(main)
+        cls._cli_add_enrich(main)
+        cls._cli_add_snapshot(main)
+        cls._cli_add_export(main)
+        cls._cli_add_similarities(main)
+        cls._cli_add_serve(main)
+        cls._cli_add_releases(main)
+        cls._cli_add_parquet(main)
         return main
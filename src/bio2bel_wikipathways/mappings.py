@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+
+"""A persistent cache of the HGNC and NCBI Taxonomy mappings needed to populate the database.
+
+Loading the full HGNC cross-references and names and the NCBI Taxonomy name index through :mod:`pyobo` on every
+population takes a long time and a lot of memory, while only a few thousand genes and a handful of species are ever
+looked up. The :class:`MappingCache` stores the Entrez gene to HGNC identifier and symbol mapping in a SQLite file
+with an index on the Entrez gene identifier, so lookups only read the rows they need.
+
+Species are resolved from the taxonomy identifiers already listed in :data:`bio2bel_wikipathways.constants.infos`.
+Only names that are missing from there are looked up in NCBI Taxonomy, and the results are cached as well.
+
+Each table is keyed on the version of its source's data, from :func:`get_source_version`, and is rebuilt when that
+changes.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+from contextlib import closing
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+from pyobo import get_filtered_xrefs, get_id_name_mapping, get_name_id_mapping
+from pyobo.path_utils import get_prefix_directory
+from . import constants
+from .constants import QUERY_CHUNK_SIZE, SPECIES_REMAPPING, _PATHWAY_INFO
+from .utils import chunked
+
+__all__ = [
+    'MappingCache',
+    'get_mappings_path',
+    'get_source_version',
+]
+
+logger = logging.getLogger(__name__)
+
+#: The name of the mapping cache's file in :data:`bio2bel_wikipathways.constants.DATA_DIR`
+MAPPINGS_NAME = 'mappings.db'
+
+#: Species names from the GMT files to NCBI taxonomy identifiers, from the species listed in the constants
+KNOWN_SPECIES: Mapping[str, str] = {
+    SPECIES_REMAPPING.get(name.replace('_', ' '), name.replace('_', ' ')): taxonomy_id
+    for name, taxonomy_id in _PATHWAY_INFO
+}
+
+HGNCPair = Tuple[Optional[str], Optional[str]]
+
+
+def get_mappings_path() -> str:
+    """Get the default location of the mapping cache, looking up the data directory when called."""
+    return os.path.join(constants.DATA_DIR, MAPPINGS_NAME)
+
+
+def get_source_version(prefix: str) -> str:
+    """Get the version of :mod:`pyobo`'s local copy of a source's data, like ``hgnc`` or ``ncbitaxon``.
+
+    PyOBO doesn't record which release of a source it downloaded, so this is a hash of the names, sizes, and
+    modification times of the files it downloaded for the source. It changes when PyOBO downloads a new release, but
+    not when PyOBO itself is upgraded. PyOBO's own caches of mappings derived from the files are left out.
+    """
+    directory = get_prefix_directory(prefix)
+    files = []
+    for root, directories, names in os.walk(directory):
+        directories[:] = sorted(name for name in directories if name != 'cache')
+        for name in sorted(names):
+            path = os.path.join(root, name)
+            stat = os.stat(path)
+            files.append((os.path.relpath(path, directory), stat.st_size, stat.st_mtime_ns))
+    return f'{prefix}-{hashlib.sha256(json.dumps(files).encode("utf-8")).hexdigest()[:16]}'
+
+
+class MappingCache:
+    """A SQLite-backed cache of the HGNC and NCBI Taxonomy mappings."""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        hgnc_version: Optional[str] = None,
+        taxonomy_version: Optional[str] = None,
+    ):
+        """Initialize the cache.
+
+        :param path: The path to the SQLite file. Defaults to :func:`get_mappings_path`.
+        :param hgnc_version: The version of the HGNC data. If it differs from the one the HGNC mappings were cached
+         with, they are rebuilt. Defaults to the one of PyOBO's copy from :func:`get_source_version`.
+        :param taxonomy_version: The version of the NCBI Taxonomy data. If it differs from the one the species were
+         looked up in, they are looked up again. Defaults to the one of PyOBO's copy from :func:`get_source_version`.
+        """
+        self.path = path or get_mappings_path()
+        self.hgnc_version = hgnc_version
+        self.taxonomy_version = taxonomy_version
+        self._connection = None
+
+    @property
+    def connection(self) -> sqlite3.Connection:  # noqa: D401
+        """The connection to the SQLite file, made and initialized on first use."""
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path)
+            with self._connection:
+                self._connection.executescript('''
+                    CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+                    CREATE TABLE IF NOT EXISTS hgnc (hgnc_id TEXT PRIMARY KEY, entrez_id TEXT, symbol TEXT);
+                    CREATE INDEX IF NOT EXISTS ix_hgnc_entrez_id ON hgnc (entrez_id);
+                    CREATE TABLE IF NOT EXISTS taxonomy (name TEXT PRIMARY KEY, taxonomy_id TEXT);
+                ''')
+        return self._connection
+
+    def close(self) -> None:
+        """Close the connection to the SQLite file."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def get_hgnc_version(self) -> str:
+        """Get the version of the HGNC data the mappings are built from."""
+        return self.hgnc_version or get_source_version('hgnc')
+
+    def get_taxonomy_version(self) -> str:
+        """Get the version of the NCBI Taxonomy data the species are looked up in."""
+        return self.taxonomy_version or get_source_version('ncbitaxon')
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self.connection.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row and row[0]
+
+    def is_current(self) -> bool:
+        """Check if the cached HGNC mappings were built from the current version of the HGNC data."""
+        return self._get_meta('hgnc_version') == self.get_hgnc_version()
+
+    def ensure(self, force: bool = False) -> None:
+        """Build the HGNC mappings from :mod:`pyobo` if they are missing or outdated.
+
+        :param force: If true, rebuilds them even if they are current
+        """
+        if self.is_current() and not force:
+            return
+
+        logger.info('building HGNC mapping cache at %s', self.path)
+        hgnc_id_to_entrez_id = get_filtered_xrefs('hgnc', 'ncbigene')
+        if not hgnc_id_to_entrez_id:
+            raise ValueError('Mappings from hgnc to ncbigene couldnt be loaded')
+        hgnc_id_to_name = get_id_name_mapping('hgnc')
+
+        with self.connection as connection:
+            connection.execute('DELETE FROM hgnc')
+            connection.executemany('INSERT INTO hgnc VALUES (?, ?, ?)', (
+                (hgnc_id, entrez_id, hgnc_id_to_name.get(hgnc_id))
+                for hgnc_id, entrez_id in hgnc_id_to_entrez_id.items()
+            ))
+            # looked up after loading, since PyOBO may have just downloaded the data
+            connection.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('hgnc_version', ?)",
+                (self.get_hgnc_version(),),
+            )
+
+    def get_hgnc(self, entrez_ids: Iterable[str]) -> Dict[str, HGNCPair]:
+        """Get a dictionary from the Entrez gene identifiers to HGNC identifiers and symbols.
+
+        Entrez gene identifiers without an HGNC identifier are not included.
+        """
+        self.ensure()
+        rv = {}
+        with closing(self.connection.cursor()) as cursor:
+            for chunk in chunked(set(entrez_ids), QUERY_CHUNK_SIZE):
+                # only the number of ? placeholders varies, the values are bound as parameters
+                placeholders = ','.join('?' * len(chunk))
+                cursor.execute(
+                    f'SELECT entrez_id, hgnc_id, symbol FROM hgnc WHERE entrez_id IN ({placeholders})',  # noqa: S608
+                    chunk,
+                )
+                for entrez_id, hgnc_id, symbol in cursor:
+                    rv[entrez_id] = hgnc_id, symbol
+        return rv
+
+    def get_taxonomy_ids(self, species_names: Iterable[str]) -> Dict[str, str]:
+        """Get a dictionary from species names to NCBI taxonomy identifiers.
+
+        :raises KeyError: if a species name can not be found in NCBI Taxonomy
+        """
+        taxonomy_version = self.get_taxonomy_version()
+        if self._get_meta('taxonomy_version') != taxonomy_version:
+            with self.connection as connection:
+                connection.execute('DELETE FROM taxonomy')
+                connection.execute("INSERT OR REPLACE INTO meta VALUES ('taxonomy_version', ?)", (taxonomy_version,))
+
+        rv = {}
+        missing = set()
+        for species_name in species_names:
+            if species_name in KNOWN_SPECIES:
+                rv[species_name] = KNOWN_SPECIES[species_name]
+                continue
+            row = self.connection.execute(
+                'SELECT taxonomy_id FROM taxonomy WHERE name = ?', (species_name,),
+            ).fetchone()
+            if row is None:
+                missing.add(species_name)
+            else:
+                rv[species_name] = row[0]
+
+        if missing:
+            logger.info('looking up %d species in NCBI Taxonomy: %s', len(missing), sorted(missing))
+            taxonomy_name_to_id = get_name_id_mapping('ncbitaxon')
+            resolved = {species_name: taxonomy_name_to_id[species_name] for species_name in missing}
+            with self.connection as connection:
+                connection.executemany('INSERT OR REPLACE INTO taxonomy VALUES (?, ?)', resolved.items())
+                # looked up after loading, since PyOBO may have just downloaded the data
+                connection.execute(
+                    "INSERT OR REPLACE INTO meta VALUES ('taxonomy_version', ?)",
+                    (self.get_taxonomy_version(),),
+                )
+            rv.update(resolved)
+
+        return rv
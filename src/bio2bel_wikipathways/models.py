@@ -4,7 +4,7 @@
 
 from __future__ import annotations
 
-from sqlalchemy import Column, ForeignKey, Integer, String, Table
+from sqlalchemy import Boolean, Column, ForeignKey, Index, Integer, String, Table
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 
@@ -19,12 +19,17 @@ PATHWAY_TABLE_NAME = f'{MODULE_NAME}_pathway'
 PROTEIN_TABLE_NAME = f'{MODULE_NAME}_protein'
 SPECIES_TABLE_NAME = f'{MODULE_NAME}_species'
 PROTEIN_PATHWAY_TABLE = f'{MODULE_NAME}_protein_pathway'
+RELEASE_TABLE_NAME = f'{MODULE_NAME}_release'
+RELEASE_PATHWAY_TABLE_NAME = f'{MODULE_NAME}_release_pathway'
+RELEASE_MEMBERSHIP_TABLE_NAME = f'{MODULE_NAME}_release_membership'
 
 protein_pathway = Table(
     PROTEIN_PATHWAY_TABLE,
     Base.metadata,
     Column('protein_id', Integer, ForeignKey(f'{PROTEIN_TABLE_NAME}.id'), primary_key=True),
     Column('pathway_id', Integer, ForeignKey(f'{PATHWAY_TABLE_NAME}.id'), primary_key=True),
+    # The primary key covers protein -> pathway lookups, this covers pathway -> protein lookups
+    Index(f'ix_{PROTEIN_PATHWAY_TABLE}_pathway_id_protein_id', 'pathway_id', 'protein_id'),
 )
 
 
@@ -40,9 +45,9 @@ class Protein(Base, CompathProteinMixin):
     __tablename__ = PROTEIN_TABLE_NAME
     id = Column(Integer, primary_key=True)  # noqa:A003
 
-    entrez_id = Column(String(255), doc='entrez id of the protein')
-    hgnc_id = Column(String(255), doc='hgnc id of the protein')
-    hgnc_symbol = Column(String(255), doc='hgnc symbol of the protein')
+    entrez_id = Column(String(255), unique=True, index=True, doc='entrez id of the protein')
+    hgnc_id = Column(String(255), index=True, doc='hgnc id of the protein')
+    hgnc_symbol = Column(String(255), index=True, doc='hgnc symbol of the protein')
 
     def __repr__(self):  # noqa: D105
         return self.hgnc_id
@@ -67,7 +72,13 @@ class Pathway(CompathPathwayMixin, Base):
     name = Column(String(255), doc='pathway name')
     revision = Column(String(255), doc='pathway revision')
 
-    species_id = Column(Integer, ForeignKey(f'{Species.__tablename__}.id'), nullable=False, doc='The host species')
+    species_id = Column(
+        Integer,
+        ForeignKey(f'{Species.__tablename__}.id'),
+        nullable=False,
+        index=True,
+        doc='The host species',
+    )
     species = relationship(Species)
 
     bel_encoding = 'B'
@@ -77,3 +88,59 @@ class Pathway(CompathPathwayMixin, Base):
         secondary=protein_pathway,
         backref='pathways',
     )
+
+
+class Release(Base):
+    """A WikiPathways release whose pathways are stored as a delta to the previous release.
+
+    See :mod:`bio2bel_wikipathways.releases`.
+    """
+
+    __tablename__ = RELEASE_TABLE_NAME
+    id = Column(Integer, primary_key=True)  # noqa:A003
+
+    version = Column(String(255), unique=True, nullable=False, index=True, doc='WikiPathways version, like 20200310')
+    previous_id = Column(
+        Integer,
+        ForeignKey(f'{RELEASE_TABLE_NAME}.id'),
+        doc='The release the delta is relative to. Null for the first release.',
+    )
+    keyframe = Column(Boolean, nullable=False, doc='Whether all pathways are stored instead of a delta')
+
+    previous = relationship('Release', remote_side=[id])
+
+    def __repr__(self):  # noqa: D105
+        return self.version
+
+
+class ReleasePathway(Base):
+    """A pathway that was added, changed, or removed in a release."""
+
+    __tablename__ = RELEASE_PATHWAY_TABLE_NAME
+    id = Column(Integer, primary_key=True)  # noqa:A003
+
+    release_id = Column(Integer, ForeignKey(f'{RELEASE_TABLE_NAME}.id'), nullable=False, index=True)
+    identifier = Column(String(255), nullable=False, doc='WikiPathways id of the pathway')
+    name = Column(String(255), doc='pathway name. Null if the pathway was removed.')
+    revision = Column(String(255), doc='pathway revision. Null if the pathway was removed.')
+    taxonomy_id = Column(String(255), doc='NCBI taxonomy identifier. Null if the pathway was removed.')
+    removed = Column(Boolean, nullable=False, doc='Whether the pathway was removed in this release')
+
+    release = relationship(Release)
+
+    __table_args__ = (
+        # gets the history of one pathway
+        Index(f'ix_{RELEASE_PATHWAY_TABLE_NAME}_identifier_release_id', 'identifier', 'release_id', unique=True),
+    )
+
+    def __repr__(self):  # noqa: D105
+        return f'{self.identifier} ({self.release})'
+
+
+release_membership = Table(
+    RELEASE_MEMBERSHIP_TABLE_NAME,
+    Base.metadata,
+    Column('release_pathway_id', Integer, ForeignKey(f'{RELEASE_PATHWAY_TABLE_NAME}.id'), primary_key=True),
+    Column('protein_id', Integer, ForeignKey(f'{PROTEIN_TABLE_NAME}.id'), primary_key=True, index=True),
+    Column('added', Boolean, nullable=False, doc='Whether the protein was added to or removed from the pathway'),
+)
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+"""Columnar export and import of the database as Apache Parquet files.
+
+:meth:`bio2bel_wikipathways.Manager.export_parquet` writes one file per table to a directory:
+
+- ``species.parquet`` with the ``taxonomy_id`` and ``name`` of each species
+- ``proteins.parquet`` with the ``entrez_id``, ``hgnc_id``, and ``hgnc_symbol`` of each protein
+- ``pathways.parquet`` with the ``identifier``, ``name``, ``revision``, and ``taxonomy_id`` of each pathway
+- ``memberships.parquet`` with the ``pathway_id`` (the WikiPathways identifier) and ``entrez_id`` of each protein in
+  each pathway
+
+Rows reference each other by these identifiers rather than by database primary keys, so the files can be read on
+their own, e.g., with :func:`pandas.read_parquet`, or imported into another database with
+:meth:`bio2bel_wikipathways.Manager.import_parquet`. The columns that repeat values, like the identifiers in the
+memberships, are dictionary-encoded, so they are stored once per row group and read as :class:`pandas.Categorical`.
+The data version and package version are in the metadata of each file's schema.
+
+This needs :mod:`pyarrow`, which is installed with ``pip install bio2bel_wikipathways[parquet]``.
+"""
+
+import os
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+__all__ = [
+    'PARQUET_SCHEMAS',
+    'get_parquet_paths',
+    'write_parquet',
+    'iter_parquet',
+    'read_parquet_metadata',
+]
+
+_DICTIONARY = pa.dictionary(pa.int32(), pa.string())
+
+#: The schemas of the Parquet files, by the name of the table they have
+PARQUET_SCHEMAS: Mapping[str, pa.Schema] = {
+    'species': pa.schema([
+        ('taxonomy_id', pa.string()),
+        ('name', pa.string()),
+    ]),
+    'proteins': pa.schema([
+        ('entrez_id', pa.string()),
+        ('hgnc_id', pa.string()),
+        ('hgnc_symbol', pa.string()),
+    ]),
+    'pathways': pa.schema([
+        ('identifier', pa.string()),
+        ('name', pa.string()),
+        ('revision', pa.string()),
+        ('taxonomy_id', _DICTIONARY),
+    ]),
+    'memberships': pa.schema([
+        ('pathway_id', _DICTIONARY),
+        ('entrez_id', _DICTIONARY),
+    ]),
+}
+
+
+def get_parquet_paths(directory: str) -> Dict[str, str]:
+    """Get the paths of the Parquet files of each table in the directory."""
+    return {name: os.path.join(directory, f'{name}.parquet') for name in PARQUET_SCHEMAS}
+
+
+def write_parquet(
+    path: str,
+    name: str,
+    chunks: Iterable[Sequence[Tuple[Optional[str], ...]]],
+    metadata: Optional[Mapping[str, str]] = None,
+) -> int:
+    """Write chunks of rows to a Parquet file with the schema of a table, one row group per chunk.
+
+    :param path: The path of the Parquet file
+    :param name: The name of the table in :data:`PARQUET_SCHEMAS`
+    :param chunks: An iterable of lists of rows, which are tuples of strings in the order of the schema's columns
+    :param metadata: Key-value pairs to put in the schema's metadata
+    :return: The number of rows written
+    """
+    schema = PARQUET_SCHEMAS[name]
+    if metadata:
+        schema = schema.with_metadata(metadata)
+
+    rv = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in chunks:
+            if not chunk:
+                continue
+            arrays = []
+            for field, column in zip(schema, zip(*chunk)):
+                array = pa.array(column, type=pa.string())
+                arrays.append(array.dictionary_encode() if pa.types.is_dictionary(field.type) else array)
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            rv += len(chunk)
+    return rv
+
+
+def iter_parquet(path: str, batch_size: int) -> Iterator[List[Tuple[Optional[str], ...]]]:
+    """Iterate over the rows of a Parquet file written by :func:`write_parquet` in chunks.
+
+    :param path: The path of the Parquet file
+    :param batch_size: The maximum number of rows per chunk
+    :yields: Lists of rows, which are tuples of strings in the order of the schema's columns
+    """
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size):
+        columns = [column.to_pylist() for column in batch.columns]
+        yield list(zip(*columns))
+
+
+def read_parquet_metadata(path: str) -> Dict[str, str]:
+    """Read the key-value pairs in the schema's metadata of a Parquet file."""
+    metadata = pq.read_schema(path).metadata or {}
+    return {
+        key.decode('utf-8'): value.decode('utf-8')
+        for key, value in metadata.items()
+        if not key.startswith(b'ARROW:')
+    }
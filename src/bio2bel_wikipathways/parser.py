@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+
+"""Parsers for the WikiPathways GMT files.
+
+The records of a GMT file are read into a :class:`ParsedGMT`, which is what the loading code of
+:class:`bio2bel_wikipathways.Manager` consumes. Each pathway is a :class:`PathwayRecord` with ``__slots__`` whose
+genes are an ``array('I')`` of integer codes into a :class:`GeneVocabulary` shared by all pathways of the file, rather
+than a set of Entrez gene identifier strings, and whose species name is interned. This takes a fraction of the memory
+of the tuples from :func:`pyobo.sources.wikipathways.parse_wikipathways_gmt` and pickles to a fraction of the size
+when sent back from the worker processes of :func:`iter_gmts`.
+"""
+
+import logging
+import os
+import sys
+from array import array
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple
+
+from .constants import SPECIES_REMAPPING
+from .utils import chunked
+
+__all__ = [
+    'GeneVocabulary',
+    'PathwayRecord',
+    'ParsedGMT',
+    'parse_gmt',
+    'iter_gmts',
+]
+
+logger = logging.getLogger(__name__)
+
+
+class GeneVocabulary:
+    """Integer codes for Entrez gene identifiers, assigned in the order they are first seen."""
+
+    __slots__ = ('entrez_ids', '_codes')
+
+    def __init__(self, entrez_ids: Iterable[str] = ()):
+        """Initialize the vocabulary.
+
+        :param entrez_ids: Entrez gene identifiers, which get the codes 0, 1, 2, ... in this order
+        """
+        self.entrez_ids: List[str] = []
+        self._codes: Dict[str, int] = {}
+        self.encode(entrez_ids)
+
+    def __len__(self) -> int:  # noqa: D105
+        return len(self.entrez_ids)
+
+    def __reduce__(self):  # noqa: D105
+        # the codes are rebuilt from the identifiers, so only the identifiers are pickled
+        return GeneVocabulary, (self.entrez_ids,)
+
+    def encode(self, entrez_ids: Iterable[str]) -> array:
+        """Get the codes of the Entrez gene identifiers, adding the ones that aren't in the vocabulary yet."""
+        codes = self._codes
+        rv = array('I')
+        for entrez_id in entrez_ids:
+            code = codes.get(entrez_id)
+            if code is None:
+                code = codes[entrez_id] = len(self.entrez_ids)
+                self.entrez_ids.append(entrez_id)
+            rv.append(code)
+        return rv
+
+    def decode(self, codes: Iterable[int]) -> List[str]:
+        """Get the Entrez gene identifiers of the codes."""
+        entrez_ids = self.entrez_ids
+        return [entrez_ids[code] for code in codes]
+
+
+class PathwayRecord:
+    """A pathway from a GMT file."""
+
+    __slots__ = ('identifier', 'revision', 'name', 'species_name', 'genes')
+
+    def __init__(self, identifier: str, revision: str, name: str, species_name: str, genes: array):
+        """Initialize the record.
+
+        :param identifier: The WikiPathways identifier, like ``WP2333``
+        :param revision: The revision of the pathway
+        :param name: The name of the pathway
+        :param species_name: The species name, after :data:`bio2bel_wikipathways.constants.SPECIES_REMAPPING`
+        :param genes: The codes of the pathway's Entrez gene identifiers in the vocabulary of its :class:`ParsedGMT`
+        """
+        self.identifier = identifier
+        self.revision = revision
+        self.name = name
+        self.species_name = species_name
+        self.genes = genes
+
+    def __repr__(self) -> str:  # noqa: D105
+        return f'PathwayRecord({self.identifier}_r{self.revision}, {self.name!r}, {len(self.genes)} genes)'
+
+    def __reduce__(self):  # noqa: D105
+        return PathwayRecord, (self.identifier, self.revision, self.name, self.species_name, self.genes)
+
+
+class ParsedGMT:
+    """The pathways of one or more GMT files and the vocabulary their genes are coded in."""
+
+    __slots__ = ('versions', 'vocabulary', 'pathways')
+
+    def __init__(
+        self,
+        pathways: Optional[List[PathwayRecord]] = None,
+        *,
+        vocabulary: Optional[GeneVocabulary] = None,
+        versions: Optional[Set[str]] = None,
+    ):
+        """Initialize the parsed GMT files.
+
+        :param pathways: The pathway records, whose genes are coded in the vocabulary
+        :param vocabulary: The gene vocabulary. Defaults to a new, empty one.
+        :param versions: The WikiPathways versions the pathways come from
+        """
+        self.pathways: List[PathwayRecord] = [] if pathways is None else pathways
+        self.vocabulary = GeneVocabulary() if vocabulary is None else vocabulary
+        self.versions: Set[str] = set() if versions is None else versions
+
+    def __len__(self) -> int:  # noqa: D105
+        return len(self.pathways)
+
+    def __iter__(self) -> Iterator[PathwayRecord]:  # noqa: D105
+        return iter(self.pathways)
+
+    def __reduce__(self):  # noqa: D105
+        return _rebuild_parsed_gmt, (self.pathways, self.vocabulary, self.versions)
+
+    def subset(self, pathways: Iterable[PathwayRecord]) -> 'ParsedGMT':
+        """Get the given pathways of these files, sharing the vocabulary."""
+        return ParsedGMT(list(pathways), vocabulary=self.vocabulary, versions=self.versions)
+
+    def chunked(self, size: int) -> Iterator['ParsedGMT']:
+        """Iterate over subsets of at most the given number of pathways, sharing the vocabulary."""
+        for chunk in chunked(self.pathways, size):
+            yield self.subset(chunk)
+
+    def extend(self, other: 'ParsedGMT') -> None:
+        """Add the pathways of other parsed GMT files, recoding their genes into this vocabulary."""
+        recode = self.vocabulary.encode(other.vocabulary.entrez_ids)
+        self.pathways.extend(
+            PathwayRecord(
+                identifier=pathway.identifier,
+                revision=pathway.revision,
+                name=pathway.name,
+                species_name=pathway.species_name,
+                genes=array('I', (recode[gene] for gene in pathway.genes)),
+            )
+            for pathway in other.pathways
+        )
+        self.versions.update(other.versions)
+
+    def get_entrez_ids(self, pathway: PathwayRecord) -> List[str]:
+        """Get the Entrez gene identifiers of a pathway."""
+        return self.vocabulary.decode(pathway.genes)
+
+    def get_all_entrez_ids(self) -> Set[str]:
+        """Get the Entrez gene identifiers of all pathways."""
+        codes = set()
+        for pathway in self.pathways:
+            codes.update(pathway.genes)
+        return set(self.vocabulary.decode(codes))
+
+    def get_species_names(self) -> Set[str]:
+        """Get the species names of all pathways."""
+        return {pathway.species_name for pathway in self.pathways}
+
+
+def _rebuild_parsed_gmt(pathways: List[PathwayRecord], vocabulary: GeneVocabulary, versions: Set[str]) -> ParsedGMT:
+    """Unpickle parsed GMT files, interning the species names again."""
+    for pathway in pathways:
+        pathway.species_name = sys.intern(pathway.species_name)
+    return ParsedGMT(pathways, vocabulary=vocabulary, versions=versions)
+
+
+def parse_gmt(path: str) -> ParsedGMT:
+    """Parse all records from a WikiPathways GMT file."""
+    from pyobo.sources.wikipathways import parse_wikipathways_gmt
+
+    rv = ParsedGMT()
+    for identifier, version, revision, name, species_name, entrez_ids in parse_wikipathways_gmt(path):
+        rv.versions.add(version)
+        rv.pathways.append(PathwayRecord(
+            identifier=identifier,
+            revision=revision,
+            name=name.strip(),
+            species_name=sys.intern(SPECIES_REMAPPING.get(species_name, species_name)),
+            genes=rv.vocabulary.encode(sorted(entrez_ids)),
+        ))
+    return rv
+
+
+def iter_gmts(
+    paths: Mapping[str, str],
+    *,
+    processes: Optional[int] = None,
+) -> Iterable[Tuple[str, ParsedGMT]]:
+    """Parse the GMT files in a process pool and yield their records one file at a time.
+
+    At most ``processes`` files are parsed at the same time and a file's records are only yielded once the consumer
+    asks for them, so the records of only a few files are held in memory at once. Files are yielded in the order
+    they finish parsing.
+
+    :param paths: mapping from tax identifiers to paths to GMT files
+    :param processes: The number of worker processes. Defaults to the number of CPUs. If 1, or if there is only one
+     file, the files are parsed serially in this process.
+    :yields: pairs of tax identifiers and the records of their GMT file
+    """
+    if processes == 1 or len(paths) < 2:
+        for taxonomy_id, path in paths.items():
+            yield taxonomy_id, parse_gmt(path)
+        return
+
+    processes = processes or os.cpu_count() or 1
+    remaining = iter(paths.items())
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        pending: Dict[Future, str] = {}
+
+        def _submit_next() -> None:
+            for taxonomy_id, path in remaining:
+                pending[executor.submit(parse_gmt, path)] = taxonomy_id
+                return
+
+        for _ in range(processes):
+            _submit_next()
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                taxonomy_id = pending.pop(future)
+                _submit_next()
+                logger.debug('parsed GMT file for taxonomy:%s', taxonomy_id)
+                yield taxonomy_id, future.result()
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+
+"""Timings, row counts, and SQL statement counts of the phases of populating and querying the database.
+
+A :class:`Profiler` is attached to a manager with :meth:`bio2bel_wikipathways.Manager.profiling`. While attached, the
+manager records a :class:`PhaseRecord` for each phase, like parsing the GMT files, looking up the HGNC mappings,
+building ORM objects, committing, or enriching, and passes it to the profiler's callbacks. Phases can be nested, in
+which case the time and statements of the inner phases are included in the outer ones.
+
+The report from :meth:`Profiler.get_report` sums up the records by phase and can be written as JSON with
+:meth:`Profiler.write_report` to compare data releases.
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Mapping, NamedTuple, Optional
+
+import click
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .utils import get_version
+
+__all__ = [
+    'PhaseRecord',
+    'Profiler',
+    'profile_option',
+]
+
+
+class PhaseRecord(NamedTuple):
+    """The duration, rows, and SQL statements of one run of a phase."""
+
+    #: The names of the enclosing phases and this phase, joined by slashes, like ``populate/parse``
+    phase: str
+    seconds: float
+    #: The number of SQL statements executed during the phase
+    statements: int
+    #: The number of rows, records, or results the phase handled, if it counts them
+    rows: Optional[int] = None
+
+
+class Profiler:
+    """Records the phases of a manager and counts the SQL statements sent to its engine."""
+
+    def __init__(self, engine: Optional[Engine] = None):
+        """Initialize the profiler.
+
+        :param engine: The engine whose statements are counted. If not given, statements are not counted.
+        """
+        self.engine = engine
+        self.records: List[PhaseRecord] = []
+        self.callbacks: List[Callable[[PhaseRecord], None]] = []
+        self.statements = 0
+        self._stack = threading.local()
+        self._listening = False
+
+    def add_callback(self, callback: Callable[[PhaseRecord], None]) -> None:
+        """Add a function that is called with each record as soon as its phase ends."""
+        self.callbacks.append(callback)
+
+    def start(self) -> None:
+        """Start counting the SQL statements."""
+        if self.engine is not None and not self._listening:
+            event.listen(self.engine, 'before_cursor_execute', self._count_statement)
+            self._listening = True
+
+    def stop(self) -> None:
+        """Stop counting the SQL statements."""
+        if self._listening:
+            event.remove(self.engine, 'before_cursor_execute', self._count_statement)
+            self._listening = False
+
+    def _count_statement(self, *_args, **_kwargs) -> None:
+        self.statements += 1
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[Dict[str, Any]]:
+        """Time a phase and record it when it ends, even if it fails.
+
+        :param name: The name of the phase
+        :yields: A dictionary in which the phase can set ``rows``
+        """
+        stack = self._stack.__dict__.setdefault('names', [])
+        stack.append(name)
+        info = {}
+        statements = self.statements
+        start = time.perf_counter()
+        try:
+            yield info
+        finally:
+            record = PhaseRecord(
+                phase='/'.join(stack),
+                seconds=time.perf_counter() - start,
+                statements=self.statements - statements,
+                rows=info.get('rows'),
+            )
+            stack.pop()
+            self.records.append(record)
+            for callback in self.callbacks:
+                callback(record)
+
+    def get_summary(self) -> Dict[str, Dict[str, Any]]:
+        """Sum up the calls, seconds, statements, and rows of the records of each phase, in the order they ended."""
+        rv = {}
+        for record in self.records:
+            summary = rv.setdefault(record.phase, {'calls': 0, 'seconds': 0.0, 'statements': 0, 'rows': None})
+            summary['calls'] += 1
+            summary['seconds'] += record.seconds
+            summary['statements'] += record.statements
+            if record.rows is not None:
+                summary['rows'] = (summary['rows'] or 0) + record.rows
+        return rv
+
+    def get_report(self, metadata: Optional[Mapping[str, Any]] = None) -> Dict[str, Any]:
+        """Get a JSON-serializable report with the summary and all records."""
+        return {
+            'package_version': get_version(),
+            'metadata': dict(metadata or {}),
+            'summary': self.get_summary(),
+            'records': [record._asdict() for record in self.records],
+        }
+
+    def write_report(self, path: str, metadata: Optional[Mapping[str, Any]] = None) -> None:
+        """Write the report as JSON."""
+        with open(path, 'w') as file:
+            json.dump(self.get_report(metadata=metadata), file, indent=2)
+
+
+#: A :mod:`click` option for commands that write a profile with :meth:`bio2bel_wikipathways.Manager.profiling`
+profile_option = click.option(
+    '--profile',
+    'profile_path',
+    type=click.Path(dir_okay=False, writable=True),
+    help='Write a JSON report of the timings, rows, and SQL statements of each phase to this path',
+)
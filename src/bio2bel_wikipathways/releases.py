@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+
+"""Delta encoding of the pathway memberships of several WikiPathways releases.
+
+Each release added with :meth:`bio2bel_wikipathways.Manager.add_release` only stores what changed since the release
+before it: a row for each pathway that was added, changed, or removed, and a row for each gene that was added to or
+removed from a pathway. The genes reference the shared protein table, so a protein is stored once no matter how many
+releases have it. Every :data:`bio2bel_wikipathways.constants.RELEASE_KEYFRAME_INTERVAL` releases, a keyframe release
+stores all of its pathways and genes instead, so getting the content of a release only replays the deltas since the
+nearest keyframe.
+
+The functions in this module work on the content of releases, i.e., dictionaries from WikiPathways identifiers to
+:class:`ReleasedPathway`, and don't need a database.
+"""
+
+from typing import Dict, FrozenSet, Iterable, List, Mapping, NamedTuple, Optional, Set, Tuple
+
+__all__ = [
+    'ReleasedPathway',
+    'PathwayChange',
+    'ReleaseDiff',
+    'diff_releases',
+    'replay_deltas',
+    'get_delta_rows',
+]
+
+
+class ReleasedPathway(NamedTuple):
+    """A pathway as it was in a release."""
+
+    identifier: str
+    name: str
+    revision: str
+    taxonomy_id: str
+    #: The Entrez gene identifiers of the pathway's proteins
+    entrez_ids: FrozenSet[str]
+
+
+class PathwayChange(NamedTuple):
+    """A pathway whose name, revision, species, or genes changed between two releases."""
+
+    old: ReleasedPathway
+    new: ReleasedPathway
+
+    @property
+    def identifier(self) -> str:  # noqa: D401
+        """The WikiPathways identifier of the pathway."""
+        return self.new.identifier
+
+    @property
+    def added_entrez_ids(self) -> FrozenSet[str]:  # noqa: D401
+        """The genes that are in the pathway in the new release but not in the old one."""
+        return self.new.entrez_ids - self.old.entrez_ids
+
+    @property
+    def removed_entrez_ids(self) -> FrozenSet[str]:  # noqa: D401
+        """The genes that were in the pathway in the old release but are not in the new one."""
+        return self.old.entrez_ids - self.new.entrez_ids
+
+
+class ReleaseDiff(NamedTuple):
+    """The pathways and genes that were added, removed, and changed from one release to another."""
+
+    added: List[ReleasedPathway]
+    removed: List[ReleasedPathway]
+    changed: List[PathwayChange]
+    #: The genes that are in some pathway in the new release but in none in the old one
+    added_entrez_ids: FrozenSet[str]
+    #: The genes that were in some pathway in the old release but are in none in the new one
+    removed_entrez_ids: FrozenSet[str]
+
+    def __bool__(self) -> bool:  # noqa: D105
+        return bool(self.added or self.removed or self.changed)
+
+    def summarize(self) -> Mapping[str, int]:
+        """Count the added, removed, and changed pathways and genes."""
+        return {
+            'added_pathways': len(self.added),
+            'removed_pathways': len(self.removed),
+            'changed_pathways': len(self.changed),
+            'added_genes': len(self.added_entrez_ids),
+            'removed_genes': len(self.removed_entrez_ids),
+        }
+
+
+def diff_releases(old: Mapping[str, ReleasedPathway], new: Mapping[str, ReleasedPathway]) -> ReleaseDiff:
+    """Compare the content of two releases.
+
+    :param old: A dictionary from WikiPathways identifiers to the pathways of the old release
+    :param new: A dictionary from WikiPathways identifiers to the pathways of the new release
+    :return: The differences, each sorted by WikiPathways identifier
+    """
+    return ReleaseDiff(
+        added=[new[identifier] for identifier in sorted(new.keys() - old.keys())],
+        removed=[old[identifier] for identifier in sorted(old.keys() - new.keys())],
+        changed=[
+            PathwayChange(old[identifier], new[identifier])
+            for identifier in sorted(old.keys() & new.keys())
+            if old[identifier] != new[identifier]
+        ],
+        added_entrez_ids=frozenset(_get_all_entrez_ids(new) - _get_all_entrez_ids(old)),
+        removed_entrez_ids=frozenset(_get_all_entrez_ids(old) - _get_all_entrez_ids(new)),
+    )
+
+
+def _get_all_entrez_ids(release: Mapping[str, ReleasedPathway]) -> Set[str]:
+    return {entrez_id for pathway in release.values() for entrez_id in pathway.entrez_ids}
+
+
+#: A pathway row of a delta: the WikiPathways identifier, name, revision, and taxonomy identifier, and whether the
+#: pathway was removed
+PathwayDeltaRow = Tuple[str, Optional[str], Optional[str], Optional[str], bool]
+
+#: A membership row of a delta: the WikiPathways identifier, the Entrez gene identifier, and whether it was added
+MembershipDeltaRow = Tuple[str, str, bool]
+
+
+def replay_deltas(
+    deltas: Iterable[Tuple[Iterable[PathwayDeltaRow], Iterable[MembershipDeltaRow]]],
+) -> Dict[str, ReleasedPathway]:
+    """Get the content of a release by applying the deltas of the releases since a keyframe, in order.
+
+    In each delta, the pathway rows are applied before the membership rows. A pathway that is added starts without
+    genes, and one that is changed keeps its genes.
+
+    :param deltas: The pathway and membership rows of each release, starting from a keyframe
+    :return: A dictionary from WikiPathways identifiers to pathways
+    """
+    metadata: Dict[str, Tuple[str, str, str]] = {}
+    genes: Dict[str, Set[str]] = {}
+    for pathway_rows, membership_rows in deltas:
+        for identifier, name, revision, taxonomy_id, removed in pathway_rows:
+            if removed:
+                del metadata[identifier]
+                del genes[identifier]
+            else:
+                metadata[identifier] = name, revision, taxonomy_id
+                genes.setdefault(identifier, set())
+        for identifier, entrez_id, added in membership_rows:
+            if added:
+                genes[identifier].add(entrez_id)
+            else:
+                genes[identifier].remove(entrez_id)
+
+    return {
+        identifier: ReleasedPathway(identifier, name, revision, taxonomy_id, frozenset(genes[identifier]))
+        for identifier, (name, revision, taxonomy_id) in metadata.items()
+    }
+
+
+def get_delta_rows(diff: ReleaseDiff) -> Tuple[List[PathwayDeltaRow], List[MembershipDeltaRow]]:
+    """Get the pathway and membership rows that turn the old release of a diff into the new one.
+
+    Removed pathways only get a pathway row, since replaying it drops their genes.
+    """
+    pathway_rows: List[PathwayDeltaRow] = []
+    membership_rows: List[MembershipDeltaRow] = []
+    for pathway in diff.added:
+        pathway_rows.append((pathway.identifier, pathway.name, pathway.revision, pathway.taxonomy_id, False))
+        membership_rows.extend((pathway.identifier, entrez_id, True) for entrez_id in sorted(pathway.entrez_ids))
+    for change in diff.changed:
+        new = change.new
+        pathway_rows.append((new.identifier, new.name, new.revision, new.taxonomy_id, False))
+        membership_rows.extend((new.identifier, entrez_id, True) for entrez_id in sorted(change.added_entrez_ids))
+        membership_rows.extend((new.identifier, entrez_id, False) for entrez_id in sorted(change.removed_entrez_ids))
+    for pathway in diff.removed:
+        pathway_rows.append((pathway.identifier, None, None, None, True))
+    return pathway_rows, membership_rows
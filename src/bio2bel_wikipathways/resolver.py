@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+
+"""An in-memory index resolving mixed gene identifiers to proteins and searching pathway names and symbols by prefix.
+
+The :class:`IdentifierIndex` is built from one query over each of the protein and pathway tables by
+:attr:`bio2bel_wikipathways.Manager.identifier_index`. It resolves each of these to the protein it identifies with a
+dictionary lookup:
+
+- Entrez gene identifiers, like ``1786`` or ``ncbigene:1786``
+- HGNC identifiers, like ``HGNC:2976`` or ``hgnc:2976``. Since they are numbers like Entrez gene identifiers, they
+  need the prefix.
+- HGNC gene symbols, like ``DNMT1`` or ``dnmt1``, in any case
+
+For autocompletion, the casefolded symbols and the casefolded words of the pathway names are kept in sorted lists,
+so the entries starting with a prefix are found by binary search, like in a trie but without a node per character.
+"""
+
+from bisect import bisect_left
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+__all__ = [
+    'ResolvedProtein',
+    'IndexedPathway',
+    'IdentifierIndex',
+]
+
+_ENTREZ_PREFIXES = ('ncbigene:', 'entrez:', 'egid:')
+_HGNC_PREFIX = 'hgnc:'
+
+
+class ResolvedProtein(NamedTuple):
+    """A protein an identifier was resolved to."""
+
+    entrez_id: str
+    hgnc_id: Optional[str]
+    hgnc_symbol: Optional[str]
+
+
+class IndexedPathway(NamedTuple):
+    """A pathway found by a prefix search."""
+
+    identifier: str
+    name: str
+
+
+class IdentifierIndex:
+    """Dictionaries from Entrez gene identifiers, HGNC identifiers, and symbols to proteins, and prefix search."""
+
+    def __init__(self, proteins: Iterable[ResolvedProtein], pathways: Iterable[IndexedPathway]):
+        """Build the index.
+
+        :param proteins: The proteins. If several have the same HGNC identifier or symbol, the first one wins.
+        :param pathways: The pathways
+        """
+        self.by_entrez_id: Dict[str, ResolvedProtein] = {}
+        self.by_hgnc_id: Dict[str, ResolvedProtein] = {}
+        self.by_symbol: Dict[str, ResolvedProtein] = {}
+        for protein in proteins:
+            self.by_entrez_id[protein.entrez_id] = protein
+            if protein.hgnc_id:
+                self.by_hgnc_id.setdefault(protein.hgnc_id, protein)
+            if protein.hgnc_symbol:
+                self.by_symbol.setdefault(protein.hgnc_symbol.casefold(), protein)
+        self._symbol_keys = sorted(self.by_symbol)
+
+        self.pathways: Dict[str, IndexedPathway] = {}
+        pathway_words: List[Tuple[str, str]] = []
+        for pathway in pathways:
+            self.pathways[pathway.identifier] = pathway
+            pathway_words.append((pathway.identifier.casefold(), pathway.identifier))
+            words = (pathway.name or '').casefold().split()
+            # index the name from the start of each word, so "sulf" finds "Trans-sulfuration pathway" only if it
+            # starts a word, but "calcium reg" finds "Calcium Regulation in the Cardiac Cell"
+            pathway_words.extend(
+                (' '.join(words[i:]), pathway.identifier)
+                for i in range(len(words))
+            )
+        pathway_words.sort()
+        self._pathway_keys = [key for key, _ in pathway_words]
+        self._pathway_values = [identifier for _, identifier in pathway_words]
+
+    def __len__(self) -> int:  # noqa: D105
+        return len(self.by_entrez_id)
+
+    def resolve(self, identifier: str) -> Optional[ResolvedProtein]:
+        """Get the protein with the given Entrez gene identifier, prefixed HGNC identifier, or HGNC gene symbol."""
+        identifier = identifier.strip()
+        key = identifier.casefold()
+        if key.startswith(_HGNC_PREFIX):
+            return self.by_hgnc_id.get(identifier[len(_HGNC_PREFIX):])
+        for prefix in _ENTREZ_PREFIXES:
+            if key.startswith(prefix):
+                return self.by_entrez_id.get(identifier[len(prefix):])
+        if identifier.isdigit():
+            return self.by_entrez_id.get(identifier)
+        return self.by_symbol.get(key)
+
+    def resolve_many(self, identifiers: Iterable[str]) -> Dict[str, Optional[ResolvedProtein]]:
+        """Resolve each identifier, or None if it isn't found."""
+        return {identifier: self.resolve(identifier) for identifier in identifiers}
+
+    def to_hgnc_symbols(self, identifiers: Iterable[str]) -> List[str]:
+        """Get the HGNC gene symbols of the proteins of the identifiers, keeping the ones that can't be resolved."""
+        rv = []
+        for identifier in identifiers:
+            protein = self.resolve(identifier)
+            rv.append(protein.hgnc_symbol if protein is not None and protein.hgnc_symbol else identifier)
+        return rv
+
+    def search_symbols(self, prefix: str, limit: int = 10) -> List[ResolvedProtein]:
+        """Get the proteins whose HGNC gene symbols start with the prefix, in any case, in alphabetical order."""
+        return [
+            self.by_symbol[key]
+            for key in self._iter_prefixed(self._symbol_keys, prefix.strip().casefold(), limit)
+        ]
+
+    def search_pathways(self, prefix: str, limit: int = 10) -> List[IndexedPathway]:
+        """Get the pathways whose identifier or a word of whose name starts with the prefix, in any case."""
+        prefix = ' '.join(prefix.casefold().split())
+        rv: Dict[str, IndexedPathway] = {}
+        position = bisect_left(self._pathway_keys, prefix)
+        while len(rv) < limit and position < len(self._pathway_keys):
+            if not self._pathway_keys[position].startswith(prefix):
+                break
+            identifier = self._pathway_values[position]
+            rv.setdefault(identifier, self.pathways[identifier])
+            position += 1
+        return list(rv.values())
+
+    @staticmethod
+    def _iter_prefixed(keys: List[str], prefix: str, limit: int) -> Iterable[str]:
+        start = bisect_left(keys, prefix)
+        for key in keys[start:start + limit]:
+            if not key.startswith(prefix):
+                return
+            yield key
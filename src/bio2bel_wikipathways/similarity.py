@@ -0,0 +1,391 @@
+# -*- coding: utf-8 -*-
+
+"""All-pairs similarity of pathways from their shared genes, for comparing pathway databases with ComPath.
+
+The memberships are loaded into a :class:`bio2bel_wikipathways.enrichment.MembershipMatrix` whose genes are Entrez
+gene identifiers, so pathways of all species are covered. Its product with its own transpose gives the number of
+genes shared by each pair of pathways. :func:`compute_similarities` computes it for one block of rows at a time and
+keeps only the pairs that overlap, so memory grows with the number of overlapping pairs, not the square of the number
+of pathways.
+
+For very large collections, :func:`compute_approximate_similarities` only considers the pairs that a MinHash
+signature and locality-sensitive hashing (LSH) find to be likely similar. The overlaps of those candidates are then
+counted exactly, so the approximation can only miss pairs, mostly ones with a low Jaccard index, and never changes
+the similarity of a pair it reports.
+
+Both give a :class:`PathwaySimilarities` with the Jaccard index, the overlap coefficient, and the hypergeometric
+p-value and Benjamini-Hochberg q-value of the overlap of each pair. It can be written as TSV and saved to and loaded
+from a NumPy ``.npz`` file, which is how :meth:`bio2bel_wikipathways.Manager.get_pathway_similarities` caches it.
+"""
+
+import hashlib
+import json
+from itertools import combinations
+from typing import Any, Dict, Iterable, Mapping, Optional, Sequence, TextIO
+
+import numpy as np
+from scipy import sparse
+from scipy.stats import hypergeom
+
+from .constants import SIMILARITY_BLOCK_SIZE
+from .enrichment import MembershipMatrix, benjamini_hochberg
+
+__all__ = [
+    'PathwaySimilarities',
+    'SIMILARITY_METHODS',
+    'SIMILARITY_TSV_HEADER',
+    'compute_similarities',
+    'compute_approximate_similarities',
+    'minhash_signatures',
+    'get_lsh_candidates',
+    'get_matrix_digest',
+]
+
+#: The methods of :meth:`bio2bel_wikipathways.Manager.get_pathway_similarities`
+SIMILARITY_METHODS = ('exact', 'minhash')
+
+#: The columns of :meth:`PathwaySimilarities.write_tsv`
+SIMILARITY_TSV_HEADER = [
+    'pathway_id_1', 'pathway_name_1', 'pathway_id_2', 'pathway_name_2',
+    'shared_genes', 'pathway_size_1', 'pathway_size_2',
+    'jaccard', 'overlap_coefficient', 'p_value', 'q_value',
+]
+
+#: The Mersenne prime 2^31 - 1, the modulus of the MinHash functions
+_PRIME = (1 << 31) - 1
+
+
+class PathwaySimilarities:
+    """The overlapping pairs of pathways and their similarities."""
+
+    def __init__(
+        self,
+        pathway_ids: Sequence[str],
+        pathway_names: Sequence[str],
+        pathway_sizes: np.ndarray,
+        number_genes: int,
+        left: np.ndarray,
+        right: np.ndarray,
+        shared: np.ndarray,
+        metadata: Optional[Mapping[str, Any]] = None,
+    ):
+        """Initialize the similarities.
+
+        :param pathway_ids: The identifiers of all pathways that were compared
+        :param pathway_names: The names of all pathways that were compared
+        :param pathway_sizes: The number of genes in each pathway
+        :param number_genes: The number of genes in any of the pathways, which is the universe of the hypergeometric
+         test
+        :param left: The index of the first pathway of each pair
+        :param right: The index of the second pathway of each pair, which is larger than the first
+        :param shared: The number of genes shared by each pair
+        :param metadata: Information about how the similarities were computed, like the data version and method
+        """
+        self.pathway_ids = list(pathway_ids)
+        self.pathway_names = list(pathway_names)
+        self.pathway_sizes = np.asarray(pathway_sizes, dtype=np.int64)
+        self.number_genes = number_genes
+        order = np.lexsort((right, left))
+        self.left = np.asarray(left, dtype=np.int64)[order]
+        self.right = np.asarray(right, dtype=np.int64)[order]
+        self.shared = np.asarray(shared, dtype=np.int64)[order]
+        self.metadata = dict(metadata or {})
+        self._p_values = None
+        self._q_values = None
+
+    def __len__(self) -> int:  # noqa: D105
+        return self.left.size
+
+    @property
+    def number_pathways(self) -> int:  # noqa: D401
+        """The number of pathways that were compared."""
+        return len(self.pathway_ids)
+
+    @property
+    def jaccard(self) -> np.ndarray:  # noqa: D401
+        """The number of shared genes of each pair divided by the number of genes in either pathway."""
+        sizes_left, sizes_right = self.pathway_sizes[self.left], self.pathway_sizes[self.right]
+        return self.shared / (sizes_left + sizes_right - self.shared)
+
+    @property
+    def overlap_coefficient(self) -> np.ndarray:  # noqa: D401
+        """The number of shared genes of each pair divided by the size of the smaller pathway."""
+        return self.shared / np.minimum(self.pathway_sizes[self.left], self.pathway_sizes[self.right])
+
+    @property
+    def p_values(self) -> np.ndarray:  # noqa: D401
+        """The probability of each pair sharing at least as many genes by chance, from a hypergeometric test."""
+        if self._p_values is None:
+            self._p_values = hypergeom.sf(
+                self.shared - 1,
+                self.number_genes,
+                self.pathway_sizes[self.left],
+                self.pathway_sizes[self.right],
+            )
+        return self._p_values
+
+    @property
+    def q_values(self) -> np.ndarray:  # noqa: D401
+        """The Benjamini-Hochberg corrected p-values, counting every pair of pathways as a test."""
+        if self._q_values is None:
+            number_tests = self.number_pathways * (self.number_pathways - 1) // 2
+            self._q_values = benjamini_hochberg(self.p_values, number_tests=number_tests or None)
+        return self._q_values
+
+    def get_similar_pathways(self, pathway_id: str) -> Dict[str, Dict[str, Any]]:
+        """Get the pathways that overlap the given pathway and their similarities to it."""
+        try:
+            index = self.pathway_ids.index(pathway_id)
+        except ValueError:
+            return {}
+        positions, = np.nonzero((self.left == index) | (self.right == index))
+        return {
+            row['pathway_id_2' if row['pathway_id_1'] == pathway_id else 'pathway_id_1']: row
+            for row in self._iter_rows(positions)
+        }
+
+    def iter_rows(self) -> Iterable[Dict[str, Any]]:
+        """Iterate over the pairs as dictionaries with the keys in :data:`SIMILARITY_TSV_HEADER`."""
+        return self._iter_rows(range(len(self)))
+
+    def _iter_rows(self, positions: Iterable[int]) -> Iterable[Dict[str, Any]]:
+        jaccard, overlap_coefficient = self.jaccard, self.overlap_coefficient
+        p_values, q_values = self.p_values, self.q_values
+        for position in positions:
+            left, right = self.left[position], self.right[position]
+            yield {
+                'pathway_id_1': self.pathway_ids[left],
+                'pathway_name_1': self.pathway_names[left],
+                'pathway_id_2': self.pathway_ids[right],
+                'pathway_name_2': self.pathway_names[right],
+                'shared_genes': int(self.shared[position]),
+                'pathway_size_1': int(self.pathway_sizes[left]),
+                'pathway_size_2': int(self.pathway_sizes[right]),
+                'jaccard': float(jaccard[position]),
+                'overlap_coefficient': float(overlap_coefficient[position]),
+                'p_value': float(p_values[position]),
+                'q_value': float(q_values[position]),
+            }
+
+    def write_tsv(self, file: TextIO) -> int:
+        """Write the pairs with the columns in :data:`SIMILARITY_TSV_HEADER`.
+
+        :return: The number of pairs written
+        """
+        file.write('\t'.join(SIMILARITY_TSV_HEADER) + '\n')
+        for row in self.iter_rows():
+            file.write('\t'.join(str(row[column]) for column in SIMILARITY_TSV_HEADER) + '\n')
+        return len(self)
+
+    def save(self, path: str) -> None:
+        """Save the similarities to a NumPy ``.npz`` file."""
+        with open(path, 'wb') as file:
+            np.savez_compressed(
+                file,
+                pathway_ids=np.array(self.pathway_ids, dtype=str),
+                pathway_names=np.array(self.pathway_names, dtype=str),
+                pathway_sizes=self.pathway_sizes,
+                number_genes=np.array(self.number_genes),
+                left=self.left,
+                right=self.right,
+                shared=self.shared,
+                metadata=np.array(json.dumps(self.metadata)),
+            )
+
+    @classmethod
+    def load(cls, path: str) -> 'PathwaySimilarities':
+        """Load similarities saved with :meth:`save`."""
+        with np.load(path, allow_pickle=False) as arrays:
+            return cls(
+                pathway_ids=arrays['pathway_ids'].tolist(),
+                pathway_names=arrays['pathway_names'].tolist(),
+                pathway_sizes=arrays['pathway_sizes'],
+                number_genes=int(arrays['number_genes']),
+                left=arrays['left'],
+                right=arrays['right'],
+                shared=arrays['shared'],
+                metadata=json.loads(str(arrays['metadata'])),
+            )
+
+
+def _from_pairs(
+    matrix: MembershipMatrix,
+    left: np.ndarray,
+    right: np.ndarray,
+    shared: np.ndarray,
+    *,
+    min_shared: int,
+    min_jaccard: float,
+    metadata: Optional[Mapping[str, Any]],
+) -> PathwaySimilarities:
+    """Build the similarities of the pairs sharing enough genes and with a high enough Jaccard index."""
+    sizes = matrix.pathway_sizes.astype(np.int64)
+    keep = shared >= max(min_shared, 1)
+    if min_jaccard > 0:
+        keep &= shared >= min_jaccard * (sizes[left] + sizes[right] - shared)
+    return PathwaySimilarities(
+        pathway_ids=matrix.pathway_ids,
+        pathway_names=matrix.pathway_names,
+        pathway_sizes=sizes,
+        number_genes=matrix.number_genes,
+        left=left[keep],
+        right=right[keep],
+        shared=shared[keep],
+        metadata=metadata,
+    )
+
+
+def compute_similarities(
+    matrix: MembershipMatrix,
+    *,
+    min_shared: int = 1,
+    min_jaccard: float = 0.0,
+    block_size: int = SIMILARITY_BLOCK_SIZE,
+    metadata: Optional[Mapping[str, Any]] = None,
+) -> PathwaySimilarities:
+    """Compute the similarities of all pairs of pathways that share genes.
+
+    :param matrix: The membership matrix
+    :param min_shared: Only keep the pairs sharing at least this many genes
+    :param min_jaccard: Only keep the pairs with at least this Jaccard index
+    :param block_size: The number of pathways whose overlaps with all others are computed at once
+    :param metadata: Information to keep with the similarities
+    """
+    memberships = matrix.matrix.astype(np.int32)
+    transposed = memberships.T.tocsc()
+    lefts, rights, shareds = [], [], []
+    for start in range(0, matrix.number_pathways, block_size):
+        block = (memberships[start:start + block_size] @ transposed).tocoo()
+        rows = block.row.astype(np.int64) + start
+        upper = block.col > rows
+        lefts.append(rows[upper])
+        rights.append(block.col[upper].astype(np.int64))
+        shareds.append(block.data[upper].astype(np.int64))
+
+    return _from_pairs(
+        matrix,
+        np.concatenate(lefts) if lefts else np.empty(0, dtype=np.int64),
+        np.concatenate(rights) if rights else np.empty(0, dtype=np.int64),
+        np.concatenate(shareds) if shareds else np.empty(0, dtype=np.int64),
+        min_shared=min_shared,
+        min_jaccard=min_jaccard,
+        metadata=metadata,
+    )
+
+
+def minhash_signatures(matrix: sparse.csr_matrix, number_permutations: int, seed: int = 0) -> np.ndarray:
+    """Compute a MinHash signature of the columns in each row of a sparse matrix.
+
+    Each permutation is a random hash function ``(a * column + b) mod p``. The probability that two rows have the
+    same value for a permutation is the Jaccard index of their columns. Empty rows get the value ``p`` everywhere.
+
+    :return: An array of rows x permutations
+    """
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, _PRIME, size=number_permutations, dtype=np.int64)
+    b = rng.integers(0, _PRIME, size=number_permutations, dtype=np.int64)
+
+    rv = np.full((matrix.shape[0], number_permutations), _PRIME, dtype=np.int64)
+    non_empty = np.diff(matrix.indptr) > 0
+    if not non_empty.any():
+        return rv
+    # the entries of the non-empty rows are contiguous, so each one's minimum is one reduction from its start
+    starts = matrix.indptr[:-1][non_empty]
+    columns = matrix.indices.astype(np.int64)
+    for permutation in range(number_permutations):
+        hashes = (a[permutation] * columns + b[permutation]) % _PRIME
+        rv[non_empty, permutation] = np.minimum.reduceat(hashes, starts)
+    return rv
+
+
+def get_lsh_candidates(signatures: np.ndarray, bands: int) -> np.ndarray:
+    """Get the pairs of rows whose signatures are equal in at least one band.
+
+    With ``r`` permutations per band, a pair with Jaccard index ``s`` becomes a candidate with a probability of
+    ``1 - (1 - s ** r) ** bands``, so the threshold around which pairs are found is about ``(1 / bands) ** (1 / r)``.
+
+    :param signatures: The MinHash signatures from :func:`minhash_signatures`. Rows whose signature is all ``p``,
+     i.e., empty rows, are never candidates.
+    :param bands: The number of bands, which must divide the number of permutations
+    :return: An array of pairs of row indexes, the first smaller than the second
+    """
+    number_rows, number_permutations = signatures.shape
+    if number_permutations % bands:
+        raise ValueError(f'{bands} bands do not divide {number_permutations} permutations')
+    rows_per_band = number_permutations // bands
+    non_empty, = np.nonzero(signatures[:, 0] != _PRIME)
+
+    candidates = set()
+    for band in range(bands):
+        band_signatures = signatures[non_empty, band * rows_per_band:(band + 1) * rows_per_band]
+        _, buckets = np.unique(band_signatures, axis=0, return_inverse=True)
+        order = np.argsort(buckets, kind='stable')
+        boundaries = np.flatnonzero(np.diff(buckets[order])) + 1
+        for bucket in np.split(non_empty[order], boundaries):
+            if len(bucket) > 1:
+                candidates.update(combinations(sorted(bucket.tolist()), 2))
+
+    if not candidates:
+        return np.empty((0, 2), dtype=np.int64)
+    return np.array(sorted(candidates), dtype=np.int64)
+
+
+def compute_approximate_similarities(
+    matrix: MembershipMatrix,
+    *,
+    number_permutations: int = 128,
+    bands: int = 32,
+    seed: int = 0,
+    min_shared: int = 1,
+    min_jaccard: float = 0.0,
+    block_size: int = 100_000,
+    metadata: Optional[Mapping[str, Any]] = None,
+) -> PathwaySimilarities:
+    """Compute the similarities of the pairs of pathways that MinHash LSH finds to be likely similar.
+
+    :param matrix: The membership matrix
+    :param number_permutations: The length of the MinHash signatures
+    :param bands: The number of LSH bands. More bands find pairs with lower Jaccard indexes, at the cost of more
+     candidates to count.
+    :param seed: The seed of the MinHash functions
+    :param min_shared: Only keep the pairs sharing at least this many genes
+    :param min_jaccard: Only keep the pairs with at least this Jaccard index
+    :param block_size: The number of candidate pairs whose shared genes are counted at once
+    :param metadata: Information to keep with the similarities
+    """
+    memberships = matrix.matrix.astype(np.int32)
+    candidates = get_lsh_candidates(minhash_signatures(memberships, number_permutations, seed=seed), bands)
+    left, right = candidates[:, 0], candidates[:, 1]
+    shared = np.concatenate([
+        np.asarray(
+            memberships[left[start:start + block_size]]
+            .multiply(memberships[right[start:start + block_size]])
+            .sum(axis=1),
+        ).ravel()
+        for start in range(0, len(candidates), block_size)
+    ] or [np.empty(0, dtype=np.int64)]).astype(np.int64)
+
+    return _from_pairs(
+        matrix,
+        left,
+        right,
+        shared,
+        min_shared=min_shared,
+        min_jaccard=min_jaccard,
+        metadata=metadata,
+    )
+
+
+def get_matrix_digest(matrix: MembershipMatrix, **parameters: Any) -> str:
+    """Get a digest of the content of the membership matrix and the parameters the similarities are computed with.
+
+    Cached similarities are only reused if this digest is the same, so they are recomputed whenever the
+    database changes, not only when its data version does.
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps(parameters, sort_keys=True).encode('utf-8'))
+    for strings in (matrix.pathway_ids, matrix.genes):
+        digest.update('\t'.join(strings).encode('utf-8'))
+    digest.update(np.ascontiguousarray(matrix.matrix.indptr, dtype=np.int64).tobytes())
+    digest.update(np.ascontiguousarray(matrix.matrix.indices, dtype=np.int64).tobytes())
+    return digest.hexdigest()
@@ -0,0 +1,369 @@
+# -*- coding: utf-8 -*-
+
+"""A compact, memory-mappable binary snapshot of the pathway-protein memberships.
+
+A snapshot holds the species, proteins, pathways, and memberships of a populated database in one file that is read
+with :mod:`numpy` memory maps, so it can be used without a database, :mod:`sqlalchemy`, or :mod:`flask_admin`.
+It is written with :meth:`bio2bel_wikipathways.Manager.export_snapshot` and read with :class:`Snapshot`.
+
+The file starts with the magic bytes ``B2BWPSNP``, the format version as a little-endian unsigned 32-bit integer,
+and the length of a JSON header as a little-endian unsigned 64-bit integer. The JSON header lists the data version
+and the dtype, offset, and length of each array. The arrays follow, each aligned to 8 bytes:
+
+- Each string column is stored as the concatenated UTF-8 bytes (``<column>.data``) and the offsets of each string
+  in them (``<column>.offsets``). Missing values are stored as empty strings.
+- Pathways are sorted by identifier and proteins by Entrez gene identifier, so both are found by binary search.
+  ``protein.by_symbol`` holds the protein indexes sorted by HGNC gene symbol.
+- The memberships are stored twice in compressed sparse row layout, as the protein indexes of each pathway
+  (``pathway.indptr`` and ``pathway.indices``) and the pathway indexes of each protein (``protein.indptr`` and
+  ``protein.indices``).
+"""
+
+import json
+import struct
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+__all__ = [
+    'Snapshot',
+    'SnapshotSpecies',
+    'SnapshotPathway',
+    'SnapshotProtein',
+    'write_snapshot',
+    'FORMAT_VERSION',
+]
+
+MAGIC = b'B2BWPSNP'
+
+#: The version of the snapshot file format. Incremented when the layout changes.
+FORMAT_VERSION = 1
+
+_PREAMBLE = struct.Struct('<8sIQ')
+_ALIGNMENT = 8
+
+
+class SnapshotSpecies(NamedTuple):
+    """A species in a snapshot."""
+
+    taxonomy_id: str
+    name: str
+
+
+class SnapshotProtein(NamedTuple):
+    """A protein in a snapshot."""
+
+    entrez_id: str
+    hgnc_id: Optional[str]
+    hgnc_symbol: Optional[str]
+
+
+class SnapshotPathway(NamedTuple):
+    """A pathway in a snapshot."""
+
+    identifier: str
+    name: Optional[str]
+    revision: Optional[str]
+    taxonomy_id: str
+    species_name: str
+
+
+def _encode_strings(values: Iterable[Optional[str]]) -> Tuple[np.ndarray, np.ndarray]:
+    encoded = [(value or '').encode('utf-8') for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype='<i8')
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    return offsets, np.frombuffer(b''.join(encoded), dtype=np.uint8)
+
+
+def _build_csr(pairs: Sequence[Tuple[int, int]], number_rows: int) -> Tuple[np.ndarray, np.ndarray]:
+    pairs = np.array(pairs, dtype='<i4').reshape(-1, 2)
+    pairs = pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+    indptr = np.zeros(number_rows + 1, dtype='<i8')
+    np.cumsum(np.bincount(pairs[:, 0], minlength=number_rows), out=indptr[1:])
+    return indptr, np.ascontiguousarray(pairs[:, 1])
+
+
+def write_snapshot(
+    path: str,
+    *,
+    species: Sequence[Tuple[str, str]],
+    proteins: Sequence[Tuple[str, Optional[str], Optional[str]]],
+    pathways: Sequence[Tuple[str, Optional[str], Optional[str], int]],
+    memberships: Iterable[Tuple[int, int]],
+    data_version: Optional[str] = None,
+    metadata: Optional[Mapping[str, Any]] = None,
+) -> None:
+    """Write a snapshot.
+
+    :param path: The path of the snapshot file
+    :param species: Pairs of NCBI taxonomy identifiers and names
+    :param proteins: Triples of Entrez gene identifiers, HGNC identifiers, and HGNC gene symbols
+    :param pathways: Quadruples of WikiPathways identifiers, names, revisions, and the indexes of their species
+    :param memberships: Pairs of indexes of pathways and indexes of proteins
+    :param data_version: The version of the WikiPathways data
+    :param metadata: Additional JSON-serializable information to store in the header
+    """
+    protein_order = sorted(range(len(proteins)), key=lambda i: proteins[i][0])
+    protein_position = np.empty(len(proteins), dtype='<i4')
+    protein_position[protein_order] = np.arange(len(proteins), dtype='<i4')
+    proteins = [proteins[i] for i in protein_order]
+
+    pathway_order = sorted(range(len(pathways)), key=lambda i: pathways[i][0])
+    pathway_position = np.empty(len(pathways), dtype='<i4')
+    pathway_position[pathway_order] = np.arange(len(pathways), dtype='<i4')
+    pathways = [pathways[i] for i in pathway_order]
+
+    memberships = [
+        (pathway_position[pathway], protein_position[protein])
+        for pathway, protein in memberships
+    ]
+
+    arrays: Dict[str, np.ndarray] = {}
+    for name, column in (
+        ('species.taxonomy_id', [taxonomy_id for taxonomy_id, _ in species]),
+        ('species.name', [species_name for _, species_name in species]),
+        ('protein.entrez_id', [protein[0] for protein in proteins]),
+        ('protein.hgnc_id', [protein[1] for protein in proteins]),
+        ('protein.hgnc_symbol', [protein[2] for protein in proteins]),
+        ('pathway.identifier', [pathway[0] for pathway in pathways]),
+        ('pathway.name', [pathway[1] for pathway in pathways]),
+        ('pathway.revision', [pathway[2] for pathway in pathways]),
+    ):
+        arrays[f'{name}.offsets'], arrays[f'{name}.data'] = _encode_strings(column)
+
+    arrays['pathway.species'] = np.array([pathway[3] for pathway in pathways], dtype='<i4')
+    arrays['protein.by_symbol'] = np.array(
+        sorted(range(len(proteins)), key=lambda i: proteins[i][2] or ''),
+        dtype='<i4',
+    )
+    arrays['pathway.indptr'], arrays['pathway.indices'] = _build_csr(memberships, len(pathways))
+    arrays['protein.indptr'], arrays['protein.indices'] = _build_csr(
+        [(protein, pathway) for pathway, protein in memberships],
+        len(proteins),
+    )
+
+    descriptions = {}
+    offset = 0
+    for name, array in arrays.items():
+        descriptions[name] = {'dtype': array.dtype.str, 'offset': offset, 'length': len(array)}
+        offset += -(-array.nbytes // _ALIGNMENT) * _ALIGNMENT
+
+    header = json.dumps({
+        'data_version': data_version,
+        'metadata': dict(metadata or {}),
+        'arrays': descriptions,
+    }).encode('utf-8')
+    header += b' ' * (-(_PREAMBLE.size + len(header)) % _ALIGNMENT)
+
+    with open(path, 'wb') as file:
+        file.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header)))
+        file.write(header)
+        for array in arrays.values():
+            file.write(array.tobytes())
+            file.write(b'\0' * (-array.nbytes % _ALIGNMENT))
+
+
+class Snapshot:
+    """A read-only view of a snapshot file through a memory map.
+
+    Opening a snapshot only reads its header. Lookups use binary search on the memory-mapped arrays, so only the
+    pages they touch are read from disk.
+    """
+
+    def __init__(self, path: str):
+        """Open a snapshot.
+
+        :param path: The path of the snapshot file
+        :raises ValueError: If the file is not a snapshot or has an unsupported format version
+        """
+        self.path = path
+        self._buffer = np.memmap(path, dtype=np.uint8, mode='r')
+        magic, self.format_version, header_length = _PREAMBLE.unpack_from(self._buffer)
+        if magic != MAGIC:
+            raise ValueError(f'{path} is not a WikiPathways snapshot')
+        if self.format_version != FORMAT_VERSION:
+            raise ValueError(f'{path} has format version {self.format_version}, expected {FORMAT_VERSION}')
+
+        start = _PREAMBLE.size + header_length
+        header = json.loads(bytes(self._buffer[_PREAMBLE.size:start]))
+        self.data_version: Optional[str] = header['data_version']
+        self.metadata: Mapping[str, Any] = header['metadata']
+        self._arrays: Dict[str, np.ndarray] = {
+            name: np.frombuffer(
+                self._buffer,
+                dtype=description['dtype'],
+                count=description['length'],
+                offset=start + description['offset'],
+            )
+            for name, description in header['arrays'].items()
+        }
+
+    def close(self) -> None:
+        """Release the memory map."""
+        self._arrays.clear()
+        self._buffer = None
+
+    def __enter__(self) -> 'Snapshot':  # noqa: D105
+        return self
+
+    def __exit__(self, *args) -> None:  # noqa: D105
+        self.close()
+
+    @property
+    def number_species(self) -> int:  # noqa: D401
+        """The number of species."""
+        return len(self._arrays['species.taxonomy_id.offsets']) - 1
+
+    @property
+    def number_proteins(self) -> int:  # noqa: D401
+        """The number of proteins."""
+        return len(self._arrays['protein.entrez_id.offsets']) - 1
+
+    @property
+    def number_pathways(self) -> int:  # noqa: D401
+        """The number of pathways."""
+        return len(self._arrays['pathway.identifier.offsets']) - 1
+
+    def _get_string(self, column: str, index: int) -> Optional[str]:
+        offsets = self._arrays[f'{column}.offsets']
+        value = bytes(self._arrays[f'{column}.data'][offsets[index]:offsets[index + 1]]).decode('utf-8')
+        return value or None
+
+    def _search(self, column: str, value: str, order: Optional[np.ndarray] = None) -> Tuple[int, int]:
+        """Find the range of positions of the value in a sorted string column, or in its order if given."""
+        size = len(self._arrays[f'{column}.offsets']) - 1
+
+        def _get(position: int) -> str:
+            return self._get_string(column, position if order is None else order[position]) or ''
+
+        low, high = 0, size
+        while low < high:
+            middle = (low + high) // 2
+            if _get(middle) < value:
+                low = middle + 1
+            else:
+                high = middle
+        end = low
+        while end < size and _get(end) == value:
+            end += 1
+        return low, end
+
+    def _get_pathway_index(self, identifier: str) -> Optional[int]:
+        start, end = self._search('pathway.identifier', identifier)
+        return start if start < end else None
+
+    def _get_pathway(self, index: int) -> SnapshotPathway:
+        species = int(self._arrays['pathway.species'][index])
+        return SnapshotPathway(
+            identifier=self._get_string('pathway.identifier', index),
+            name=self._get_string('pathway.name', index),
+            revision=self._get_string('pathway.revision', index),
+            taxonomy_id=self._get_string('species.taxonomy_id', species),
+            species_name=self._get_string('species.name', species),
+        )
+
+    def _get_protein(self, index: int) -> SnapshotProtein:
+        return SnapshotProtein(
+            entrez_id=self._get_string('protein.entrez_id', index),
+            hgnc_id=self._get_string('protein.hgnc_id', index),
+            hgnc_symbol=self._get_string('protein.hgnc_symbol', index),
+        )
+
+    def _get_members(self, kind: str, index: int) -> np.ndarray:
+        indptr = self._arrays[f'{kind}.indptr']
+        return self._arrays[f'{kind}.indices'][indptr[index]:indptr[index + 1]]
+
+    def get_species(self) -> List[SnapshotSpecies]:
+        """Get all species."""
+        return [
+            SnapshotSpecies(self._get_string('species.taxonomy_id', i), self._get_string('species.name', i))
+            for i in range(self.number_species)
+        ]
+
+    def iter_pathways(self) -> Iterable[SnapshotPathway]:
+        """Iterate over all pathways, sorted by identifier."""
+        for index in range(self.number_pathways):
+            yield self._get_pathway(index)
+
+    def iter_proteins(self) -> Iterable[SnapshotProtein]:
+        """Iterate over all proteins, sorted by Entrez gene identifier."""
+        for index in range(self.number_proteins):
+            yield self._get_protein(index)
+
+    def iter_memberships(self) -> Iterable[Tuple[int, int]]:
+        """Iterate over pairs of pathway indexes and protein indexes, in the order of the iterators above."""
+        indptr, indices = self._arrays['pathway.indptr'], self._arrays['pathway.indices']
+        for pathway in range(self.number_pathways):
+            for protein in indices[indptr[pathway]:indptr[pathway + 1]]:
+                yield pathway, int(protein)
+
+    def get_pathway_by_id(self, pathway_id: str) -> Optional[SnapshotPathway]:
+        """Get a pathway by its WikiPathways identifier."""
+        index = self._get_pathway_index(pathway_id)
+        return None if index is None else self._get_pathway(index)
+
+    def get_protein_by_entrez_id(self, entrez_id: str) -> Optional[SnapshotProtein]:
+        """Get a protein by its Entrez gene identifier."""
+        start, end = self._search('protein.entrez_id', entrez_id)
+        return self._get_protein(start) if start < end else None
+
+    def get_proteins(self, pathway_id: str) -> List[SnapshotProtein]:
+        """Get the proteins in a pathway."""
+        index = self._get_pathway_index(pathway_id)
+        if index is None:
+            return []
+        return [self._get_protein(protein) for protein in self._get_members('pathway', index)]
+
+    def get_gene_set(self, pathway_id: str) -> Set[str]:
+        """Get the HGNC gene symbols of the proteins in a pathway."""
+        return {protein.hgnc_symbol for protein in self.get_proteins(pathway_id) if protein.hgnc_symbol}
+
+    def _get_protein_indexes_by_hgnc_symbol(self, hgnc_symbol: str) -> np.ndarray:
+        order = self._arrays['protein.by_symbol']
+        start, end = self._search('protein.hgnc_symbol', hgnc_symbol, order=order)
+        return order[start:end]
+
+    def get_pathway_ids_by_hgnc_symbol(self, hgnc_symbol: str) -> Set[str]:
+        """Get the identifiers of the pathways a gene with the HGNC gene symbol is in."""
+        return {
+            self._get_string('pathway.identifier', pathway)
+            for protein in self._get_protein_indexes_by_hgnc_symbol(hgnc_symbol)
+            for pathway in self._get_members('protein', protein)
+        }
+
+    def query_hgnc_symbols(self, hgnc_symbols: Iterable[str]) -> Mapping[str, Mapping]:
+        """Calculate the pathway counter dictionary like :meth:`bio2bel_wikipathways.Manager.query_hgnc_symbols`."""
+        counts: Dict[int, int] = {}
+        for hgnc_symbol in set(hgnc_symbols):
+            for protein in self._get_protein_indexes_by_hgnc_symbol(hgnc_symbol):
+                for pathway in self._get_members('protein', protein):
+                    counts[int(pathway)] = counts.get(int(pathway), 0) + 1
+
+        rv = {}
+        for pathway, count in counts.items():
+            pathway_id = self._get_string('pathway.identifier', pathway)
+            gene_set = {
+                protein.hgnc_symbol
+                for protein in map(self._get_protein, self._get_members('pathway', pathway))
+                if protein.hgnc_symbol
+            }
+            rv[pathway_id] = {
+                'pathway_id': pathway_id,
+                'pathway_name': self._get_string('pathway.name', pathway),
+                'mapped_proteins': count,
+                'pathway_size': len(gene_set),
+                'pathway_gene_set': gene_set,
+            }
+        return rv
+
+    def to_membership_matrix(self):
+        """Build a :class:`bio2bel_wikipathways.enrichment.MembershipMatrix` for enrichment. Requires :mod:`scipy`."""
+        from .enrichment import MembershipMatrix
+
+        pathways = list(self.iter_pathways())
+        symbols = [protein.hgnc_symbol for protein in self.iter_proteins()]
+        return MembershipMatrix.from_rows(
+            (pathways[pathway].identifier, pathways[pathway].name, symbols[protein])
+            for pathway, protein in self.iter_memberships()
+            if symbols[protein]
+        )
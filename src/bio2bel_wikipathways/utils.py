@@ -2,13 +2,29 @@
 
 """Utilities for Bio2BEL WikiPathways."""
 
+from itertools import islice
+from typing import Iterable, Iterator, List, TypeVar
+
 from .constants import VERSION
 
 __all__ = [
     'get_version',
+    'chunked',
 ]
 
+X = TypeVar('X')
+
 
 def get_version() -> str:
     """Return the software version of Bio2BEL WikiPathways."""
     return VERSION
+
+
+def chunked(iterable: Iterable[X], size: int) -> Iterator[List[X]]:
+    """Iterate over lists of at most the given size from the iterable."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+
+"""Flask-Admin views for Bio2BEL WikiPathways."""
+
+from flask_admin.contrib.sqla import ModelView
+
+from .models import Pathway, Protein
+
+__all__ = [
+    'PathwayView',
+    'ProteinView',
+]
+
+
+class PathwayView(ModelView):
+    """Pathway view in Flask-admin."""
+
+    column_searchable_list = (
+        Pathway.identifier,
+        Pathway.name,
+    )
+
+
+class ProteinView(ModelView):
+    """Protein view in Flask-admin."""
+
+    column_searchable_list = (
+        Protein.entrez_id,
+        Protein.hgnc_symbol,
+        Protein.hgnc_id,
+    )
@@ -1,10 +1,241 @@
 # -*- coding: utf-8 -*-
 
-"""WSGI module for Bio2BEL WikiPathways."""
+"""WSGI module for Bio2BEL WikiPathways.
+
+:func:`create_app` builds a read-only JSON query service on top of :class:`bio2bel_wikipathways.Manager`. Serve it
+with any WSGI server, e.g., ``gunicorn 'bio2bel_wikipathways.web:create_app()'``, or with
+``python3 -m bio2bel_wikipathways serve`` for testing. It has the following endpoints:
+
+- ``GET /api/pathway/<pathway_id>`` gets a pathway with its species and proteins
+- ``GET /api/pathway/<pathway_id>/graph`` gets the BEL graph of a pathway as node-link JSON, or as a BEL script
+  with ``?format=bel``
+- ``GET /api/enrich?genes=A,B,C`` or ``POST /api/enrich`` with ``{"genes": ["A", "B", "C"]}`` calculates the
+  enrichment of genes in each pathway, optionally only against the pathways of the species in ``taxonomy_id``. The
+  genes can be any mix of HGNC gene symbols, Entrez gene identifiers, and prefixed HGNC identifiers.
+- ``GET /api/search?q=calc`` autocompletes pathway identifiers and names and HGNC gene symbols starting with ``q``
+
+Lookups go through a pool of database connections and the manager's pathway cache, and enrichment and search through its
+in-memory membership matrix and identifier index. The responses of the pathway endpoints have ETags made from the data
+version and the pathway's revision, and the ones of the enrichment endpoint from the data version and the query. A
+request with a matching ``If-None-Match`` header gets an empty ``304 Not Modified`` response before anything is loaded.
+
+Running this module starts the Flask-Admin interface on http://127.0.0.1:5000/admin/.
+"""
+
+import hashlib
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional
+
+from flask import Blueprint, Flask, Response, abort, current_app, jsonify, request
+from sqlalchemy import create_engine
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+from bio2bel.utils import get_connection
+from pybel import to_bel_script_lines
+from pybel.io.nodelink import to_nodelink
+from .constants import DATA_VERSION
+from .manager import Manager
+from .models import Pathway
+
+__all__ = [
+    'create_app',
+    'build_pooled_manager',
+    'make_etag',
+    'api',
+]
+
+#: The blueprint with the JSON query endpoints, registered by :func:`create_app`
+api = Blueprint('api', __name__, url_prefix='/api')
+
+
+def build_pooled_manager(
+    connection: Optional[str] = None,
+    *,
+    pool_size: int = 5,
+    max_overflow: int = 10,
+    pool_recycle: int = 3600,
+) -> Manager:
+    """Build a manager whose engine keeps a pool of connections and whose session is local to each thread.
+
+    SQLite doesn't use a connection pool, so the pool options are ignored for it.
+
+    :param connection: An RFC-1738 database connection string. Defaults to the one configured for Bio2BEL.
+    :param pool_size: The number of connections kept open
+    :param max_overflow: The number of connections that may be opened beyond the pool size under load
+    :param pool_recycle: The number of seconds after which a connection is replaced
+    """
+    connection = get_connection(connection=connection)
+    if make_url(connection).get_backend_name() == 'sqlite':
+        engine = create_engine(connection)
+    else:
+        engine = create_engine(
+            connection,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_recycle=pool_recycle,
+            pool_pre_ping=True,
+        )
+    session = scoped_session(sessionmaker(bind=engine, autoflush=False))
+    return Manager(engine=engine, session=session)
+
+
+def create_app(
+    manager: Optional[Manager] = None,
+    *,
+    connection: Optional[str] = None,
+    data_version: str = DATA_VERSION,
+    max_age: int = 3600,
+    **kwargs,
+) -> Flask:
+    """Build the query service.
+
+    :param manager: A manager. If not given, one is built with :func:`build_pooled_manager`.
+    :param connection: The connection string for :func:`build_pooled_manager`
+    :param data_version: The version of the WikiPathways data in the database, which is part of every ETag
+    :param max_age: The number of seconds clients and proxies may cache responses without revalidating them
+    :param kwargs: Keyword arguments passed to :func:`build_pooled_manager`
+    """
+    if manager is None:
+        manager = build_pooled_manager(connection, **kwargs)
+
+    app = Flask(__name__)
+    app.config['JSON_SORT_KEYS'] = False
+    app.config['WIKIPATHWAYS_MANAGER'] = manager
+    app.config['WIKIPATHWAYS_DATA_VERSION'] = data_version
+    app.config['WIKIPATHWAYS_MAX_AGE'] = max_age
+    app.register_blueprint(api)
+
+    remove_session = getattr(manager.session, 'remove', None)
+    if remove_session is not None:
+        # give the connection of a scoped session back to the pool at the end of each request
+        app.teardown_appcontext(lambda _exception: remove_session())
+
+    return app
+
+
+def make_etag(*parts: str) -> str:
+    """Make an ETag from the parts that identify the content of a response."""
+    return hashlib.sha256('\t'.join(parts).encode('utf-8')).hexdigest()
+
+
+def _get_manager() -> Manager:
+    return current_app.config['WIKIPATHWAYS_MANAGER']
+
+
+def _respond(etag_parts: Iterable[str], make_response: Callable[[], Response]) -> Response:
+    """Make a response with an ETag and cache headers, or an empty one if the client already has its content."""
+    etag = make_etag(current_app.config['WIKIPATHWAYS_DATA_VERSION'], *etag_parts)
+    response = Response(status=304) if etag in request.if_none_match else make_response()
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = current_app.config['WIKIPATHWAYS_MAX_AGE']
+    return response
+
+
+def _get_revision(pathway_id: str) -> str:
+    """Get the revision of a pathway, aborting with a 404 if it doesn't exist."""
+    row = _get_manager().session.query(Pathway.revision).filter(Pathway.identifier == pathway_id).one_or_none()
+    if row is None:
+        abort(404, f'pathway not found: {pathway_id}')
+    return row.revision or ''
+
+
+def _serialize_enrichment(results: Mapping[str, Mapping[str, Any]]) -> List[Dict[str, Any]]:
+    """Turn the gene sets of enrichment results into sorted lists and sort the pathways by p-value."""
+    return sorted(
+        (
+            {
+                key: sorted(value) if key == 'pathway_gene_set' else value
+                for key, value in result.items()
+            }
+            for result in results.values()
+        ),
+        key=lambda result: (result['p_value'], result['pathway_id']),
+    )
+
+
+@api.route('/pathway/<pathway_id>')
+def get_pathway(pathway_id: str) -> Response:
+    """Get a pathway with its species and proteins."""
+    def _make_response() -> Response:
+        pathway = _get_manager().get_pathways_by_ids([pathway_id], load_proteins=True)[pathway_id]
+        return jsonify(
+            identifier=pathway.identifier,
+            name=pathway.name,
+            revision=pathway.revision,
+            taxonomy_id=pathway.species.taxonomy_id,
+            species=pathway.species.name,
+            proteins=[
+                {'entrez_id': protein.entrez_id, 'hgnc_id': protein.hgnc_id, 'hgnc_symbol': protein.hgnc_symbol}
+                for protein in sorted(pathway.proteins, key=lambda protein: protein.entrez_id)
+            ],
+        )
+
+    return _respond(['pathway', pathway_id, _get_revision(pathway_id)], _make_response)
+
+
+@api.route('/pathway/<pathway_id>/graph')
+def get_pathway_graph(pathway_id: str) -> Response:
+    """Get the BEL graph of a pathway as node-link JSON or, with ``?format=bel``, as a BEL script."""
+    fmt = request.args.get('format', 'nodelink')
+    if fmt not in {'nodelink', 'bel'}:
+        abort(400, f'unknown format: {fmt}. Use one of: nodelink, bel')
+
+    def _make_response() -> Response:
+        graph = _get_manager().get_pathway_graph(pathway_id)
+        if fmt == 'bel':
+            return Response('\n'.join(to_bel_script_lines(graph)), mimetype='text/plain')
+        return jsonify(to_nodelink(graph))
+
+    return _respond(['graph', fmt, pathway_id, _get_revision(pathway_id)], _make_response)
+
+
+@api.route('/enrich', methods=['GET', 'POST'])
+def enrich() -> Response:
+    """Calculate the enrichment of HGNC gene symbols, Entrez gene identifiers, or HGNC identifiers in each pathway."""
+    if request.method == 'POST':
+        data = request.get_json(force=True, silent=True)
+        if not isinstance(data, dict) or not isinstance(data.get('genes'), list):
+            abort(400, 'the body must be a JSON object with a list of gene symbols in "genes"')
+        genes, taxonomy_id = data['genes'], data.get('taxonomy_id')
+    else:
+        genes = [
+            gene
+            for value in request.args.getlist('genes')
+            for gene in value.split(',')
+        ]
+        taxonomy_id = request.args.get('taxonomy_id')
+
+    genes = sorted({str(gene).strip() for gene in genes} - {''})
+    if not genes:
+        abort(400, 'no genes given')
+
+    def _make_response() -> Response:
+        results = _get_manager().enrich_genes(genes, taxonomy_id=taxonomy_id)
+        return jsonify(genes=genes, taxonomy_id=taxonomy_id, results=_serialize_enrichment(results))
+
+    return _respond(['enrich', taxonomy_id or '', *genes], _make_response)
+
+
+@api.route('/search')
+def search() -> Response:
+    """Get the pathways and proteins whose names, identifiers, or symbols start with the query."""
+    query = request.args.get('q', '').strip()
+    if not query:
+        abort(400, 'no query given')
+    limit = request.args.get('limit', 10, type=int)
+
+    def _make_response() -> Response:
+        index = _get_manager().identifier_index
+        return jsonify(
+            pathways=[pathway._asdict() for pathway in index.search_pathways(query, limit=limit)],
+            proteins=[protein._asdict() for protein in index.search_symbols(query, limit=limit)],
+        )
+
+    return _respond(['search', str(limit), query], _make_response)
 
-from bio2bel_wikipathways.manager import Manager
 
 if __name__ == '__main__':
-    manager = Manager()
-    app = manager.get_flask_admin_app()
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    main_manager = Manager()
+    admin_app = main_manager.get_flask_admin_app()
+    admin_app.run(host='127.0.0.1', port=5000)
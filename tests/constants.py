@@ -4,13 +4,15 @@
 
 import logging
 import os
+import tempfile
 
 import bio2bel_wikipathways
-import bio2bel_wikipathways.manager
+import bio2bel_wikipathways.mappings
 import pybel
 from bio2bel.manager.connection_manager import build_engine_session
 from bio2bel.testing import TemporaryConnectionMixin
 from bio2bel_wikipathways.constants import HGNC, WIKIPATHWAYS
+from bio2bel_wikipathways.mappings import MappingCache
 from pybel.dsl import BiologicalProcess, Gene, Protein
 from pybel.struct.graph import BELGraph
 from pyobo.mocks import _replace_mapping_getter
@@ -22,7 +24,7 @@ resources_path = os.path.join(dir_path, 'resources')
 
 gene_sets_path = os.path.join(resources_path, 'test_gmt_file.gmt')
 
-mock_name_id_mapping = _replace_mapping_getter('bio2bel_wikipathways.manager.get_name_id_mapping', {
+mock_name_id_mapping = _replace_mapping_getter('bio2bel_wikipathways.mappings.get_name_id_mapping', {
     'ncbitaxon': {
         'Homo sapiens': '9606',
     },
@@ -35,6 +37,9 @@ class DatabaseMixin(TemporaryConnectionMixin):
     wikipathways_manager: bio2bel_wikipathways.Manager
     pybel_manager = pybel.Manager
 
+    #: Keyword arguments passed to :meth:`bio2bel_wikipathways.Manager.populate`
+    populate_kwargs = {}
+
     @classmethod
     def setUpClass(cls):
         """Create a temporary file and populate the database."""
@@ -44,10 +49,14 @@ class DatabaseMixin(TemporaryConnectionMixin):
 
         # WikiPathways manager
         cls.wikipathways_manager = bio2bel_wikipathways.Manager(engine=cls.engine, session=cls.session)
+        cls.mapping_cache_directory = tempfile.TemporaryDirectory()
+        cls.wikipathways_manager.mapping_cache = MappingCache(
+            path=os.path.join(cls.mapping_cache_directory.name, 'mappings.db'),
+        )
         with mock_name_id_mapping:
-            if 1 != len(bio2bel_wikipathways.manager.get_name_id_mapping('ncbitaxon')):
+            if 1 != len(bio2bel_wikipathways.mappings.get_name_id_mapping('ncbitaxon')):
                 raise ValueError('mock did not work properly')
-            cls.wikipathways_manager.populate(paths={'9606': gene_sets_path})
+            cls.wikipathways_manager.populate(paths={'9606': gene_sets_path}, **cls.populate_kwargs)
 
         # PyBEL manager
         cls.pybel_manager = pybel.Manager(engine=cls.engine, session=cls.session)
@@ -57,6 +66,8 @@ class DatabaseMixin(TemporaryConnectionMixin):
     def tearDownClass(cls):
         """Close the connection in the manager and deletes the temporary database."""
         cls.session.close()
+        cls.wikipathways_manager.mapping_cache.close()
+        cls.mapping_cache_directory.cleanup()
         super().tearDownClass()
 
 
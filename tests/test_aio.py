@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for the asyncio counterpart to the read-side API of the manager."""
+
+import asyncio
+
+from bio2bel_wikipathways.models import Pathway
+from tests.constants import DatabaseMixin
+
+
+class TestAsyncManager(DatabaseMixin):
+    """Tests the async methods give the same results as the sync ones."""
+
+    def setUp(self):
+        """Clear the caches so each test loads from the database."""
+        self.wikipathways_manager.clear_caches()
+
+    def _run(self, make_coroutine):
+        async def _main():
+            async with self.wikipathways_manager.to_async() as async_manager:
+                return await make_coroutine(async_manager)
+
+        return asyncio.run(_main())
+
+    def test_count_pathways(self):
+        """Test counting the pathways gives the same as the sync method."""
+        self.assertEqual(
+            self.wikipathways_manager.session.query(Pathway).count(),
+            self._run(lambda m: m.count_pathways()),
+        )
+
+    def test_get_pathway_by_id(self):
+        """Test looking up a pathway loads its species and proteins."""
+        pathway = self._run(lambda m: m.get_pathway_by_id('WP1604'))
+        self.assertEqual('Codeine and Morphine Metabolism', pathway.name)
+        self.assertEqual('9606', pathway.species.taxonomy_id)
+        self.assertEqual(['UGT2B4', 'UGT2B7'], sorted(protein.hgnc_symbol for protein in pathway.proteins))
+        self.assertIsNone(self._run(lambda m: m.get_pathway_by_id('WP0')))
+
+    def test_query_hgnc_symbols(self):
+        """Test querying and enriching gives the same results as the sync methods."""
+        hgnc_symbols = ['UGT2B7', 'UGT2B4', 'CDKN1A', 'MAT2B']
+        self.assertEqual(
+            self.wikipathways_manager.query_hgnc_symbols(hgnc_symbols),
+            self._run(lambda m: m.query_hgnc_symbols(hgnc_symbols)),
+        )
+        self.assertEqual(
+            self.wikipathways_manager.enrich_hgnc_symbols(hgnc_symbols),
+            self._run(lambda m: m.enrich_hgnc_symbols(hgnc_symbols)),
+        )
+
+    def test_get_pathway_ids_by_hgnc_ids(self):
+        """Test getting the pathways of HGNC identifiers gives the same results as the sync method."""
+        hgnc_ids = ['2976', '9173', '12546']
+        self.assertEqual(
+            self.wikipathways_manager.get_pathway_ids_by_hgnc_ids(hgnc_ids),
+            self._run(lambda m: m.get_pathway_ids_by_hgnc_ids(hgnc_ids)),
+        )
+
+    def test_get_pathway_graph(self):
+        """Test concurrent graph requests give the same graph as the sync method and fill the shared cache."""
+        async def _get_graphs(async_manager):
+            return await asyncio.gather(*(async_manager.get_pathway_graph('WP1604') for _ in range(5)))
+
+        graphs = self._run(_get_graphs)
+        self.assertIn('WP1604', self.wikipathways_manager.pathway_cache)
+
+        expected = self.wikipathways_manager.get_pathway_graph('WP1604')
+        for graph in graphs:
+            self.assertEqual(expected.name, graph.name)
+            self.assertEqual(set(expected.edges(keys=True)), set(graph.edges(keys=True)))
+
+        self.assertIsNone(self._run(lambda m: m.get_pathway_graph('WP0')))
+
+    def test_concurrent_membership_matrix(self):
+        """Test concurrent queries load the membership matrix once."""
+        async def _query(async_manager):
+            await asyncio.gather(*(async_manager.query_hgnc_symbols(['UGT2B7']) for _ in range(10)))
+            return await async_manager.get_membership_matrix()
+
+        matrix = self._run(_query)
+        self.assertIs(matrix, self.wikipathways_manager.get_membership_matrix())
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for the pathway cache."""
+
+import unittest
+
+from sqlalchemy import event
+
+from bio2bel.compath import CompathManager
+from bio2bel_wikipathways.cache import CacheInfo, LRUCache
+from pybel import BELGraph
+from tests.constants import DatabaseMixin, get_enrichment_graph, protein_a, protein_b
+
+
+class TestLRUCache(unittest.TestCase):
+    """Tests the least recently used cache."""
+
+    def test_eviction(self):
+        """Test the least recently used entry is dropped when the cache is full."""
+        cache = LRUCache(maxsize=2)
+        self.assertEqual('A', cache.get('a', str.upper))
+        self.assertEqual('B', cache.get('b', str.upper))
+        self.assertEqual('A', cache.get('a', str.upper))
+        self.assertEqual('C', cache.get('c', str.upper))
+
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertIn('c', cache)
+        self.assertEqual(CacheInfo(hits=1, misses=3, maxsize=2, currsize=2, version=0), cache.info())
+
+    def test_clear(self):
+        """Test clearing the cache keeps the counters and increments the version."""
+        cache = LRUCache(maxsize=2)
+        cache.get('a', str.upper)
+        cache.clear()
+        self.assertNotIn('a', cache)
+        self.assertEqual(CacheInfo(hits=0, misses=1, maxsize=2, currsize=0, version=1), cache.info())
+
+    def test_clear_during_factory(self):
+        """Test a value made from data read before a clear is not stored."""
+        cache = LRUCache(maxsize=2)
+
+        def _factory(key):
+            cache.clear()
+            return key.upper()
+
+        self.assertEqual('A', cache.get('a', _factory))
+        self.assertNotIn('a', cache)
+
+    def test_get_many(self):
+        """Test getting many values makes all missing ones with one call."""
+        cache = LRUCache(maxsize=3)
+        cache.get('a', str.upper)
+        calls = []
+
+        def _factory(keys):
+            calls.append(keys)
+            return {key: key.upper() for key in keys}
+
+        self.assertEqual({'a': 'A', 'b': 'B', 'c': 'C'}, cache.get_many(['a', 'b', 'c', 'b'], _factory))
+        self.assertEqual([['b', 'c']], calls)
+        self.assertEqual({'a': 'A', 'c': 'C'}, cache.get_many(['a', 'c'], _factory))
+        self.assertEqual(1, len(calls))
+        self.assertEqual(CacheInfo(hits=3, misses=3, maxsize=3, currsize=3, version=0), cache.info())
+
+    def test_disabled(self):
+        """Test a cache with a maximum size of 0 stores nothing."""
+        cache = LRUCache(maxsize=0)
+        cache.get('a', str.upper)
+        self.assertEqual(0, len(cache))
+
+
+class TestPathwayCache(DatabaseMixin):
+    """Tests the manager's pathway cache."""
+
+    def setUp(self):
+        """Clear the caches."""
+        self.wikipathways_manager.clear_caches()
+
+    def test_get_pathway_graph(self):
+        """Test getting a pathway graph twice only builds it once and gives a new graph each time."""
+        start_info = self.wikipathways_manager.pathway_cache.info()
+        graph = self.wikipathways_manager.get_pathway_graph('WP3596')
+        info = self.wikipathways_manager.pathway_cache.info()
+        self.assertEqual(start_info.misses + 1, info.misses)
+
+        graph.add_increases(protein_a, protein_b, citation='1234', evidence='')
+        cached_graph = self.wikipathways_manager.get_pathway_graph('WP3596')
+        self.assertIsNot(graph, cached_graph)
+        self.assertEqual(6, cached_graph.number_of_nodes())
+        self.assertEqual(5, cached_graph.number_of_edges())
+        self.assertEqual(
+            set(CompathManager.get_pathway_graph(self.wikipathways_manager, 'WP3596').edges(keys=True)),
+            set(cached_graph.edges(keys=True)),
+        )
+
+        new_info = self.wikipathways_manager.pathway_cache.info()
+        self.assertEqual(info.hits + 1, new_info.hits)
+        self.assertEqual(info.misses, new_info.misses)
+
+    def test_missing_pathway(self):
+        """Test a missing pathway is cached as missing."""
+        self.assertIsNone(self.wikipathways_manager.get_pathway_graph('WP0'))
+        self.assertIsNone(self.wikipathways_manager.get_pathway_graph('WP0'))
+        self.assertIn('WP0', self.wikipathways_manager.pathway_cache)
+
+    def test_enrich(self):
+        """Test enriching graphs from the cache gives the same result as through the ORM."""
+        for method in ('enrich_pathways', 'enrich_proteins'):
+            with self.subTest(method=method):
+                expected, graph = get_enrichment_graph(), get_enrichment_graph()
+                getattr(CompathManager, method)(self.wikipathways_manager, expected)
+                getattr(self.wikipathways_manager, method)(graph)
+                self.assertEqual(set(expected.edges(keys=True)), set(graph.edges(keys=True)))
+
+                # enriching again only uses the cache
+                misses = self.wikipathways_manager.pathway_cache.info().misses
+                getattr(self.wikipathways_manager, method)(BELGraph() + graph)
+                self.assertEqual(misses, self.wikipathways_manager.pathway_cache.info().misses)
+
+    def test_clear_caches(self):
+        """Test clearing the caches."""
+        self.wikipathways_manager.get_pathway_graph('WP3596')
+        self.assertIn('WP3596', self.wikipathways_manager.pathway_cache)
+        version = self.wikipathways_manager.pathway_cache.version
+        self.wikipathways_manager.clear_caches()
+        self.assertNotIn('WP3596', self.wikipathways_manager.pathway_cache)
+        self.assertEqual(version + 1, self.wikipathways_manager.pathway_cache.version)
+
+    def test_enrich_queries(self):
+        """Test enriching a graph with every protein takes a fixed number of queries."""
+        graph = BELGraph()
+        for protein in self.wikipathways_manager.list_proteins():
+            graph.add_node_from_data(protein.to_pybel())
+
+        statements = []
+
+        def _count(*_args, **_kwargs):
+            statements.append(1)
+
+        self.wikipathways_manager.session.expire_all()
+        event.listen(self.engine, 'before_cursor_execute', _count)
+        try:
+            self.wikipathways_manager.enrich_proteins(graph)
+        finally:
+            event.remove(self.engine, 'before_cursor_execute', _count)
+
+        # one for the pathway identifiers, one for the pathways, and one for their proteins
+        self.assertEqual(3, len(statements))
+        self.assertEqual(5 + 17, graph.number_of_nodes())
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for downloading the WikiPathways GMT files."""
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import ClassVar, List
+
+import requests
+
+from bio2bel_wikipathways.constants import DATA_VERSION, infos
+from bio2bel_wikipathways.download import prefetch, read_manifest
+from tests.constants import gene_sets_path
+
+SPECIES = [infos['9606'], infos['10090']]
+
+
+class RangeRequestHandler(BaseHTTPRequestHandler):
+    """Serve files from a directory with support for HTTP range requests."""
+
+    directory: ClassVar[str]
+    requests: ClassVar[List[str]]
+
+    def do_GET(self):  # noqa: N802
+        """Serve the requested file or the requested range of it."""
+        self.requests.append(self.path)
+        path = os.path.join(self.directory, self.path.lstrip('/'))
+        if not os.path.exists(path):
+            self.send_error(404)
+            return
+
+        with open(path, 'rb') as file:
+            data = file.read()
+
+        range_header = self.headers.get('Range')
+        if range_header:
+            start = int(range_header[len('bytes='):].rstrip('-'))
+            self.send_response(206)
+            data = data[start:]
+        else:
+            self.send_response(200)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):  # noqa: D102
+        pass
+
+
+class TestPrefetch(unittest.TestCase):
+    """Test prefetching against a local stand-in for data.wikipathways.org."""
+
+    def setUp(self):
+        """Serve a copy of the test GMT file for each species and make an empty download directory."""
+        self.served_directory = tempfile.mkdtemp()
+        self.download_directory = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.served_directory, DATA_VERSION, 'gmt'))
+        for info in SPECIES:
+            shutil.copy(gene_sets_path, os.path.join(self.served_directory, DATA_VERSION, 'gmt', info.file_name))
+
+        handler = type('Handler', (RangeRequestHandler,), {'directory': self.served_directory, 'requests': []})
+        self.requests = handler.requests
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        self.base_url = f'http://127.0.0.1:{self.server.server_port}'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        """Stop the server and remove the directories."""
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.served_directory)
+        shutil.rmtree(self.download_directory)
+
+    def _prefetch(self, **kwargs):
+        return prefetch(SPECIES, directory=self.download_directory, base_url=self.base_url, **kwargs)
+
+    def test_prefetch(self):
+        """Test the files are downloaded, recorded in the manifest, and not downloaded again."""
+        paths = self._prefetch()
+        self.assertEqual({'9606', '10090'}, set(paths))
+        self.assertEqual(2, len(self.requests))
+        with open(gene_sets_path) as file:
+            expected = file.read()
+        for path in paths.values():
+            with open(path) as file:
+                self.assertEqual(expected, file.read())
+
+        manifest = read_manifest(self.download_directory)
+        self.assertEqual(DATA_VERSION, manifest['data_version'])
+        self.assertEqual({'9606', '10090'}, set(manifest['files']))
+
+        self.assertEqual(paths, self._prefetch())
+        self.assertEqual(2, len(self.requests), msg='files in the manifest should not be downloaded again')
+
+    def test_corrupted(self):
+        """Test a file whose checksum no longer matches the manifest is downloaded again."""
+        paths = self._prefetch()
+        with open(paths['9606'], 'a') as file:
+            file.write('garbage')
+        self._prefetch()
+        self.assertEqual(3, len(self.requests))
+
+    def test_resume(self):
+        """Test a partial download is resumed with a range request."""
+        path = os.path.join(self.download_directory, infos['9606'].file_name)
+        with open(gene_sets_path, 'rb') as file, open(f'{path}.part', 'wb') as part_file:
+            part_file.write(file.read()[:100])
+
+        paths = self._prefetch()
+        with open(gene_sets_path) as file, open(paths['9606']) as downloaded_file:
+            self.assertEqual(file.read(), downloaded_file.read())
+        self.assertFalse(os.path.exists(f'{path}.part'))
+
+    def test_failure(self):
+        """Test the files that were downloaded are recorded in the manifest when another download fails."""
+        served_path = os.path.join(self.served_directory, DATA_VERSION, 'gmt', infos['10090'].file_name)
+        os.rename(served_path, f'{served_path}.bak')
+        with self.assertRaises(requests.HTTPError):
+            self._prefetch()
+        self.assertEqual({'9606'}, set(read_manifest(self.download_directory)['files']))
+
+        os.rename(f'{served_path}.bak', served_path)
+        self.assertEqual({'9606', '10090'}, set(self._prefetch()))
+        self.assertEqual(3, len(self.requests), msg='only the failed file should be downloaded again')
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for the vectorized enrichment engine."""
+
+import io
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from scipy.stats import hypergeom
+
+from bio2bel.compath import CompathManager
+from bio2bel_wikipathways.enrichment import benjamini_hochberg, read_gene_lists, write_enrichment_jsonl
+from tests.constants import DatabaseMixin
+
+QUERIES = [
+    ['MAT2B'],
+    ['UGT2B7', 'UGT2B4', 'CDKN1A'],
+    ['UGT2B7', 'UGT2B4'],
+    ['GCLM', 'DNMT1', 'MAT2B', 'RGS5', 'NOT_A_GENE'],
+    [],
+]
+
+
+class TestBenjaminiHochberg(unittest.TestCase):
+    """Tests the false discovery rate correction."""
+
+    def test_correction(self):
+        """Test the q-values against values calculated by hand."""
+        q_values = benjamini_hochberg(np.array([0.01, 0.04, 0.03, 0.5]))
+        np.testing.assert_allclose([0.04, 0.16 / 3, 0.16 / 3, 0.5], q_values)
+
+    def test_untested(self):
+        """Test that leaving out p-values of one is the same as including them."""
+        p_values = np.array([0.01, 0.2, 0.03])
+        np.testing.assert_allclose(
+            benjamini_hochberg(np.append(p_values, [1.0, 1.0]))[:3],
+            benjamini_hochberg(p_values, number_tests=5),
+        )
+
+
+class TestEnrichment(DatabaseMixin):
+    """Tests the enrichment engine against the database."""
+
+    def test_matrix(self):
+        """Test the shape of the membership matrix."""
+        matrix = self.wikipathways_manager.membership_matrix
+        self.assertEqual(5, matrix.number_pathways)
+        self.assertEqual(17, matrix.number_genes)
+        self.assertEqual({'UGT2B7', 'UGT2B4'}, matrix.get_gene_set('WP1604'))
+
+    def test_same_as_orm(self):
+        """Test the results are the same as the ones calculated through the ORM."""
+        for query in QUERIES:
+            with self.subTest(query=query):
+                self.assertEqual(
+                    CompathManager.query_hgnc_symbols(self.wikipathways_manager, query),
+                    self.wikipathways_manager.query_hgnc_symbols(query),
+                )
+
+    def test_statistics(self):
+        """Test the p-values for a query."""
+        results = self.wikipathways_manager.enrich_hgnc_symbols(['UGT2B7', 'UGT2B4', 'CDKN1A'])
+        self.assertEqual({'WP536', 'WP1604', 'WP3596'}, set(results))
+
+        wp1604 = results['WP1604']
+        self.assertEqual(2, wp1604['mapped_proteins'])
+        # 17 genes in the universe, 2 in the pathway, 2 of the 3 drawn
+        self.assertAlmostEqual(hypergeom.sf(1, 17, 2, 3), wp1604['p_value'])
+        self.assertAlmostEqual(min(1.0, wp1604['p_value'] * 5), wp1604['q_value'])
+        self.assertLessEqual(wp1604['p_value'], results['WP536']['p_value'])
+
+    def test_batch(self):
+        """Test a batch gives the same results as each query on its own."""
+        batch_results = self.wikipathways_manager.enrich_hgnc_symbols_batch(QUERIES)
+        self.assertEqual(len(QUERIES), len(batch_results))
+        for query, results in zip(QUERIES, batch_results):
+            with self.subTest(query=query):
+                self.assertEqual(self.wikipathways_manager.enrich_hgnc_symbols(query), results)
+        self.assertEqual({}, batch_results[-1])
+
+    def test_gene_lists(self):
+        """Test enriching named gene lists in batches and in a process pool."""
+        gene_lists = {f'list{i}': query for i, query in enumerate(QUERIES)}
+        expected = [
+            (name, self.wikipathways_manager.enrich_hgnc_symbols(query))
+            for name, query in gene_lists.items()
+        ]
+        for processes in (None, 2):
+            with self.subTest(processes=processes):
+                results = self.wikipathways_manager.enrich_gene_lists(gene_lists, batch_size=2, processes=processes)
+                self.assertEqual(expected, list(results))
+
+    def test_write_jsonl(self):
+        """Test writing the results as JSON lines."""
+        file = io.StringIO()
+        results = self.wikipathways_manager.enrich_gene_lists({'a': QUERIES[1], 'b': QUERIES[-1]})
+        self.assertEqual(2, write_enrichment_jsonl(results, file))
+
+        a, b = [json.loads(line) for line in file.getvalue().splitlines()]
+        self.assertEqual('a', a['name'])
+        self.assertEqual('WP1604', a['pathways'][0]['pathway_id'])
+        self.assertEqual(['UGT2B4', 'UGT2B7'], a['pathways'][0]['pathway_gene_set'])
+        self.assertEqual({'name': 'b', 'pathways': []}, b)
+
+
+class TestReadGeneLists(unittest.TestCase):
+    """Tests reading named gene lists from files."""
+
+    def setUp(self):
+        """Make a temporary directory."""
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.directory.cleanup()
+
+    def test_tsv(self):
+        """Test reading a TSV file with both one line per list and one line per gene."""
+        path = os.path.join(self.directory.name, 'lists.tsv')
+        with open(path, 'w') as file:
+            file.write('# comment\n')
+            file.write('a\tMAT2B\tGCLM\n')
+            file.write('b\tUGT2B7\n')
+            file.write('b\tUGT2B4\n')
+        self.assertEqual({'a': ['MAT2B', 'GCLM'], 'b': ['UGT2B7', 'UGT2B4']}, read_gene_lists(path))
+
+    def test_json(self):
+        """Test reading a JSON file."""
+        path = os.path.join(self.directory.name, 'lists.json')
+        with open(path, 'w') as file:
+            json.dump({'a': ['MAT2B', 'GCLM']}, file)
+        self.assertEqual({'a': ['MAT2B', 'GCLM']}, read_gene_lists(path))
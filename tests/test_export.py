@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for streaming the database as BEL, node-link JSON lines, and TSV."""
+
+import io
+import json
+
+from bio2bel.compath import CompathManager
+from bio2bel_wikipathways.export import TSV_HEADER
+from pybel import BELGraph, from_nodelink, to_bel_script_lines
+from pybel.constants import PART_OF
+from tests.constants import DatabaseMixin
+
+
+class TestExport(DatabaseMixin):
+    """Tests streaming the database gives the same edges as :meth:`bio2bel.compath.CompathManager.to_bel`."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Build the BEL graph of the whole database."""
+        super().setUpClass()
+        cls.graph = CompathManager.to_bel(cls.wikipathways_manager)
+
+    def _export(self, fmt: str, **kwargs) -> str:
+        file = io.StringIO()
+        edges = self.wikipathways_manager.export(file, fmt, **kwargs)
+        self.assertEqual(self.graph.number_of_edges(), edges)
+        return file.getvalue()
+
+    def test_iter_exported_pathways(self):
+        """Test the pathways are the same in any chunk size."""
+        expected = list(self.wikipathways_manager.iter_exported_pathways())
+        self.assertEqual(5, len(expected))
+        self.assertEqual(
+            {protein.entrez_id for protein in self.wikipathways_manager.get_pathway_by_id('WP2333').proteins},
+            {protein.entrez_id for protein in next(p for p in expected if p.identifier == 'WP2333').proteins},
+        )
+        for chunk_size in (1, 2, 1000):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(
+                    expected,
+                    list(self.wikipathways_manager.iter_exported_pathways(chunk_size=chunk_size)),
+                )
+
+    def test_bel(self):
+        """Test the BEL script has the same statements as the one of the whole graph."""
+        lines = self._export('bel', chunk_size=2).splitlines()
+        self.assertEqual(
+            {line for line in to_bel_script_lines(self.graph) if f' {PART_OF} ' in line},
+            {line for line in lines if f' {PART_OF} ' in line},
+        )
+        self.assertIn('UNSET Citation', lines)
+
+    def test_nodelink(self):
+        """Test the node-link JSON lines give the same edges as the whole graph."""
+        lines = self._export('nodelink', chunk_size=2).splitlines()
+        self.assertEqual(5, len(lines))
+        graph = BELGraph()
+        for line in lines:
+            graph += from_nodelink(json.loads(line))
+        self.assertEqual(set(self.graph.edges(keys=True)), set(graph.edges(keys=True)))
+
+    def test_tsv(self):
+        """Test the TSV edge list has one row per edge."""
+        lines = self._export('tsv').splitlines()
+        self.assertEqual(TSV_HEADER, lines[0].split('\t'))
+        self.assertEqual(self.graph.number_of_edges(), len(set(lines[1:])))
+        self.assertIn('hgnc\t4312\tGCLM\tpartOf\twikipathways\tWP2333\tTrans-sulfuration pathway', lines)
+
+    def test_unknown_format(self):
+        """Test an unknown format raises an error."""
+        with self.assertRaises(ValueError):
+            self.wikipathways_manager.export(io.StringIO(), 'xml')
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+
+"""Tests that importing Bio2BEL WikiPathways stays cheap.
+
+The import times themselves are measured with ``python -m benchmarks.bench_import``, since wall-clock thresholds are
+unreliable on shared CI runners.
+"""
+
+import json
+import subprocess  # noqa: S404
+import sys
+import unittest
+from typing import List
+
+
+def get_loaded_modules(code: str, modules: List[str]) -> List[str]:
+    """Run the code in a new interpreter and get which of the modules it imported."""
+    # the command is always this interpreter with a fixed -c script, never user input
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, '-c', f'{code}\nimport json, sys\nprint(json.dumps([m for m in {modules!r} if m in sys.modules]))'],
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+class TestImportTime(unittest.TestCase):
+    """Tests the heavy dependencies are only imported when they are used."""
+
+    def test_package(self):
+        """Test importing the package and getting its version does not import the manager or its dependencies."""
+        self.assertEqual([], get_loaded_modules(
+            'import bio2bel_wikipathways\nbio2bel_wikipathways.get_version()',
+            ['bio2bel', 'sqlalchemy', 'flask_admin', 'pyobo', 'scipy', 'bio2bel_wikipathways.manager'],
+        ))
+
+    def test_snapshot(self):
+        """Test reading snapshots does not import the database dependencies."""
+        self.assertEqual([], get_loaded_modules(
+            'import bio2bel_wikipathways.snapshot',
+            ['bio2bel', 'sqlalchemy', 'flask_admin', 'pyobo', 'scipy'],
+        ))
+
+    def test_manager(self):
+        """Test importing the manager does not import the views, mappings, parser, or enrichment dependencies."""
+        self.assertEqual([], get_loaded_modules(
+            'from bio2bel_wikipathways import Manager',
+            [
+                'flask_admin.contrib.sqla',
+                'pyobo.sources.wikipathways',
+                'scipy.stats',
+                'bio2bel_wikipathways.mappings',
+                'bio2bel_wikipathways.enrichment',
+                'bio2bel_wikipathways.views',
+                'bio2bel_wikipathways.aio',
+            ],
+        ))
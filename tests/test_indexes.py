@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for creating the indexes that are missing from databases made with an older version."""
+
+import os
+import tempfile
+import unittest
+
+from sqlalchemy.exc import IntegrityError
+
+import bio2bel_wikipathways
+from bio2bel_wikipathways.models import Protein
+
+
+class TestEnsureIndexes(unittest.TestCase):
+    """Tests creating the indexes after dropping them to simulate an older database."""
+
+    def setUp(self):
+        """Create an empty database and drop all of its indexes."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.manager = bio2bel_wikipathways.Manager(
+            connection=f'sqlite:///{os.path.join(self.directory.name, "test.db")}',
+        )
+        self.manager.create_all()
+        self.index_names = set()
+        for table in self.manager._metadata.sorted_tables:
+            for index in table.indexes:
+                index.drop(self.manager.engine)
+                self.index_names.add(index.name)
+
+    def tearDown(self):
+        """Close the session and remove the database."""
+        self.manager.session.close()
+        self.manager.engine.dispose()
+        self.directory.cleanup()
+
+    def test_ensure_indexes(self):
+        """Test the dropped indexes are created and a second run creates none."""
+        self.assertIn(f'ix_{Protein.__tablename__}_entrez_id', self.index_names)
+        created = self.manager.ensure_indexes()
+        self.assertEqual(len(created), len(set(created)))
+        self.assertEqual(self.index_names, set(created))
+        self.assertEqual([], self.manager.ensure_indexes())
+
+    def test_duplicates(self):
+        """Test a unique index can not be created over duplicate Entrez gene identifiers."""
+        self.manager.session.add_all([
+            Protein(entrez_id='1', hgnc_symbol='A'),
+            Protein(entrez_id='1', hgnc_symbol='B'),
+        ])
+        self.manager.session.commit()
+        with self.assertRaises(IntegrityError):
+            self.manager.ensure_indexes()
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for the mapping cache of Bio2BEL WikiPathways."""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from bio2bel_wikipathways.mappings import MappingCache, get_source_version
+
+HGNC_ID_TO_ENTREZ_ID = {'12553': '7363', '12554': '7364', '1': '2'}
+HGNC_ID_TO_NAME = {'12553': 'UGT2B4', '12554': 'UGT2B7'}
+
+
+class TestMappingCache(unittest.TestCase):
+    """Tests for the SQLite-backed mapping cache."""
+
+    def setUp(self):
+        """Patch the pyobo getters and make a temporary cache."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'mappings.db')
+        self.patches = [
+            mock.patch('bio2bel_wikipathways.mappings.get_filtered_xrefs', return_value=HGNC_ID_TO_ENTREZ_ID),
+            mock.patch('bio2bel_wikipathways.mappings.get_id_name_mapping', return_value=HGNC_ID_TO_NAME),
+            mock.patch('bio2bel_wikipathways.mappings.get_name_id_mapping', return_value={'Felis catus': '9685'}),
+        ]
+        self.get_xrefs, _, self.get_names = (patch.start() for patch in self.patches)
+
+    def tearDown(self):
+        """Stop the patches and remove the cache."""
+        for patch in self.patches:
+            patch.stop()
+        self.directory.cleanup()
+
+    def test_hgnc(self):
+        """Test looking up Entrez gene identifiers only builds the cache once per version."""
+        cache = MappingCache(path=self.path, hgnc_version='1')
+        self.assertEqual(
+            {'7363': ('12553', 'UGT2B4'), '7364': ('12554', 'UGT2B7'), '2': ('1', None)},
+            cache.get_hgnc(['7363', '7364', '2', '3']),
+        )
+        cache.close()
+
+        cache = MappingCache(path=self.path, hgnc_version='1')
+        self.assertEqual({'7363': ('12553', 'UGT2B4')}, cache.get_hgnc(['7363']))
+        self.assertEqual(1, self.get_xrefs.call_count, msg='the cache should have been reused')
+        cache.close()
+
+        cache = MappingCache(path=self.path, hgnc_version='2')
+        cache.get_hgnc(['7363'])
+        self.assertEqual(2, self.get_xrefs.call_count, msg='a new version should rebuild the cache')
+        cache.close()
+
+    def test_taxonomy(self):
+        """Test only species missing from the constants are looked up in NCBI Taxonomy."""
+        cache = MappingCache(path=self.path, taxonomy_version='1')
+        self.assertEqual(
+            {'Homo sapiens': '9606', 'Canis lupus familiaris': '9615'},
+            cache.get_taxonomy_ids(['Homo sapiens', 'Canis lupus familiaris']),
+        )
+        self.assertEqual(0, self.get_names.call_count)
+
+        self.assertEqual({'Felis catus': '9685'}, cache.get_taxonomy_ids(['Felis catus']))
+        self.assertEqual({'Felis catus': '9685'}, cache.get_taxonomy_ids(['Felis catus']))
+        self.assertEqual(1, self.get_names.call_count)
+        cache.close()
+
+    def test_taxonomy_version(self):
+        """Test the species are looked up again in a new version of NCBI Taxonomy, independently of HGNC."""
+        cache = MappingCache(path=self.path, hgnc_version='1', taxonomy_version='1')
+        cache.get_hgnc(['7363'])
+        cache.get_taxonomy_ids(['Felis catus'])
+        cache.close()
+
+        cache = MappingCache(path=self.path, hgnc_version='1', taxonomy_version='2')
+        cache.get_hgnc(['7363'])
+        cache.get_taxonomy_ids(['Felis catus'])
+        self.assertEqual(1, self.get_xrefs.call_count, msg='the HGNC mappings should have been reused')
+        self.assertEqual(2, self.get_names.call_count, msg='a new version should look up the species again')
+        cache.close()
+
+
+class TestSourceVersion(unittest.TestCase):
+    """Tests the versions of PyOBO's local copies of the sources."""
+
+    def test_source_version(self):
+        """Test the version changes when a downloaded file changes, but not when PyOBO's derived caches do."""
+        with tempfile.TemporaryDirectory() as directory, \
+                mock.patch('bio2bel_wikipathways.mappings.get_prefix_directory', return_value=directory):
+            os.makedirs(os.path.join(directory, 'cache'))
+            with open(os.path.join(directory, 'hgnc_complete_set.json'), 'w') as file:
+                file.write('{}')
+            version = get_source_version('hgnc')
+            self.assertTrue(version.startswith('hgnc-'))
+
+            with open(os.path.join(directory, 'cache', 'names.tsv'), 'w') as file:
+                file.write('1\tA\n')
+            self.assertEqual(version, get_source_version('hgnc'))
+
+            with open(os.path.join(directory, 'hgnc_complete_set.json'), 'w') as file:
+                file.write('{"response": {}}')
+            self.assertNotEqual(version, get_source_version('hgnc'))
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for the Parquet export and import."""
+
+import os
+import tempfile
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import bio2bel_wikipathways
+from bio2bel_wikipathways.models import Pathway, Protein
+from bio2bel_wikipathways.parquet import get_parquet_paths, read_parquet_metadata
+from tests.constants import DatabaseMixin
+
+
+def get_memberships(manager):
+    """Get the pairs of WikiPathways identifiers and Entrez gene identifiers in the database."""
+    return set(manager.session.query(Pathway.identifier, Protein.entrez_id).join(Pathway.proteins))
+
+
+class TestParquet(DatabaseMixin):
+    """Tests exporting the test GMT file's database to Parquet files and importing them into another database."""
+
+    def setUp(self):
+        """Export the database to a temporary directory."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.counts = self.wikipathways_manager.export_parquet(
+            self.directory.name, chunk_size=3, data_version='test',
+        )
+        self.paths = get_parquet_paths(self.directory.name)
+
+    def tearDown(self):
+        """Remove the Parquet files."""
+        self.directory.cleanup()
+
+    def test_export(self):
+        """Test the files have all rows, dictionary-encoded identifiers in the memberships, and the data version."""
+        self.assertEqual(self.wikipathways_manager.summarize(), {
+            name: count for name, count in self.counts.items() if name != 'memberships'
+        })
+        self.assertEqual(len(get_memberships(self.wikipathways_manager)), self.counts['memberships'])
+
+        schema = pq.read_schema(self.paths['memberships'])
+        self.assertTrue(pa.types.is_dictionary(schema.field('pathway_id').type))
+        self.assertTrue(pa.types.is_dictionary(schema.field('entrez_id').type))
+        self.assertEqual('test', read_parquet_metadata(self.paths['memberships'])['data_version'])
+
+        df = pd.read_parquet(self.paths['memberships'])
+        self.assertEqual('category', df['pathway_id'].dtype.name)
+        self.assertEqual(
+            get_memberships(self.wikipathways_manager),
+            set(df.astype(str).itertuples(index=False, name=None)),
+        )
+
+    def test_round_trip(self):
+        """Test importing the files gives the same database."""
+        manager = bio2bel_wikipathways.Manager(
+            connection=f'sqlite:///{os.path.join(self.directory.name, "imported.db")}',
+        )
+        manager.create_all()
+        counts = manager.import_parquet(self.directory.name, chunk_size=4)
+        self.assertEqual(self.counts, counts)
+        self.assertEqual(self.wikipathways_manager.summarize(), manager.summarize())
+        self.assertEqual(get_memberships(self.wikipathways_manager), get_memberships(manager))
+        self.assertEqual(
+            self.wikipathways_manager.query_hgnc_symbols(['UGT2B7', 'UGT2B4', 'CDKN1A']),
+            manager.query_hgnc_symbols(['UGT2B7', 'UGT2B4', 'CDKN1A']),
+        )
+
+        with self.assertRaises(ValueError):
+            manager.import_parquet(self.directory.name)
+        manager.session.close()
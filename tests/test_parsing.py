@@ -2,10 +2,64 @@
 
 """Tests for Bio2BEL WikiPathways."""
 
+import pickle  # noqa: S403
+import unittest
+from unittest import mock
+
+from bio2bel_wikipathways import Manager
 from bio2bel_wikipathways.models import Pathway, Protein
+from bio2bel_wikipathways.parser import ParsedGMT, parse_gmt
 from pybel import BELGraph, dsl
 from pybel.language import Entity
-from tests.constants import DatabaseMixin, get_enrichment_graph
+from tests.constants import DatabaseMixin, gene_sets_path, get_enrichment_graph, mock_name_id_mapping
+
+
+class TestParseGMT(unittest.TestCase):
+    """Tests the compact records of the GMT parser."""
+
+    def setUp(self):
+        """Parse the test GMT file."""
+        self.parsed = parse_gmt(gene_sets_path)
+
+    def test_records(self):
+        """Test the records have the pathways of the file with their genes coded in one vocabulary."""
+        self.assertEqual({'20180110'}, self.parsed.versions)
+        self.assertEqual(5, len(self.parsed))
+        record = self.parsed.pathways[0]
+        self.assertEqual(('WP2333', '72015', 'Trans-sulfuration pathway'), (record.identifier, record.revision, record.name))
+        self.assertEqual(['1786', '2730', '27430'], self.parsed.get_entrez_ids(record)[:3])
+        self.assertEqual('I', record.genes.typecode)
+        self.assertEqual({'Homo sapiens'}, self.parsed.get_species_names())
+        self.assertIs(record.species_name, self.parsed.pathways[1].species_name)
+        self.assertEqual(len(self.parsed.vocabulary), len(self.parsed.get_all_entrez_ids()))
+
+    def test_pickle(self):
+        """Test the records survive being sent back from a worker process."""
+        # the data comes from a round trip in the same process
+        parsed = pickle.loads(pickle.dumps(self.parsed))  # noqa: S301
+        self.assertEqual(
+            [self.parsed.get_entrez_ids(record) for record in self.parsed],
+            [parsed.get_entrez_ids(record) for record in parsed],
+        )
+        self.assertEqual({'7363', '7364'}, set(parsed.get_entrez_ids(parsed.pathways[1])))
+
+    def test_extend(self):
+        """Test combining parsed files recodes the genes into one vocabulary."""
+        combined = ParsedGMT()
+        combined.extend(self.parsed.subset(self.parsed.pathways[2:]))
+        combined.extend(self.parsed)
+        self.assertEqual(8, len(combined))
+        self.assertEqual(len(self.parsed.vocabulary), len(combined.vocabulary))
+        self.assertEqual(
+            [self.parsed.get_entrez_ids(record) for record in self.parsed],
+            [combined.get_entrez_ids(record) for record in combined.pathways[3:]],
+        )
+
+    def test_chunked(self):
+        """Test chunks share the vocabulary."""
+        chunks = list(self.parsed.chunked(2))
+        self.assertEqual([2, 2, 1], [len(chunk) for chunk in chunks])
+        self.assertTrue(all(chunk.vocabulary is self.parsed.vocabulary for chunk in chunks))
 
 
 class TestParse(DatabaseMixin):
@@ -191,3 +245,51 @@ class TestParse(DatabaseMixin):
             msg='Wrong nodes in graph',
         )
         self.assertEqual(8, graph.number_of_edges())
+
+
+class TestBulkParse(TestParse):
+    """Tests the parsing module when populating with set-based inserts."""
+
+    populate_kwargs = {'bulk': True}
+
+
+class TestChunkedParse(TestParse):
+    """Tests the parsing module when committing every two pathways."""
+
+    populate_kwargs = {'commit_every': 2}
+
+
+class TestChunkedBulkParse(TestParse):
+    """Tests the parsing module when committing every two pathways written with set-based inserts."""
+
+    populate_kwargs = {'bulk': True, 'commit_every': 2}
+
+
+class TestResume(DatabaseMixin):
+    """Tests resuming a chunked population that failed."""
+
+    def test_resume(self):
+        """Test the chunks committed before a failure are kept and running again loads the rest."""
+        expected = {pathway.identifier: pathway.get_hgnc_symbols() for pathway in self.wikipathways_manager.list_pathways()}
+        self.wikipathways_manager.drop_species('9606')
+
+        populate_orm = self.wikipathways_manager._populate_orm
+        calls = []
+
+        def _fail_on_second_chunk(**kwargs):
+            calls.append(kwargs['pathways'])
+            if len(calls) == 2:
+                raise RuntimeError
+            populate_orm(**kwargs)
+
+        with mock_name_id_mapping, mock.patch.object(Manager, '_populate_orm', side_effect=_fail_on_second_chunk):
+            with self.assertRaises(RuntimeError):
+                self.wikipathways_manager.populate(paths={'9606': gene_sets_path}, commit_every=2)
+        self.assertEqual(2, self.wikipathways_manager.count_pathways())
+
+        with mock_name_id_mapping:
+            self.wikipathways_manager.populate(paths={'9606': gene_sets_path}, commit_every=2)
+        self.assertEqual(
+            expected,
+            {pathway.identifier: pathway.get_hgnc_symbols() for pathway in self.wikipathways_manager.list_pathways()},
+        )
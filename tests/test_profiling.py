@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for the profiling of populating and querying."""
+
+import json
+import os
+import tempfile
+import unittest
+
+from bio2bel_wikipathways.profiling import PhaseRecord, Profiler
+from tests.constants import DatabaseMixin, gene_sets_path, mock_name_id_mapping
+
+
+class TestProfiler(unittest.TestCase):
+    """Tests the profiler without a database."""
+
+    def test_phases(self):
+        """Test nested phases are recorded with their full names and summed up by phase."""
+        profiler = Profiler()
+        records = []
+        profiler.add_callback(records.append)
+
+        with profiler.phase('outer'):
+            for rows in (2, 3):
+                with profiler.phase('inner') as info:
+                    info['rows'] = rows
+        with self.assertRaises(ValueError), profiler.phase('failing'):
+            raise ValueError
+
+        self.assertEqual(['outer/inner', 'outer/inner', 'outer', 'failing'], [record.phase for record in records])
+        self.assertEqual(records, profiler.records)
+        self.assertIsInstance(records[0], PhaseRecord)
+
+        summary = profiler.get_summary()
+        self.assertEqual(2, summary['outer/inner']['calls'])
+        self.assertEqual(5, summary['outer/inner']['rows'])
+        self.assertIsNone(summary['outer']['rows'])
+        self.assertGreaterEqual(summary['outer']['seconds'], summary['outer/inner']['seconds'])
+
+
+class TestManagerProfiling(DatabaseMixin):
+    """Tests the manager records its phases while profiling."""
+
+    def test_populate(self):
+        """Test populating records each phase and writes a report."""
+        self.wikipathways_manager.drop_species('9606')
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'profile.json')
+            with mock_name_id_mapping, self.wikipathways_manager.profiling(path, metadata={'test': True}) as profiler:
+                self.wikipathways_manager.populate(paths={'9606': gene_sets_path})
+
+            with open(path) as file:
+                report = json.load(file)
+
+        self.assertEqual({'test': True}, report['metadata'])
+        summary = report['summary']
+        for phase in ('download', 'ensure_mappings', 'parse', 'map_identifiers', 'load_orm', 'flush', 'commit'):
+            with self.subTest(phase=phase):
+                self.assertIn(f'populate/{phase}', summary)
+        self.assertEqual(5, summary['populate/load_orm']['rows'])
+        self.assertLess(0, summary['populate/flush']['statements'])
+        # Bio2BEL also logs the population in its own table, outside of the populate phase
+        self.assertLessEqual(summary['populate']['statements'], profiler.statements)
+        self.assertEqual(len(profiler.records), len(report['records']))
+
+        # nothing is recorded after the context exits
+        self.wikipathways_manager.get_pathway_ids_by_hgnc_ids(['2976'])
+        self.assertEqual(len(report['records']), len(profiler.records))
+
+    def test_queries(self):
+        """Test querying and enriching record their phases and statements."""
+        self.wikipathways_manager.clear_caches()
+        with self.wikipathways_manager.profiling() as profiler:
+            self.wikipathways_manager.get_pathway_ids_by_hgnc_ids(['2976', '9173'])
+            self.wikipathways_manager.enrich_hgnc_symbols(['DNMT1'])
+            self.wikipathways_manager.enrich_hgnc_symbols(['POLA1'])
+
+        summary = profiler.get_summary()
+        self.assertEqual(
+            ['get_pathway_ids_by_hgnc_ids', 'load_membership_matrix', 'enrich_hgnc_symbols'],
+            list(summary),
+        )
+        self.assertEqual(2, summary['get_pathway_ids_by_hgnc_ids']['rows'])
+        self.assertEqual(1, summary['get_pathway_ids_by_hgnc_ids']['statements'])
+        self.assertEqual(1, summary['load_membership_matrix']['calls'])
+        self.assertEqual(2, summary['enrich_hgnc_symbols']['calls'])
+        self.assertEqual(0, summary['enrich_hgnc_symbols']['statements'])
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for storing several WikiPathways releases as deltas."""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from bio2bel_wikipathways.models import Pathway, Release, ReleasePathway, release_membership
+from bio2bel_wikipathways.releases import ReleasedPathway, diff_releases, get_delta_rows, replay_deltas
+from tests.constants import DatabaseMixin, gene_sets_path, mock_name_id_mapping
+from tests.test_update import UPDATED_LINES
+
+
+def _pathway(identifier, *entrez_ids, name='name', revision='1'):
+    return ReleasedPathway(identifier, name, revision, '9606', frozenset(entrez_ids))
+
+
+class TestDeltas(unittest.TestCase):
+    """Tests diffing releases and replaying their deltas without a database."""
+
+    def test_round_trip(self):
+        """Test replaying the delta rows of consecutive releases gives back each release."""
+        releases = [
+            {'WP1': _pathway('WP1', '1', '2'), 'WP2': _pathway('WP2', '3')},
+            {'WP1': _pathway('WP1', '2', '4', revision='2'), 'WP3': _pathway('WP3', '3')},
+            {'WP1': _pathway('WP1', '2', '4', name='new', revision='3'), 'WP2': _pathway('WP2', '5')},
+        ]
+        deltas = []
+        previous = {}
+        for release in releases:
+            deltas.append(get_delta_rows(diff_releases(previous, release)))
+            self.assertEqual(release, replay_deltas(deltas))
+            previous = release
+
+    def test_diff(self):
+        """Test the added, removed, and changed pathways and genes."""
+        diff = diff_releases(
+            {'WP1': _pathway('WP1', '1', '2'), 'WP2': _pathway('WP2', '3')},
+            {'WP1': _pathway('WP1', '2', '4'), 'WP3': _pathway('WP3', '5')},
+        )
+        self.assertEqual(['WP3'], [pathway.identifier for pathway in diff.added])
+        self.assertEqual(['WP2'], [pathway.identifier for pathway in diff.removed])
+        self.assertEqual(['WP1'], [change.identifier for change in diff.changed])
+        self.assertEqual({'4'}, diff.changed[0].added_entrez_ids)
+        self.assertEqual({'1'}, diff.changed[0].removed_entrez_ids)
+        self.assertEqual({'4', '5'}, diff.added_entrez_ids)
+        self.assertEqual({'1', '3'}, diff.removed_entrez_ids)
+        self.assertFalse(diff_releases({'WP1': _pathway('WP1', '1')}, {'WP1': _pathway('WP1', '1')}))
+
+
+class TestReleases(DatabaseMixin):
+    """Tests storing the test GMT file, the updated one from :mod:`tests.test_update`, and the test one again."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Write the GMT files of three releases and add them with a keyframe every two releases."""
+        super().setUpClass()
+
+        cls.directory = tempfile.TemporaryDirectory()
+        paths = [os.path.join(cls.directory.name, f'release{i}.gmt') for i in range(3)]
+        with open(gene_sets_path) as file:
+            lines = file.readlines()
+        for path, version, updated in zip(paths, ('20180110', '20180210', '20180310'), (False, True, False)):
+            with open(path, 'w') as release_file:
+                for line in lines:
+                    identifier = line.split('\t')[0].split('%')[2]
+                    if updated:
+                        line = UPDATED_LINES.get(identifier, line)
+                    if line is not None:
+                        release_file.write(line.replace('WikiPathways_20180110', f'WikiPathways_{version}'))
+                if updated:
+                    release_file.write(UPDATED_LINES['WP4999'].replace('20180110', version))
+
+        with mock_name_id_mapping, mock.patch('bio2bel_wikipathways.manager.RELEASE_KEYFRAME_INTERVAL', 2):
+            cls.summaries = [
+                cls.wikipathways_manager.add_release(paths={'9606': path})
+                for path in paths
+            ]
+
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the GMT files."""
+        cls.directory.cleanup()
+        super().tearDownClass()
+
+    def setUp(self):
+        """Clear the cached releases so they are replayed from the database."""
+        self.wikipathways_manager.clear_caches()
+
+    def test_versions(self):
+        """Test the releases are listed from oldest to newest and the keyframes are every two releases."""
+        self.assertEqual(['20180110', '20180210', '20180310'], self.wikipathways_manager.get_release_versions())
+        self.assertEqual(
+            [True, False, True],
+            [keyframe for keyframe, in self.wikipathways_manager.session.query(Release.keyframe).order_by(Release.id)],
+        )
+
+    def test_summaries(self):
+        """Test the counts of changes to the previous release."""
+        self.assertEqual(5, self.summaries[0]['added_pathways'])
+        self.assertEqual(
+            {'added_pathways': 1, 'removed_pathways': 1, 'changed_pathways': 1, 'added_genes': 1, 'removed_genes': 2},
+            self.summaries[1],
+        )
+
+    def test_delta_storage(self):
+        """Test the delta release only stores the changed memberships."""
+        release_ids = [release_id for release_id, in self.wikipathways_manager.session.query(Release.id)]
+        counts = [
+            self.wikipathways_manager.session.query(release_membership).join(
+                ReleasePathway, ReleasePathway.id == release_membership.c.release_pathway_id,
+            ).filter(ReleasePathway.release_id == release_id).count()
+            for release_id in sorted(release_ids)
+        ]
+        # WP4999 adds 2 genes, and WP2333 swaps GCLM for ARCN1
+        self.assertEqual(4, counts[1])
+        self.assertEqual(counts[0], counts[2])
+
+    def test_get_release(self):
+        """Test replaying each release gives the pathways of its GMT file."""
+        first = self.wikipathways_manager.get_release('20180110')
+        self.assertEqual({'WP2333', 'WP1604', 'WP536', 'WP3596', 'WP4022'}, set(first))
+        self.assertEqual({'1786', '2730', '27430'}, first['WP2333'].entrez_ids)
+        self.assertEqual('72015', first['WP2333'].revision)
+
+        second = self.wikipathways_manager.get_release('20180210')
+        self.assertEqual({'WP2333', 'WP1604', 'WP536', 'WP3596', 'WP4999'}, set(second))
+        self.assertEqual({'1786', '27430', '372'}, second['WP2333'].entrez_ids)
+        self.assertEqual('Trans-sulfuration pathway (updated)', second['WP2333'].name)
+        self.assertEqual(first['WP536'], second['WP536'])
+
+        self.assertEqual(first, self.wikipathways_manager.get_release('20180310'))
+
+    def test_get_pathway_as_of(self):
+        """Test getting one pathway as of a release gives the same as getting the whole release."""
+        for version in self.wikipathways_manager.get_release_versions():
+            for identifier in ('WP2333', 'WP4022', 'WP4999'):
+                self.wikipathways_manager.clear_caches()
+                pathway = self.wikipathways_manager.get_pathway_as_of(identifier, version)
+                self.assertEqual(self.wikipathways_manager.get_release(version).get(identifier), pathway)
+
+    def test_diff_releases(self):
+        """Test diffing two releases."""
+        diff = self.wikipathways_manager.diff_releases('20180110', '20180210')
+        self.assertEqual(['WP4999'], [pathway.identifier for pathway in diff.added])
+        self.assertEqual(['WP4022'], [pathway.identifier for pathway in diff.removed])
+        self.assertEqual(['WP2333'], [change.identifier for change in diff.changed])
+        self.assertEqual({'372'}, diff.changed[0].added_entrez_ids)
+        self.assertEqual({'2730'}, diff.changed[0].removed_entrez_ids)
+        self.assertFalse(self.wikipathways_manager.diff_releases('20180110', '20180310'))
+
+    def test_head_untouched(self):
+        """Test adding releases leaves the pathways of the rest of the manager alone."""
+        self.assertEqual(5, self.wikipathways_manager.session.query(Pathway).count())
+        self.assertIsNone(self.wikipathways_manager.get_pathway_by_id('WP4999'))
+
+    def test_errors(self):
+        """Test adding a release that isn't newer and getting a missing release raise errors."""
+        with self.assertRaises(ValueError), mock_name_id_mapping:
+            self.wikipathways_manager.add_release(paths={'9606': gene_sets_path})
+        with self.assertRaises(ValueError):
+            self.wikipathways_manager.get_release('20000101')
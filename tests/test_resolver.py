@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for resolving mixed gene identifiers and searching by prefix."""
+
+import unittest
+
+from bio2bel_wikipathways.resolver import IdentifierIndex, IndexedPathway, ResolvedProtein
+from tests.constants import DatabaseMixin
+
+DNMT1 = ResolvedProtein('1786', '2976', 'DNMT1')
+DNMT3A = ResolvedProtein('1788', '2978', 'DNMT3A')
+MOUSE = ResolvedProtein('100001', None, None)
+
+
+class TestIdentifierIndex(unittest.TestCase):
+    """Tests the identifier index on its own."""
+
+    def setUp(self):
+        """Build a small index."""
+        self.index = IdentifierIndex(
+            proteins=[DNMT1, DNMT3A, MOUSE],
+            pathways=[
+                IndexedPathway('WP536', 'Calcium Regulation in the Cardiac Cell'),
+                IndexedPathway('WP2333', 'Trans-sulfuration pathway'),
+                IndexedPathway('WP53', 'Cardiac Progenitor Differentiation'),
+            ],
+        )
+
+    def test_resolve(self):
+        """Test each kind of identifier resolves to its protein."""
+        for identifier in ('1786', 'ncbigene:1786', 'NCBIGene:1786', 'HGNC:2976', 'hgnc:2976', 'DNMT1', ' dnmt1 '):
+            with self.subTest(identifier=identifier):
+                self.assertEqual(DNMT1, self.index.resolve(identifier))
+
+        self.assertEqual(MOUSE, self.index.resolve('100001'))
+        for identifier in ('2976', 'HGNC:1786', 'NOTAGENE', 'ncbigene:'):
+            with self.subTest(identifier=identifier):
+                self.assertIsNone(self.index.resolve(identifier))
+
+        self.assertEqual(
+            ['DNMT1', 'DNMT3A', '100001', 'NOTAGENE'],
+            self.index.to_hgnc_symbols(['hgnc:2976', '1788', '100001', 'NOTAGENE']),
+        )
+
+    def test_search_symbols(self):
+        """Test the symbols starting with a prefix are found in any case."""
+        self.assertEqual([DNMT1, DNMT3A], self.index.search_symbols('dnmt'))
+        self.assertEqual([DNMT1], self.index.search_symbols('DNMT', limit=1))
+        self.assertEqual([DNMT3A], self.index.search_symbols('DNMT3'))
+        self.assertEqual([], self.index.search_symbols('X'))
+
+    def test_search_pathways(self):
+        """Test the pathways with a word or identifier starting with a prefix are found."""
+        self.assertEqual(
+            ['WP53', 'WP536'],
+            sorted(pathway.identifier for pathway in self.index.search_pathways('cardiac')),
+        )
+        self.assertEqual(['WP536'], [pathway.identifier for pathway in self.index.search_pathways('cardiac  cell')])
+        self.assertEqual(['WP2333'], [pathway.identifier for pathway in self.index.search_pathways('PATH')])
+        self.assertEqual(['WP53', 'WP536'], [pathway.identifier for pathway in self.index.search_pathways('wp53')])
+        self.assertEqual(1, len(self.index.search_pathways('wp', limit=1)))
+        self.assertEqual([], self.index.search_pathways('sulfuration'))
+
+
+class TestManagerResolution(DatabaseMixin):
+    """Tests resolving and enriching mixed identifiers with the manager."""
+
+    def test_resolve_genes(self):
+        """Test the index is built from the database."""
+        self.assertEqual(
+            {
+                '7363': ('7363', '12553', 'UGT2B4'),
+                'HGNC:12554': ('7364', '12554', 'UGT2B7'),
+                'notagene': None,
+            },
+            self.wikipathways_manager.resolve_genes(['7363', 'HGNC:12554', 'notagene']),
+        )
+
+    def test_enrich_genes(self):
+        """Test enriching mixed identifiers gives the same results as the symbols."""
+        self.assertEqual(
+            self.wikipathways_manager.enrich_hgnc_symbols(['UGT2B4', 'UGT2B7']),
+            self.wikipathways_manager.enrich_genes(['7363', 'hgnc:12554']),
+        )
+        self.assertEqual(
+            self.wikipathways_manager.query_hgnc_symbols(['UGT2B4']),
+            self.wikipathways_manager.query_genes(['ugt2b4']),
+        )
+        results = dict(self.wikipathways_manager.enrich_gene_lists({'a': ['7363', 'UGT2B7']}, resolve=True))
+        self.assertEqual(2, results['a']['WP1604']['mapped_proteins'])
+
+    def test_clear(self):
+        """Test the index is rebuilt when the database changes."""
+        index = self.wikipathways_manager.identifier_index
+        self.assertIs(index, self.wikipathways_manager.identifier_index)
+        self.wikipathways_manager.clear_caches()
+        self.assertIsNot(index, self.wikipathways_manager.identifier_index)
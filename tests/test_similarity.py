@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for the all-pairs pathway similarities."""
+
+import os
+import tempfile
+import unittest
+from itertools import combinations
+
+import numpy as np
+from scipy import sparse
+
+from bio2bel_wikipathways.similarity import PathwaySimilarities, get_lsh_candidates, minhash_signatures
+from tests.constants import DatabaseMixin
+
+
+class TestSimilarities(DatabaseMixin):
+    """Tests the similarities of the pathways in the test GMT file."""
+
+    def setUp(self):
+        """Cache the similarities in a temporary directory."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.wikipathways_manager.similarity_cache_directory = self.directory.name
+        self.wikipathways_manager.clear_caches()
+
+    def tearDown(self):
+        """Remove the cached similarities."""
+        self.wikipathways_manager.similarity_cache_directory = None
+        self.directory.cleanup()
+
+    def _get_expected(self):
+        gene_sets = {
+            pathway.identifier: {protein.entrez_id for protein in pathway.proteins}
+            for pathway in self.wikipathways_manager.list_pathways()
+        }
+        return {
+            tuple(sorted((left, right))): len(gene_sets[left] & gene_sets[right])
+            for left, right in combinations(gene_sets, 2)
+            if gene_sets[left] & gene_sets[right]
+        }
+
+    def test_exact(self):
+        """Test the exact method finds every overlapping pair with the right similarities."""
+        similarities = self.wikipathways_manager.get_pathway_similarities()
+        rows = list(similarities.iter_rows())
+        self.assertEqual(
+            self._get_expected(),
+            {tuple(sorted((row['pathway_id_1'], row['pathway_id_2']))): row['shared_genes'] for row in rows},
+        )
+
+        # WP1604 has two genes and WP536 six, of which they share UGT2B4
+        row = similarities.get_similar_pathways('WP1604')['WP536']
+        self.assertEqual(1, row['shared_genes'])
+        self.assertEqual(0.5, row['overlap_coefficient'])
+        self.assertAlmostEqual(1 / 7, row['jaccard'])
+        self.assertTrue(0 < row['p_value'] <= row['q_value'] <= 1)
+        self.assertEqual({}, similarities.get_similar_pathways('WP0'))
+
+    def test_minhash(self):
+        """Test the approximate method only finds pairs the exact one does, with the same similarities."""
+        exact = {
+            (row['pathway_id_1'], row['pathway_id_2']): row['shared_genes']
+            for row in self.wikipathways_manager.get_pathway_similarities().iter_rows()
+        }
+        approximate = {
+            (row['pathway_id_1'], row['pathway_id_2']): row['shared_genes']
+            for row in self.wikipathways_manager.get_pathway_similarities(method='minhash', bands=64).iter_rows()
+        }
+        self.assertLessEqual(approximate.items(), exact.items())
+
+        with self.assertRaises(ValueError):
+            self.wikipathways_manager.get_pathway_similarities(method='cosine')
+
+    def test_cache(self):
+        """Test the similarities are saved and loaded again once the in-memory cache is cleared."""
+        similarities = self.wikipathways_manager.get_pathway_similarities(min_jaccard=0.1)
+        self.assertIs(similarities, self.wikipathways_manager.get_pathway_similarities(min_jaccard=0.1))
+        names = os.listdir(self.directory.name)
+        self.assertEqual(1, len(names))
+        self.assertTrue(names[0].startswith('similarities-20200310-'))
+
+        self.wikipathways_manager.clear_caches()
+        loaded = self.wikipathways_manager.get_pathway_similarities(min_jaccard=0.1)
+        self.assertIsNot(similarities, loaded)
+        self.assertEqual(list(similarities.iter_rows()), list(loaded.iter_rows()))
+        self.assertEqual(0.1, loaded.metadata['min_jaccard'])
+        self.assertTrue(all(row['jaccard'] >= 0.1 for row in loaded.iter_rows()))
+
+        self.wikipathways_manager.get_pathway_similarities(use_cache=False)
+        self.assertEqual(names, os.listdir(self.directory.name))
+
+
+class TestMinHash(unittest.TestCase):
+    """Tests the MinHash signatures and LSH candidates."""
+
+    def test_candidates(self):
+        """Test identical rows are always candidates and empty and disjoint rows never are."""
+        matrix = sparse.csr_matrix(np.array([
+            [1, 1, 1, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0],
+            [1, 1, 1, 0, 0, 0],
+            [0, 0, 0, 1, 1, 1],
+            [0, 0, 0, 0, 0, 0],
+        ]))
+        signatures = minhash_signatures(matrix, 16, seed=1)
+        self.assertEqual((5, 16), signatures.shape)
+        np.testing.assert_array_equal(signatures[0], signatures[2])
+        self.assertEqual([[0, 2]], get_lsh_candidates(signatures, 8).tolist())
+
+        with self.assertRaises(ValueError):
+            get_lsh_candidates(signatures, 5)
+
+    def test_empty(self):
+        """Test similarities without any pairs."""
+        similarities = PathwaySimilarities(['WP1'], ['a'], np.array([1]), 1, np.array([]), np.array([]), np.array([]))
+        self.assertEqual(0, len(similarities))
+        self.assertEqual([], list(similarities.iter_rows()))
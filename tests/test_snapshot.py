@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for the binary snapshots."""
+
+import os
+import tempfile
+
+import bio2bel_wikipathways
+from bio2bel.compath import CompathManager
+from bio2bel.manager.connection_manager import build_engine_session
+from bio2bel_wikipathways.snapshot import FORMAT_VERSION, Snapshot, SnapshotPathway
+from tests.constants import DatabaseMixin
+
+
+class TestSnapshot(DatabaseMixin):
+    """Tests exporting a populated database to a snapshot and reading it back."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Populate the database and export it to a snapshot."""
+        super().setUpClass()
+        cls.snapshot_directory = tempfile.TemporaryDirectory()
+        cls.snapshot_path = os.path.join(cls.snapshot_directory.name, 'wikipathways.snapshot')
+        cls.wikipathways_manager.export_snapshot(cls.snapshot_path, data_version='20180110')
+
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the snapshot."""
+        cls.snapshot_directory.cleanup()
+        super().tearDownClass()
+
+    def setUp(self):
+        """Open the snapshot."""
+        self.snapshot = Snapshot(self.snapshot_path)
+
+    def tearDown(self):
+        """Close the snapshot."""
+        self.snapshot.close()
+
+    def test_header(self):
+        """Test the counts and versions."""
+        self.assertEqual(FORMAT_VERSION, self.snapshot.format_version)
+        self.assertEqual('20180110', self.snapshot.data_version)
+        self.assertEqual(1, self.snapshot.number_species)
+        self.assertEqual(17, self.snapshot.number_proteins)
+        self.assertEqual(5, self.snapshot.number_pathways)
+
+    def test_get_pathway_by_id(self):
+        """Test looking up pathways."""
+        pathway = self.snapshot.get_pathway_by_id('WP2333')
+        self.assertEqual('Trans-sulfuration pathway', pathway.name)
+        self.assertEqual('9606', pathway.taxonomy_id)
+        self.assertIsNone(self.snapshot.get_pathway_by_id('WP0'))
+        self.assertIsNone(self.snapshot.get_pathway_by_id('WP99999'))
+
+        for db_pathway in self.wikipathways_manager.list_pathways():
+            with self.subTest(pathway=db_pathway.identifier):
+                self.assertEqual(
+                    SnapshotPathway(
+                        db_pathway.identifier, db_pathway.name, db_pathway.revision,
+                        db_pathway.species.taxonomy_id, db_pathway.species.name,
+                    ),
+                    self.snapshot.get_pathway_by_id(db_pathway.identifier),
+                )
+                self.assertEqual(db_pathway.get_hgnc_symbols(), self.snapshot.get_gene_set(db_pathway.identifier))
+
+    def test_gene_queries(self):
+        """Test looking up pathways by gene."""
+        self.assertEqual({'WP1604', 'WP536'}, self.snapshot.get_pathway_ids_by_hgnc_symbol('UGT2B4'))
+        self.assertEqual(set(), self.snapshot.get_pathway_ids_by_hgnc_symbol('NOT_A_GENE'))
+        self.assertEqual('UGT2B4', self.snapshot.get_protein_by_entrez_id('7363').hgnc_symbol)
+
+        for query in (['MAT2B'], ['UGT2B7', 'UGT2B4', 'CDKN1A'], ['GCLM', 'NOT_A_GENE'], []):
+            with self.subTest(query=query):
+                self.assertEqual(
+                    CompathManager.query_hgnc_symbols(self.wikipathways_manager, query),
+                    self.snapshot.query_hgnc_symbols(query),
+                )
+
+    def test_membership_matrix(self):
+        """Test building a membership matrix from the snapshot."""
+        query = ['UGT2B7', 'UGT2B4', 'CDKN1A']
+        self.assertEqual(
+            self.wikipathways_manager.enrich_hgnc_symbols(query),
+            self.snapshot.to_membership_matrix().query([query])[0],
+        )
+
+    def test_not_a_snapshot(self):
+        """Test opening a file that is not a snapshot."""
+        path = os.path.join(self.snapshot_directory.name, 'other')
+        with open(path, 'wb') as file:
+            file.write(b'\0' * 64)
+        with self.assertRaises(ValueError):
+            Snapshot(path)
+
+    def test_import(self):
+        """Test importing the snapshot into an empty database gives the same content."""
+        with tempfile.TemporaryDirectory() as directory:
+            engine, session = build_engine_session(connection=f'sqlite:///{os.path.join(directory, "import.db")}')
+            manager = bio2bel_wikipathways.Manager(engine=engine, session=session)
+            manager.create_all()
+            manager.import_snapshot(self.snapshot_path)
+
+            self.assertEqual(self.wikipathways_manager.summarize(), manager.summarize())
+            for pathway in self.wikipathways_manager.list_pathways():
+                with self.subTest(pathway=pathway.identifier):
+                    imported = manager.get_pathway_by_id(pathway.identifier)
+                    self.assertEqual(pathway.name, imported.name)
+                    self.assertEqual(pathway.revision, imported.revision)
+                    self.assertEqual(
+                        {protein.entrez_id for protein in pathway.proteins},
+                        {protein.entrez_id for protein in imported.proteins},
+                    )
+
+            with self.assertRaises(ValueError):
+                manager.import_snapshot(self.snapshot_path)
+            session.close()
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for loading, querying, and dropping single species."""
+
+import os
+import tempfile
+
+from bio2bel_wikipathways.models import Protein
+from tests.constants import DatabaseMixin, gene_sets_path, mock_name_id_mapping
+
+#: A mouse GMT file with one pathway that shares a protein with the human test file and one that doesn't
+MOUSE_LINES = [
+    'Mouse pathway%WikiPathways_20180110%WP9001%Mus musculus\t'
+    'http://www.wikipathways.org/instance/WP9001_r1\t1786\t100001\n',
+    'Other mouse pathway%WikiPathways_20180110%WP9002%Mus musculus\t'
+    'http://www.wikipathways.org/instance/WP9002_r1\t100002\n',
+]
+
+
+class TestSpecies(DatabaseMixin):
+    """Tests a database with a human and a mouse GMT file."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Populate the database with the human test GMT file then add only the mouse file."""
+        super().setUpClass()
+        cls.mouse_directory = tempfile.TemporaryDirectory()
+        cls.mouse_path = os.path.join(cls.mouse_directory.name, 'mouse.gmt')
+        with open(cls.mouse_path, 'w') as file:
+            file.writelines(MOUSE_LINES)
+        cls.paths = {'9606': gene_sets_path, '10090': cls.mouse_path}
+
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the mouse GMT file."""
+        cls.mouse_directory.cleanup()
+        super().tearDownClass()
+
+    def setUp(self):
+        """Make sure the mouse pathways are loaded."""
+        if '10090' not in self.wikipathways_manager.get_taxonomy_ids():
+            with mock_name_id_mapping:
+                self.wikipathways_manager.populate(paths=self.paths, taxonomy_ids=['10090'])
+
+    def test_populate_subset(self):
+        """Test only the selected species were added and the other one was left alone."""
+        self.assertEqual({'9606', '10090'}, self.wikipathways_manager.get_taxonomy_ids())
+        self.assertEqual(
+            {'pathways': 7, 'proteins': 19, 'species': 2},
+            self.wikipathways_manager.summarize(),
+        )
+
+    def test_missing_paths(self):
+        """Test asking for a species without a GMT file raises an error."""
+        with self.assertRaises(ValueError):
+            self.wikipathways_manager.populate(paths=self.paths, taxonomy_ids=['7955'])
+
+    def test_queries(self):
+        """Test the queries only get the pathways of the given species."""
+        self.assertEqual(
+            {'WP2333', 'WP9001'},
+            self.wikipathways_manager.get_pathway_ids_by_hgnc_ids(['2976']),
+        )
+        self.assertEqual({'WP2333'}, self.wikipathways_manager.get_pathway_ids_by_hgnc_ids(['2976'], '9606'))
+        self.assertEqual({'WP9001'}, self.wikipathways_manager.get_pathway_ids_by_hgnc_ids(['2976'], '10090'))
+        self.assertEqual(set(), self.wikipathways_manager.get_pathway_ids_by_hgnc_ids(['2976'], '7955'))
+
+        self.assertEqual(
+            {'WP2333', 'WP9001'},
+            set(self.wikipathways_manager.query_hgnc_symbols(['DNMT1'])),
+        )
+        self.assertEqual({'WP2333'}, set(self.wikipathways_manager.query_hgnc_symbols(['DNMT1'], '9606')))
+        self.assertEqual({'WP9001'}, set(self.wikipathways_manager.enrich_hgnc_symbols(['DNMT1'], '10090')))
+        self.assertEqual(
+            [['WP9001']],
+            [
+                list(results)
+                for results in self.wikipathways_manager.enrich_hgnc_symbols_batch([['DNMT1']], taxonomy_id='10090')
+            ],
+        )
+
+    def test_export(self):
+        """Test exporting the pathways of one species."""
+        self.assertEqual(
+            ['WP9001', 'WP9002'],
+            [pathway.identifier for pathway in self.wikipathways_manager.iter_exported_pathways(taxonomy_id='10090')],
+        )
+
+    def test_drop_species(self):
+        """Test dropping a species leaves the others and the proteins they share."""
+        counts = self.wikipathways_manager.drop_species('10090')
+        self.assertEqual({'pathways': 2, 'proteins': 2}, counts)
+        self.assertEqual({'9606'}, self.wikipathways_manager.get_taxonomy_ids())
+        self.assertEqual({'pathways': 5, 'proteins': 17, 'species': 1}, self.wikipathways_manager.summarize())
+        self.assertIsNotNone(self.wikipathways_manager.get_protein_by_entrez_id('1786'))
+        self.assertIsNone(self.wikipathways_manager.session.query(Protein).filter(Protein.entrez_id == '100001').first())
+        self.assertEqual(
+            {'WP2333'},
+            set(self.wikipathways_manager.query_hgnc_symbols(['DNMT1'])),
+        )
+
+        with self.assertRaises(ValueError):
+            self.wikipathways_manager.drop_species('10090')
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for the incremental update of Bio2BEL WikiPathways."""
+
+import os
+import tempfile
+
+from bio2bel_wikipathways.models import Pathway
+from tests.constants import DatabaseMixin, gene_sets_path, mock_name_id_mapping
+
+#: The test GMT file after WP2333 got a new revision with GCLM swapped for ARCN1, WP4022 was retired, and WP4999
+#: was added. The other pathways are unchanged.
+UPDATED_LINES = {
+    'WP2333': (
+        'Trans-sulfuration pathway (updated)%WikiPathways_20180110%WP2333%Homo sapiens\t'
+        'http://www.wikipathways.org/instance/WP2333_r99999\t1786\t27430\t372\n'
+    ),
+    'WP4022': None,
+    'WP4999': (
+        'New pathway%WikiPathways_20180110%WP4999%Homo sapiens\t'
+        'http://www.wikipathways.org/instance/WP4999_r1\t5422\t999999\n'
+    ),
+}
+
+
+class TestUpdate(DatabaseMixin):
+    """Tests updating a populated database with a newer GMT file."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Populate the database with the test GMT file then update it with a modified copy."""
+        super().setUpClass()
+
+        cls.updated_directory = tempfile.TemporaryDirectory()
+        updated_path = os.path.join(cls.updated_directory.name, 'updated.gmt')
+        with open(gene_sets_path) as file, open(updated_path, 'w') as updated_file:
+            for line in file:
+                identifier = line.split('\t')[0].split('%')[2]
+                updated_line = UPDATED_LINES.get(identifier, line)
+                if updated_line is not None:
+                    updated_file.write(updated_line)
+            updated_file.write(UPDATED_LINES['WP4999'])
+
+        with mock_name_id_mapping:
+            cls.summary = cls.wikipathways_manager.update(paths={'9606': updated_path})
+
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the updated GMT file."""
+        cls.updated_directory.cleanup()
+        super().tearDownClass()
+
+    def test_summary(self):
+        """Test the counts of added, changed, deleted, and unchanged pathways."""
+        self.assertEqual({'added': 1, 'changed': 1, 'deleted': 1, 'unchanged': 3}, self.summary)
+
+    def test_added(self):
+        """Test the new pathway was added with a new protein."""
+        pathway = self.wikipathways_manager.get_pathway_by_id('WP4999')
+        self.assertIsNotNone(pathway)
+        self.assertEqual({'5422', '999999'}, {protein.entrez_id for protein in pathway.proteins})
+
+    def test_changed(self):
+        """Test the changed pathway got its new revision, name, and memberships."""
+        pathway = self.wikipathways_manager.get_pathway_by_id('WP2333')
+        self.assertEqual('99999', pathway.revision)
+        self.assertEqual('Trans-sulfuration pathway (updated)', pathway.name)
+        self.assertEqual({'DNMT1', 'MAT2B', 'ARCN1'}, pathway.get_hgnc_symbols())
+
+    def test_deleted(self):
+        """Test the retired pathway was deleted."""
+        self.assertIsNone(self.wikipathways_manager.get_pathway_by_id('WP4022'))
+        self.assertEqual(5, self.wikipathways_manager.session.query(Pathway).count())
+
+    def test_unchanged(self):
+        """Test an unchanged pathway kept its memberships."""
+        pathway = self.wikipathways_manager.get_pathway_by_id('WP3596')
+        self.assertEqual(5, len(pathway.proteins))
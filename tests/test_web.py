@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for the JSON query service."""
+
+from bio2bel_wikipathways.web import create_app, make_etag
+from pybel import from_nodelink
+from tests.constants import DatabaseMixin
+
+
+class TestWeb(DatabaseMixin):
+    """Tests the endpoints of the query service against the test GMT file."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Populate the database and build the app on its manager."""
+        super().setUpClass()
+        cls.app = create_app(cls.wikipathways_manager, data_version='test', max_age=60)
+
+    def setUp(self):
+        """Make a test client."""
+        self.client = self.app.test_client()
+
+    def test_pathway(self):
+        """Test looking up a pathway."""
+        response = self.client.get('/api/pathway/WP1604')
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(make_etag('test', 'pathway', 'WP1604', '95222'), response.get_etag()[0])
+        self.assertEqual(60, response.cache_control.max_age)
+        self.assertTrue(response.cache_control.public)
+
+        data = response.get_json()
+        self.assertEqual('Codeine and Morphine Metabolism', data['name'])
+        self.assertEqual('9606', data['taxonomy_id'])
+        self.assertEqual(
+            ['UGT2B4', 'UGT2B7'],
+            sorted(protein['hgnc_symbol'] for protein in data['proteins']),
+        )
+
+    def test_missing_pathway(self):
+        """Test looking up a pathway that doesn't exist gives a 404."""
+        self.assertEqual(404, self.client.get('/api/pathway/WP0').status_code)
+        self.assertEqual(404, self.client.get('/api/pathway/WP0/graph').status_code)
+
+    def test_not_modified(self):
+        """Test a request with the ETag of the last response gets an empty 304."""
+        etag = self.client.get('/api/pathway/WP1604').get_etag()[0]
+        response = self.client.get('/api/pathway/WP1604', headers={'If-None-Match': f'"{etag}"'})
+        self.assertEqual(304, response.status_code)
+        self.assertEqual(b'', response.data)
+        self.assertEqual(etag, response.get_etag()[0])
+
+        response = self.client.get('/api/pathway/WP1604', headers={'If-None-Match': '"other"'})
+        self.assertEqual(200, response.status_code)
+
+    def test_graph(self):
+        """Test getting the graph of a pathway as node-link JSON and as BEL."""
+        response = self.client.get('/api/pathway/WP1604/graph')
+        self.assertEqual(200, response.status_code)
+        graph = from_nodelink(response.get_json())
+        self.assertEqual(3, graph.number_of_nodes())
+        self.assertEqual(2, graph.number_of_edges())
+
+        response = self.client.get('/api/pathway/WP1604/graph?format=bel')
+        self.assertEqual(200, response.status_code)
+        self.assertIn('partOf bp(wikipathways:WP1604 ! "Codeine and Morphine Metabolism")', response.get_data(True))
+        self.assertNotEqual(
+            self.client.get('/api/pathway/WP1604/graph').get_etag()[0],
+            response.get_etag()[0],
+        )
+
+        self.assertEqual(400, self.client.get('/api/pathway/WP1604/graph?format=xml').status_code)
+
+    def test_enrich(self):
+        """Test the enrichment gives the same results with GET and POST, and the same ETag in any gene order."""
+        response = self.client.get('/api/enrich?genes=UGT2B7,UGT2B4&genes=NOTAGENE')
+        self.assertEqual(200, response.status_code)
+        data = response.get_json()
+        self.assertEqual(['NOTAGENE', 'UGT2B4', 'UGT2B7'], data['genes'])
+        self.assertEqual('WP1604', data['results'][0]['pathway_id'])
+        self.assertEqual(2, data['results'][0]['mapped_proteins'])
+        self.assertEqual(
+            sorted(data['results'][0]['pathway_gene_set']),
+            data['results'][0]['pathway_gene_set'],
+        )
+
+        post_response = self.client.post('/api/enrich', json={'genes': ['UGT2B4', 'NOTAGENE', 'UGT2B7']})
+        self.assertEqual(data, post_response.get_json())
+        self.assertEqual(response.get_etag(), post_response.get_etag())
+
+        response = self.client.get('/api/enrich?genes=7364,HGNC:12553,NOTAGENE')
+        self.assertEqual(data['results'], response.get_json()['results'])
+
+        self.assertEqual(400, self.client.get('/api/enrich').status_code)
+        self.assertEqual(400, self.client.post('/api/enrich', json={'genes': 'UGT2B4'}).status_code)
+
+    def test_search(self):
+        """Test autocompleting pathways and symbols."""
+        response = self.client.get('/api/search?q=ugt')
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(
+            {
+                'pathways': [],
+                'proteins': [
+                    {'entrez_id': '7363', 'hgnc_id': '12553', 'hgnc_symbol': 'UGT2B4'},
+                    {'entrez_id': '7364', 'hgnc_id': '12554', 'hgnc_symbol': 'UGT2B7'},
+                ],
+            },
+            response.get_json(),
+        )
+        response = self.client.get('/api/search?q=morphine&limit=1')
+        self.assertEqual(
+            [{'identifier': 'WP1604', 'name': 'Codeine and Morphine Metabolism'}],
+            response.get_json()['pathways'],
+        )
+        self.assertEqual(400, self.client.get('/api/search').status_code)